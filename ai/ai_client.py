@@ -1,72 +1,503 @@
 """
 AI Client
-Handles communication with Google Gemini AI API
+Handles communication with the AI service (Google Gemini by default)
+The service itself is a backend from ai/backends.py, chosen in .env
 """
 
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+import threading
+import time
+from ai.backends import create_backend, GEMINI_BACKEND
+from ai.response_cache import get_response_cache
+from ai.single_flight import SingleFlight
+from ai.rate_limiter import (get_rate_limiter, get_max_retries, get_backoff_delay, estimate_tokens,
+                             is_retryable_error, is_quota_error, is_timeout_error, PRIORITY_INTERACTIVE,
+                             MAX_REQUESTS_IN_FLIGHT)
+
+# Gemini model used for all requests
+DEFAULT_MODEL_NAME = 'gemini-3-flash-preview'
+
+# Shared clients, one per model name (see get_ai_client)
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Key set with set_api_key(), also used by clients created later
+_api_key = None
+
+# .env only needs to be read once per process
+_environment_loaded = False
+
+# Every backend call takes a slot, so helper threads (e.g. chunk summaries)
+# count towards the same limit as the views' jobs
+_request_slots = threading.BoundedSemaphore(MAX_REQUESTS_IN_FLIGHT)
+
+# Start of every error message returned instead of AI output
+# (see format_error() and the backends' setup messages)
+ERROR_MESSAGE_PREFIXES = ("Error: ", "Error connecting to AI service: ")
+
+def load_environment():
+    """
+    Load environment variables from the .env file (only the first time)
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        # Imported here so startup does not wait for it
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+def get_ai_client(model_name=DEFAULT_MODEL_NAME):
+    """
+    Get the shared AI client for a model
+    Clients are created on first use and reused, so creating views or
+    generators does no SDK setup
+    
+    Args:
+        model_name: Name of the Gemini model
+        
+    Returns:
+        Shared AIClient instance
+    """
+    with _clients_lock:
+        client = _clients.get(model_name)
+        if client is None:
+            client = AIClient(model_name)
+            if _api_key is not None:
+                client.set_api_key(_api_key)
+            _clients[model_name] = client
+    return client
+
+def set_api_key(api_key):
+    """
+    Set the API key for every shared AI client, including ones created later
+    
+    Args:
+        api_key: API key string
+    """
+    global _api_key
+    with _clients_lock:
+        _api_key = api_key
+        clients = list(_clients.values())
+    
+    for client in clients:
+        client.set_api_key(api_key)
+
+def is_error_response(response):
+    """
+    Check if a response is an error message instead of AI output
+    
+    Args:
+        response: Text returned by send_prompt()
+        
+    Returns:
+        True if the response is an error message
+    """
+    return response.startswith(ERROR_MESSAGE_PREFIXES)
 
 class AIClient:
-    def __init__(self):
+    def __init__(self, model_name=DEFAULT_MODEL_NAME):
         """
-        Initialize AI client with Google Gemini
-        Loads API key from .env file
+        Initialize AI client
+        Loads settings from .env file. The backend itself is created on first use.
+        Prefer get_ai_client() so the client is shared.
+        
+        Args:
+            model_name: Name of the Gemini model
         """
         # Load environment variables
-        load_dotenv()
+        load_environment()
         
         # Get API key from environment
         self.api_key = os.getenv("GEMINI_API_KEY")
+        self.model_name = model_name
         
-        # Configure Gemini if API key exists
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            # Initialize Gemini model
-            self.model = genai.GenerativeModel('gemini-3-flash-preview')
-        else:
-            self.model = None
+        # Backend names from .env (AI_BACKEND: gemini, local or fake)
+        self.backend_name = os.getenv("AI_BACKEND", GEMINI_BACKEND).strip().lower()
+        self.fallback_backend_name = os.getenv("AI_FALLBACK_BACKEND", "").strip().lower()
+        
+        # Backends are created lazily by get_backend()
+        self.backend = None
+        self.fallback_backend = None
+        self.backend_lock = threading.Lock()
+        
+        # Shared on-disk cache of previous responses
+        self.response_cache = get_response_cache()
+        
+        # Identical requests running at the same time share one API call
+        self.single_flight = SingleFlight()
+        
+        # Shared quota limiter and retry settings
+        self.rate_limiter = get_rate_limiter()
+        self.max_retries = get_max_retries()
     
     def set_api_key(self, api_key):
         """
         Set the API key for AI service
+        The backend is rebuilt with the new key on its next use
         
         Args:
             api_key: API key string
         """
-        self.api_key = api_key
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash-latest')
+        with self.backend_lock:
+            self.api_key = api_key
+            self.backend = None
+            self.fallback_backend = None
+    
+    def get_backend(self):
+        """
+        Get the main backend, creating it on first use
+        The same backend (and its model and connection) is reused for every request
+        
+        Returns:
+            Backend instance
+        """
+        with self.backend_lock:
+            if self.backend is None:
+                self.backend = create_backend(self.backend_name, self.model_name, self.api_key)
+            return self.backend
+    
+    def get_fallback_backend(self):
+        """
+        Get the fallback backend used when the main one is slow or failing
+        
+        Returns:
+            Backend instance, or None if no usable fallback is set
+        """
+        if not self.fallback_backend_name or self.fallback_backend_name == self.backend_name:
+            return None
+        
+        with self.backend_lock:
+            if self.fallback_backend is None:
+                self.fallback_backend = create_backend(self.fallback_backend_name, self.model_name, self.api_key)
+            fallback_backend = self.fallback_backend
+        
+        if not fallback_backend.is_configured():
+            return None
+        return fallback_backend
+    
+    def get_cache_name(self, backend):
+        """
+        Get the name used for a backend in cache keys
+        
+        Args:
+            backend: Backend instance
+            
+        Returns:
+            Name such as "gemini:gemini-3-flash-preview"
+        """
+        return f"{backend.name}:{backend.model_name}"
     
-    def send_prompt(self, prompt):
+    def send_prompt(self, prompt, prompt_version=None, use_cache=True, priority=PRIORITY_INTERACTIVE,
+                    response_info=None):
         """
         Send a prompt to the AI service
+        Responses are cached on disk, so repeating a prompt costs no API quota.
+        Requests wait for the rate limiter and temporary errors are retried.
         
         Args:
             prompt: Text prompt to send
+            prompt_version: Version of the prompt template (part of the cache key)
+            use_cache: Whether to read and write the response cache
+            priority: PRIORITY_INTERACTIVE (views) or PRIORITY_BACKGROUND (batch jobs)
+            response_info: Dictionary (optional); 'backend' is set to the backend
+                that answered, unless the response is an error message
             
         Returns:
             AI response text
         """
-        # Check if API key is set
-        if not self.api_key or not self.model:
-            return "Error: AI API key not configured. Please add your API key to the .env file."
+        # Check if the backend is set up (e.g. API key present)
+        backend = self.get_backend()
+        if not backend.is_configured():
+            return backend.get_setup_message()
+        
+        # Return a cached response if we have one
+        cache_key = self.response_cache.make_key(self.get_cache_name(backend), prompt_version, prompt)
+        if use_cache:
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                if response_info is not None:
+                    response_info['backend'] = backend
+                return cached_response
+        
+        try:
+            # Identical requests already in flight share one API call
+            response_text, answering_backend = self.single_flight.do(
+                cache_key, self.fetch_response, backend, prompt, priority, cache_key, use_cache
+            )
+            if response_info is not None:
+                response_info['backend'] = answering_backend
+            return response_text
+        
+        except Exception as e:
+            # Handle API errors gracefully (errors are never cached)
+            return self.format_error(e)
+    
+    def store_response(self, prompt, prompt_version, response_text, backend=None):
+        """
+        Store a response in the cache without calling the AI service
+        Used when one request produced the answer to another prompt too
+        
+        Args:
+            prompt: Prompt the response belongs to
+            prompt_version: Version of the prompt template
+            response_text: Response text to store
+            backend: Backend that produced the response (default is the main backend)
+        """
+        if backend is None:
+            backend = self.get_backend()
+        cache_key = self.response_cache.make_key(self.get_cache_name(backend), prompt_version, prompt)
+        self.response_cache.put(cache_key, response_text)
+    
+    def fetch_response(self, backend, prompt, priority, cache_key, use_cache):
+        """
+        Get a response from the backend and store it in the cache
+        The cache is written before waiting callers are released, so a new
+        identical request finds it there.
+        
+        Args:
+            backend: Main backend
+            prompt: Text prompt to send
+            priority: Request priority for the rate limiter
+            cache_key: Response cache key
+            use_cache: Whether to write the response cache
+            
+        Returns:
+            Tuple of (AI response text, backend that answered)
+        """
+        response_text, used_fallback = self.generate_with_retry(backend, prompt, priority)
+        
+        # Fallback answers come from a different model, so they are not cached
+        if used_fallback:
+            return response_text, self.get_fallback_backend()
+        
+        if use_cache:
+            self.response_cache.put(cache_key, response_text)
+        return response_text, backend
+    
+    def stream_prompt(self, prompt, prompt_version=None, use_cache=True, priority=PRIORITY_INTERACTIVE):
+        """
+        Send a prompt and yield the response in pieces as they arrive
+        The first words can be shown long before the full response is ready
+        
+        Args:
+            prompt: Text prompt to send
+            prompt_version: Version of the prompt template (part of the cache key)
+            use_cache: Whether to read and write the response cache
+            priority: PRIORITY_INTERACTIVE (views) or PRIORITY_BACKGROUND (batch jobs)
+            
+        Yields:
+            Pieces of the AI response text (or a single error message)
+        """
+        # Check if the backend is set up (e.g. API key present)
+        backend = self.get_backend()
+        if not backend.is_configured():
+            yield backend.get_setup_message()
+            return
+        
+        # A cached response is returned in one piece
+        cache_key = self.response_cache.make_key(self.get_cache_name(backend), prompt_version, prompt)
+        if use_cache:
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                yield cached_response
+                return
         
+        # Identical requests already in flight share one API call
+        call, is_leader = self.single_flight.begin(cache_key)
+        while not is_leader:
+            call.done.wait()
+            
+            # Show the shared response in one piece
+            if not call.abandoned:
+                if call.error is not None:
+                    yield self.format_error(call.error)
+                else:
+                    yield call.result
+                return
+            
+            # The request we waited for was cancelled, so make our own
+            call, is_leader = self.single_flight.begin(cache_key)
+        
+        chunks = []
+        request_state = {'used_fallback': False}
         try:
-            # Generate response using Gemini
-            response = self.model.generate_content(prompt)
-            return response.text
+            for chunk_text in self.stream_with_retry(backend, prompt, priority, request_state):
+                chunks.append(chunk_text)
+                yield chunk_text
         
         except Exception as e:
-            # Handle API errors gracefully
-            error_message = str(e)
-            if "API_KEY_INVALID" in error_message:
-                return "Error: Invalid API key. Please check your Gemini API key in the .env file."
-            elif "quota" in error_message.lower():
-                return "Error: API quota exceeded. Please check your Gemini API usage limits."
+            self.single_flight.finish(cache_key, call, error=e)
+            
+            # Handle API errors gracefully (partial responses are never cached)
+            if chunks:
+                yield "\n\n" + self.format_error(e)
             else:
-                return f"Error connecting to AI service: {error_message}"
+                yield self.format_error(e)
+            return
+        
+        except BaseException:
+            # The reader stopped early (e.g. the job was cancelled)
+            self.single_flight.finish(cache_key, call, abandoned=True)
+            raise
+        
+        response_text = "".join(chunks)
+        
+        # Only complete responses from the main backend are cached
+        if use_cache and chunks and not request_state['used_fallback']:
+            self.response_cache.put(cache_key, response_text)
+        
+        self.single_flight.finish(cache_key, call, result=response_text)
+    
+    def stream_with_retry(self, backend, prompt, priority, request_state):
+        """
+        Stream a response, waiting for the rate limiter and retrying temporary errors
+        A request is only retried (or moved to the fallback backend) if no
+        pieces were produced yet.
+        
+        Args:
+            backend: Main backend
+            prompt: Text prompt to send
+            priority: Request priority for the rate limiter
+            request_state: Dictionary; 'used_fallback' is set to True if the fallback answered
+            
+        Yields:
+            Pieces of the AI response text
+            
+        Raises:
+            The last API error if all retries fail
+        """
+        produced_text = False
+        attempt = 0
+        while True:
+            # Wait for our turn within the API quota
+            if backend.rate_limited:
+                self.rate_limiter.acquire(estimate_tokens(prompt), priority)
+            
+            try:
+                with _request_slots:
+                    for chunk_text in backend.stream(prompt):
+                        produced_text = True
+                        yield chunk_text
+                return
+            
+            except Exception as e:
+                if produced_text:
+                    raise
+                
+                fallback_backend = self.get_fallback_backend()
+                if fallback_backend is not None and self.should_fail_over(e, attempt):
+                    request_state['used_fallback'] = True
+                    with _request_slots:
+                        yield from fallback_backend.stream(prompt)
+                    return
+                
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                
+                self.wait_before_retry(e, attempt)
+                attempt += 1
+    
+    def generate_with_retry(self, backend, prompt, priority):
+        """
+        Generate a response, waiting for the rate limiter and retrying temporary errors
+        
+        Args:
+            backend: Main backend
+            prompt: Text prompt to send
+            priority: Request priority for the rate limiter
+            
+        Returns:
+            Tuple of (response text, True if the fallback backend answered)
+            
+        Raises:
+            The last API error if all retries fail
+        """
+        attempt = 0
+        while True:
+            # Wait for our turn within the API quota
+            if backend.rate_limited:
+                self.rate_limiter.acquire(estimate_tokens(prompt), priority)
+            
+            try:
+                with _request_slots:
+                    return backend.generate(prompt), False
+            
+            except Exception as e:
+                fallback_backend = self.get_fallback_backend()
+                if fallback_backend is not None and self.should_fail_over(e, attempt):
+                    with _request_slots:
+                        return fallback_backend.generate(prompt), True
+                
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                
+                self.wait_before_retry(e, attempt)
+                attempt += 1
+    
+    def should_fail_over(self, error, attempt):
+        """
+        Decide if a failed request should go to the fallback backend
+        Timeouts fail over at once (the main backend is slow); other errors
+        only once retrying would not help.
+        
+        Args:
+            error: Exception raised by the main backend
+            attempt: Number of the failed attempt, starting at 0
+            
+        Returns:
+            True if the fallback backend should answer
+        """
+        if is_timeout_error(error):
+            return True
+        return attempt >= self.max_retries or not is_retryable_error(error)
+    
+    def wait_before_retry(self, error, attempt):
+        """
+        Back off before retrying a failed request
+        Quota errors also pause the shared limiter, so other requests wait too
+        instead of making the burst worse.
+        
+        Args:
+            error: Exception raised by the AI service
+            attempt: Number of the failed attempt, starting at 0
+        """
+        delay = get_backoff_delay(attempt)
+        
+        if is_quota_error(error):
+            self.rate_limiter.pause(delay)
+        
+        # Also needed for backends without rate limiting, which never call acquire()
+        time.sleep(delay)
+    
+    def format_error(self, error):
+        """
+        Turn an API exception into a user-friendly message
+        
+        Args:
+            error: Exception raised by the AI service
+            
+        Returns:
+            Error message string
+        """
+        error_message = str(error)
+        if "API_KEY_INVALID" in error_message:
+            return "Error: Invalid API key. Please check your Gemini API key in the .env file."
+        elif "quota" in error_message.lower():
+            return "Error: API quota exceeded. Please check your Gemini API usage limits."
+        else:
+            return f"Error connecting to AI service: {error_message}"
+    
+    def get_stats(self):
+        """
+        Get request statistics (cache and request coalescing)
+        
+        Returns:
+            Dictionary of counters
+        """
+        stats = self.response_cache.get_stats()
+        stats.update(self.single_flight.get_stats())
+        stats['backend'] = self.backend_name
+        return stats
     
     def is_configured(self):
         """
@@ -75,4 +506,4 @@ class AIClient:
         Returns:
             True if configured, False otherwise
         """
-        return self.api_key is not None and self.model is not None
+        return self.get_backend().is_configured()
@@ -0,0 +1,432 @@
+"""
+AI Backends
+Interchangeable services that turn a prompt into text:
+Google Gemini, a local OpenAI-compatible server, and an offline fake for benchmarks
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import urllib.request
+
+# Backend names used in .env (AI_BACKEND / AI_FALLBACK_BACKEND)
+GEMINI_BACKEND = "gemini"
+LOCAL_BACKEND = "local"
+FAKE_BACKEND = "fake"
+
+# Default settings for the local server backend
+DEFAULT_LOCAL_MODEL = "local-model"
+DEFAULT_LOCAL_TIMEOUT_SECONDS = 120
+
+# Default settings for the fake backend
+DEFAULT_FAKE_LATENCY_SECONDS = 0.5
+DEFAULT_FAKE_TOKENS_PER_SECOND = 50
+
+# Section headings a prompt asks for (e.g. "### SUMMARY"), repeated by the fake backend
+FAKE_SECTION_HEADING_PATTERN = re.compile(r"^\s*(### [A-Z]+)\s*$", re.MULTILINE)
+
+# genai.configure() is process-wide, so remember which key it was called with
+_configured_api_key = None
+_configure_lock = threading.Lock()
+
+def get_genai():
+    """
+    Get the Gemini SDK module, importing it on first use
+    The SDK takes about a second to import, so the app only pays for it
+    on the first Gemini request, not at startup.
+    
+    Returns:
+        The google.generativeai module
+    """
+    import google.generativeai as genai
+    return genai
+
+def configure_gemini(api_key):
+    """
+    Configure the Gemini SDK with an API key, skipping repeated calls with the same key
+    
+    Args:
+        api_key: API key string
+    """
+    global _configured_api_key
+    with _configure_lock:
+        if api_key != _configured_api_key:
+            get_genai().configure(api_key=api_key)
+            _configured_api_key = api_key
+
+def get_number_setting(name, default, must_be_positive=False):
+    """
+    Read a number setting from the environment
+    A missing or invalid value (not a number, negative, or zero when it
+    must be positive) falls back to the default instead of failing.
+    
+    Args:
+        name: Environment variable name
+        default: Value used when the setting is missing or invalid
+        must_be_positive: Whether zero is invalid too
+    
+    Returns:
+        The number as a float, or the default
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    
+    try:
+        number = float(value)
+    except ValueError:
+        return default
+    
+    if not math.isfinite(number) or number < 0 or (must_be_positive and number == 0):
+        return default
+    return number
+
+def get_timeout_setting():
+    """
+    Get the request timeout for the main backend (AI_REQUEST_TIMEOUT in .env)
+    A timed out request fails over to the fallback backend, if one is set.
+    
+    Returns:
+        Timeout in seconds, or None for no timeout
+    """
+    return get_number_setting("AI_REQUEST_TIMEOUT", None, must_be_positive=True)
+
+class GeminiBackend:
+    # Gemini has a per-key quota, so its requests go through the rate limiter
+    rate_limited = True
+    
+    def __init__(self, model_name, api_key, timeout=None):
+        """
+        Initialize the Gemini backend
+        The model object is created on first use and then reused
+        
+        Args:
+            model_name: Name of the Gemini model
+            api_key: Gemini API key
+            timeout: Request timeout in seconds (optional)
+        """
+        self.name = GEMINI_BACKEND
+        self.model_name = model_name
+        self.api_key = api_key
+        self.timeout = timeout
+        self.model = None
+        self.model_lock = threading.Lock()
+    
+    def is_configured(self):
+        """
+        Check if the backend can send requests
+        
+        Returns:
+            True if an API key is set
+        """
+        return bool(self.api_key)
+    
+    def get_setup_message(self):
+        """
+        Get the message shown when the backend is not configured
+        
+        Returns:
+            Error message string
+        """
+        return "Error: AI API key not configured. Please add your API key to the .env file."
+    
+    def get_model(self):
+        """
+        Get the Gemini model, creating it on first use
+        
+        Returns:
+            GenerativeModel instance
+        """
+        with self.model_lock:
+            if self.model is None:
+                configure_gemini(self.api_key)
+                self.model = get_genai().GenerativeModel(self.model_name)
+            return self.model
+    
+    def get_request_options(self):
+        """
+        Get extra request options for the SDK
+        
+        Returns:
+            Dictionary of request options
+        """
+        if self.timeout:
+            return {'timeout': self.timeout}
+        return {}
+    
+    def generate(self, prompt):
+        """
+        Generate a complete response
+        
+        Args:
+            prompt: Text prompt to send
+        
+        Returns:
+            Response text
+        """
+        response = self.get_model().generate_content(prompt, request_options=self.get_request_options())
+        return response.text
+    
+    def stream(self, prompt):
+        """
+        Generate a response piece by piece
+        
+        Args:
+            prompt: Text prompt to send
+        
+        Yields:
+            Pieces of the response text
+        """
+        response = self.get_model().generate_content(
+            prompt,
+            stream=True,
+            request_options=self.get_request_options()
+        )
+        
+        for chunk in response:
+            # Some chunks carry no text (e.g. only safety information)
+            try:
+                chunk_text = chunk.text
+            except ValueError:
+                continue
+            
+            yield chunk_text
+
+class LocalServerBackend:
+    # A local server has no shared quota
+    rate_limited = False
+    
+    def __init__(self, base_url, model_name=DEFAULT_LOCAL_MODEL, api_key=None,
+                 timeout=DEFAULT_LOCAL_TIMEOUT_SECONDS):
+        """
+        Initialize the backend for a local OpenAI-compatible server
+        (e.g. Ollama, llama.cpp server, LM Studio)
+        
+        Args:
+            base_url: Server URL including the API prefix, e.g. http://localhost:11434/v1
+            model_name: Model name the server should use
+            api_key: API key, if the server needs one
+            timeout: Request timeout in seconds
+        """
+        self.name = LOCAL_BACKEND
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.model_name = model_name
+        self.api_key = api_key
+        self.timeout = timeout
+    
+    def is_configured(self):
+        """
+        Check if the backend can send requests
+        
+        Returns:
+            True if a server URL is set
+        """
+        return bool(self.base_url)
+    
+    def get_setup_message(self):
+        """
+        Get the message shown when the backend is not configured
+        
+        Returns:
+            Error message string
+        """
+        return "Error: Local AI server not configured. Please set LOCAL_AI_URL in the .env file."
+    
+    def open_request(self, prompt, stream):
+        """
+        Send a chat completion request to the server
+        
+        Args:
+            prompt: Text prompt to send
+            stream: Whether to ask for a streamed response
+        
+        Returns:
+            HTTP response object
+        """
+        body = {
+            'model': self.model_name,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'stream': stream
+        }
+        
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        
+        request = urllib.request.Request(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(body).encode("utf-8"),
+            headers=headers,
+            method="POST"
+        )
+        return urllib.request.urlopen(request, timeout=self.timeout)
+    
+    def generate(self, prompt):
+        """
+        Generate a complete response
+        
+        Args:
+            prompt: Text prompt to send
+        
+        Returns:
+            Response text
+        """
+        with self.open_request(prompt, stream=False) as response:
+            data = json.loads(response.read().decode("utf-8"))
+        
+        return data['choices'][0]['message']['content']
+    
+    def stream(self, prompt):
+        """
+        Generate a response piece by piece (server-sent events)
+        
+        Args:
+            prompt: Text prompt to send
+        
+        Yields:
+            Pieces of the response text
+        """
+        with self.open_request(prompt, stream=True) as response:
+            for raw_line in response:
+                line = raw_line.decode("utf-8").strip()
+                
+                # Events look like "data: {...}", the last one is "data: [DONE]"
+                if not line.startswith("data:"):
+                    continue
+                
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                
+                delta = json.loads(payload)['choices'][0].get('delta', {})
+                chunk_text = delta.get('content')
+                if chunk_text:
+                    yield chunk_text
+
+class FakeBackend:
+    # The fake backend runs in-process and has no quota
+    rate_limited = False
+    
+    def __init__(self, latency=DEFAULT_FAKE_LATENCY_SECONDS,
+                 tokens_per_second=DEFAULT_FAKE_TOKENS_PER_SECOND):
+        """
+        Initialize the offline fake backend
+        Returns the same made-up text for the same prompt, with realistic timing,
+        so the whole app can be tested and benchmarked without network or quota.
+        
+        Args:
+            latency: Seconds before the first piece of text
+            tokens_per_second: Output speed after the first piece
+        """
+        self.name = FAKE_BACKEND
+        self.model_name = "fake"
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+    
+    def is_configured(self):
+        """
+        Check if the backend can send requests
+        
+        Returns:
+            Always True
+        """
+        return True
+    
+    def get_setup_message(self):
+        """
+        Get the message shown when the backend is not configured
+        
+        Returns:
+            Error message string
+        """
+        return "Error: Fake AI backend not available."
+    
+    def build_response_words(self, prompt):
+        """
+        Build a deterministic response for a prompt
+        
+        Args:
+            prompt: Text prompt
+        
+        Returns:
+            List of response words (each ending with a space or newline)
+        """
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        
+        # Response length grows slowly with the prompt, like a real summary
+        point_count = 3 + min(len(prompt) // 2000, 12)
+        
+        # Prompts asking for sections get every heading, each followed by points
+        headings = FAKE_SECTION_HEADING_PATTERN.findall(prompt) or [None]
+        
+        words = []
+        for heading in headings:
+            if heading:
+                words.append(f"{heading}\n")
+            for point_number in range(point_count):
+                words.append("- ")
+                words.append(f"Point {point_number + 1} ")
+                words.append(f"({digest[point_number * 4:point_number * 4 + 4]}) ")
+                words.append("about the lesson.\n")
+        return words
+    
+    def generate(self, prompt):
+        """
+        Generate a complete response
+        
+        Args:
+            prompt: Text prompt
+        
+        Returns:
+            Response text
+        """
+        words = self.build_response_words(prompt)
+        time.sleep(self.latency + len(words) / self.tokens_per_second)
+        return "".join(words)
+    
+    def stream(self, prompt):
+        """
+        Generate a response piece by piece
+        
+        Args:
+            prompt: Text prompt
+        
+        Yields:
+            Response words
+        """
+        time.sleep(self.latency)
+        for word in self.build_response_words(prompt):
+            time.sleep(1 / self.tokens_per_second)
+            yield word
+
+def create_backend(backend_name, gemini_model_name, gemini_api_key):
+    """
+    Create a backend by name, reading its settings from the environment
+    
+    Args:
+        backend_name: GEMINI_BACKEND, LOCAL_BACKEND or FAKE_BACKEND
+        gemini_model_name: Model name for the Gemini backend
+        gemini_api_key: API key for the Gemini backend
+    
+    Returns:
+        Backend instance
+    """
+    if backend_name == LOCAL_BACKEND:
+        return LocalServerBackend(
+            os.getenv("LOCAL_AI_URL"),
+            os.getenv("LOCAL_AI_MODEL", DEFAULT_LOCAL_MODEL),
+            os.getenv("LOCAL_AI_API_KEY"),
+            get_timeout_setting() or DEFAULT_LOCAL_TIMEOUT_SECONDS
+        )
+    
+    if backend_name == FAKE_BACKEND:
+        return FakeBackend(
+            get_number_setting("FAKE_AI_LATENCY", DEFAULT_FAKE_LATENCY_SECONDS),
+            get_number_setting("FAKE_AI_TOKENS_PER_SECOND", DEFAULT_FAKE_TOKENS_PER_SECOND, must_be_positive=True)
+        )
+    
+    return GeminiBackend(gemini_model_name, gemini_api_key, get_timeout_setting())
@@ -3,14 +3,19 @@ Question Generator
 Creates practice questions from lesson text using AI
 """
 
-from ai.ai_client import AIClient
+from ai.ai_client import get_ai_client
+from utils.text_normalizer import normalize_text
 
 class QuestionGenerator:
+    # Bump when the prompt template changes, so cached responses are not reused
+    PROMPT_VERSION = "questions-v1"
+    
     def __init__(self):
         """
         Initialize the question generator
         """
-        self.ai_client = AIClient()
+        # Shared client (the model is set up once per process)
+        self.ai_client = get_ai_client()
     
     def generate(self, text):
         """
@@ -26,14 +31,41 @@ class QuestionGenerator:
         if not text or text.strip() == "":
             return "No text provided"
         
+        # Fewer input tokens: drop leftover PDF line breaks and spaces
+        text = normalize_text(text)
+        
         # Build prompt
         prompt = self.build_prompt(text)
         
         # Get AI response
-        questions = self.ai_client.send_prompt(prompt)
+        questions = self.ai_client.send_prompt(prompt, prompt_version=self.PROMPT_VERSION)
         
         return questions
     
+    def generate_stream(self, text):
+        """
+        Generate practice questions from the given text, streamed piece by piece
+        
+        Args:
+            text: Input text to generate questions from
+            
+        Yields:
+            Pieces of the questions text
+        """
+        # Check if text is empty
+        if not text or text.strip() == "":
+            yield "No text provided"
+            return
+        
+        # Fewer input tokens: drop leftover PDF line breaks and spaces
+        text = normalize_text(text)
+        
+        # Build prompt
+        prompt = self.build_prompt(text)
+        
+        # Stream AI response
+        yield from self.ai_client.stream_prompt(prompt, prompt_version=self.PROMPT_VERSION)
+    
     def build_prompt(self, text):
         """
         Build the AI prompt for question generation
@@ -0,0 +1,272 @@
+"""
+Rate Limiter
+Keeps AI requests within the API quota and retries failed requests with backoff
+"""
+
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+# Request priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Maximum number of AI requests in flight at the same time, app-wide
+# (also the number of AI jobs the views run at once)
+MAX_REQUESTS_IN_FLIGHT = 3
+
+# Rough number of characters per token in English text
+CHARS_PER_TOKEN = 4
+
+# Default limits (override in .env)
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_TOKENS_PER_MINUTE = 250000
+DEFAULT_MAX_RETRIES = 4
+
+# Backoff timing for retryable errors (seconds)
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Words in error messages that mean "try again later"
+RETRYABLE_ERROR_MARKERS = [
+    "429",
+    "quota",
+    "rate limit",
+    "resource exhausted",
+    "resourceexhausted",
+    "503",
+    "unavailable",
+    "deadline",
+    "timeout",
+    "timed out",
+    "500 internal",
+]
+
+def estimate_tokens(text):
+    """
+    Roughly estimate the number of tokens in a text
+    About 4 characters per token for English text
+    
+    Args:
+        text: Text to measure
+    
+    Returns:
+        Estimated token count (at least 1)
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def is_retryable_error(error):
+    """
+    Check if an API error is temporary and worth retrying
+    
+    Args:
+        error: Exception raised by the AI service
+    
+    Returns:
+        True if the request should be retried
+    """
+    error_text = f"{type(error).__name__} {error}".lower()
+    for marker in RETRYABLE_ERROR_MARKERS:
+        if marker in error_text:
+            return True
+    return False
+
+def is_quota_error(error):
+    """
+    Check if an API error means the quota is used up
+    
+    Args:
+        error: Exception raised by the AI service
+    
+    Returns:
+        True if the error is a quota / rate limit error
+    """
+    error_text = f"{type(error).__name__} {error}".lower()
+    return "429" in error_text or "quota" in error_text or "exhausted" in error_text
+
+def is_timeout_error(error):
+    """
+    Check if an API error means the request took too long
+    
+    Args:
+        error: Exception raised by the AI service
+    
+    Returns:
+        True if the error is a timeout
+    """
+    error_text = f"{type(error).__name__} {error}".lower()
+    return "timeout" in error_text or "timed out" in error_text or "deadline" in error_text
+
+def get_backoff_delay(attempt):
+    """
+    Get the wait time before a retry (exponential backoff with jitter)
+    
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+    
+    Returns:
+        Delay in seconds
+    """
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+    
+    # Random jitter so many waiting requests don't retry at the same moment
+    return delay * random.uniform(0.5, 1.0)
+
+class TokenBucket:
+    def __init__(self, capacity, per_minute):
+        """
+        Initialize a token bucket
+        
+        Args:
+            capacity: Maximum amount the bucket can hold
+            per_minute: Amount added back per minute
+        """
+        self.capacity = capacity
+        self.refill_per_second = per_minute / 60.0
+        self.available = capacity
+        self.last_refill = time.monotonic()
+    
+    def refill(self, now):
+        """
+        Add back the amount earned since the last refill
+        
+        Args:
+            now: Current monotonic time
+        """
+        elapsed = now - self.last_refill
+        self.available = min(self.capacity, self.available + elapsed * self.refill_per_second)
+        self.last_refill = now
+    
+    def wait_time(self, amount):
+        """
+        Get how long until the bucket holds the given amount
+        
+        Args:
+            amount: Amount needed
+        
+        Returns:
+            Seconds to wait (0 if available now)
+        """
+        # Requests bigger than the bucket only need a full bucket
+        amount = min(amount, self.capacity)
+        missing = amount - self.available
+        if missing <= 0:
+            return 0
+        return missing / self.refill_per_second
+    
+    def take(self, amount):
+        """
+        Remove an amount from the bucket
+        
+        Args:
+            amount: Amount to remove
+        """
+        self.available -= min(amount, self.capacity)
+
+class RateLimiter:
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            requests_per_minute: Maximum requests per minute
+            tokens_per_minute: Maximum input tokens per minute
+        """
+        self.request_bucket = TokenBucket(requests_per_minute, requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute, tokens_per_minute)
+        
+        # Waiting requests, ordered by (priority, arrival order)
+        self.waiting = []
+        self.arrival_counter = itertools.count()
+        
+        # Set after a quota error: nobody sends until this time
+        self.paused_until = 0
+        
+        self.condition = threading.Condition()
+    
+    def acquire(self, tokens, priority=PRIORITY_INTERACTIVE):
+        """
+        Wait until a request may be sent
+        Interactive requests are served before background ones.
+        
+        Args:
+            tokens: Estimated tokens of the request
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+        """
+        with self.condition:
+            ticket = (priority, next(self.arrival_counter))
+            heapq.heappush(self.waiting, ticket)
+            
+            try:
+                while True:
+                    # Only the first request in line may take from the buckets
+                    if self.waiting[0] != ticket:
+                        self.condition.wait()
+                        continue
+                    
+                    now = time.monotonic()
+                    self.request_bucket.refill(now)
+                    self.token_bucket.refill(now)
+                    
+                    wait = max(
+                        self.paused_until - now,
+                        self.request_bucket.wait_time(1),
+                        self.token_bucket.wait_time(tokens)
+                    )
+                    
+                    if wait <= 0:
+                        self.request_bucket.take(1)
+                        self.token_bucket.take(tokens)
+                        return
+                    
+                    # Wake up early if something changes (e.g. a higher priority request arrives)
+                    self.condition.wait(wait)
+            finally:
+                # Leave the line and let the next request check the buckets
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                self.condition.notify_all()
+    
+    def pause(self, seconds):
+        """
+        Stop all requests for a while (used after a quota error)
+        
+        Args:
+            seconds: How long to pause
+        """
+        with self.condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.condition.notify_all()
+
+# Shared limiter (the quota belongs to the API key, not to one client)
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Get the shared rate limiter, configured from .env on first use
+    GEMINI_REQUESTS_PER_MINUTE and GEMINI_TOKENS_PER_MINUTE set the limits.
+    
+    Returns:
+        Shared RateLimiter instance
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            requests_per_minute = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE))
+            tokens_per_minute = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE))
+            _rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    return _rate_limiter
+
+def get_max_retries():
+    """
+    Get how many times a failed request is retried (GEMINI_MAX_RETRIES in .env)
+    
+    Returns:
+        Number of retries
+    """
+    return int(os.getenv("GEMINI_MAX_RETRIES", DEFAULT_MAX_RETRIES))
@@ -0,0 +1,211 @@
+"""
+Response Cache
+Stores AI responses on disk so repeated prompts don't use API quota
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+# Cache database lives next to the lessons database (study_buddy.db)
+CACHE_DB_NAME = "study_buddy_cache.db"
+
+# Eviction limits
+DEFAULT_MAX_SIZE_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+class ResponseCache:
+    def __init__(self, db_name=CACHE_DB_NAME, max_size_bytes=DEFAULT_MAX_SIZE_BYTES,
+                 max_age_days=DEFAULT_MAX_AGE_DAYS):
+        """
+        Initialize the response cache
+        
+        Args:
+            db_name: Name of the cache database file
+            max_size_bytes: Maximum total size of cached responses
+            max_age_days: Responses not used for this many days are removed
+        """
+        self.db_name = db_name
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        
+        # Hit/miss counters for this session
+        self.hits = 0
+        self.misses = 0
+        
+        # The cache is used from background threads, so guard the connection
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.db_name, check_same_thread=False)
+        self.create_tables()
+    
+    def create_tables(self):
+        """
+        Create the cache table
+        """
+        create_responses_table = """
+        CREATE TABLE IF NOT EXISTS responses (
+            cache_key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """
+        with self.lock:
+            self.connection.execute(create_responses_table)
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)"
+            )
+            self.connection.commit()
+    
+    def make_key(self, model_name, prompt_version, prompt):
+        """
+        Build a cache key for a prompt
+        
+        Args:
+            model_name: Name of the AI model
+            prompt_version: Version of the prompt template (changing it invalidates old entries)
+            prompt: Full prompt text
+        
+        Returns:
+            Hex digest string
+        """
+        # Whitespace differences should not cause a cache miss
+        normalized_prompt = " ".join(prompt.split())
+        
+        key_source = f"{model_name}\n{prompt_version}\n{normalized_prompt}"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    
+    def get(self, cache_key):
+        """
+        Look up a cached response
+        
+        Args:
+            cache_key: Key from make_key()
+        
+        Returns:
+            Cached response text, or None if not cached
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT response, last_used FROM responses WHERE cache_key = ?",
+                (cache_key,)
+            ).fetchone()
+            
+            # Treat expired entries as missing
+            now = time.time()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            
+            # Mark entry as recently used (for LRU eviction)
+            self.connection.execute(
+                "UPDATE responses SET last_used = ? WHERE cache_key = ?",
+                (now, cache_key)
+            )
+            self.connection.commit()
+            
+            self.hits += 1
+            return row[0]
+    
+    def put(self, cache_key, response):
+        """
+        Store a response in the cache
+        
+        Args:
+            cache_key: Key from make_key()
+            response: Response text to store
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        
+        with self.lock:
+            self.connection.execute(
+                """
+                INSERT OR REPLACE INTO responses (cache_key, response, size, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (cache_key, response, size, now, now)
+            )
+            self.evict(now)
+            self.connection.commit()
+    
+    def evict(self, now):
+        """
+        Remove expired entries, then least recently used ones until under the size limit
+        Caller must hold the lock.
+        
+        Args:
+            now: Current timestamp
+        """
+        # Age-based eviction
+        self.connection.execute(
+            "DELETE FROM responses WHERE last_used < ?",
+            (now - self.max_age_seconds,)
+        )
+        
+        # Size-based eviction (least recently used first)
+        total_size = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        
+        if total_size <= self.max_size_bytes:
+            return
+        
+        rows = self.connection.execute(
+            "SELECT cache_key, size FROM responses ORDER BY last_used ASC"
+        ).fetchall()
+        
+        keys_to_delete = []
+        for cache_key, size in rows:
+            if total_size <= self.max_size_bytes:
+                break
+            keys_to_delete.append((cache_key,))
+            total_size -= size
+        
+        self.connection.executemany("DELETE FROM responses WHERE cache_key = ?", keys_to_delete)
+    
+    def clear(self):
+        """
+        Remove every cached response
+        """
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+    
+    def get_stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, misses, entries and total size in bytes
+        """
+        with self.lock:
+            entries, total_size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': entries,
+            'size_bytes': total_size
+        }
+
+# Shared cache instance (created on first use)
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Get the shared response cache
+    
+    Returns:
+        Shared ResponseCache instance
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+    return _response_cache
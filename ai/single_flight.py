@@ -0,0 +1,127 @@
+"""
+Single Flight
+Lets identical AI requests that run at the same time share one API call
+"""
+
+import threading
+
+class InFlightCall:
+    def __init__(self):
+        """
+        Initialize an in-flight call
+        The first caller (the leader) makes the request, other callers wait for it
+        """
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        
+        # Set when the leader stopped without a result (e.g. it was cancelled)
+        self.abandoned = False
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Initialize the request coalescer
+        """
+        # In-flight calls by request key
+        self.calls = {}
+        self.lock = threading.Lock()
+        
+        # Metrics
+        self.calls_made = 0
+        self.calls_saved = 0
+    
+    def begin(self, key):
+        """
+        Join the in-flight call for a key, or start a new one
+        
+        Args:
+            key: Request key (e.g. the response cache key)
+        
+        Returns:
+            Tuple of (call, is_leader). The leader must call finish().
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                self.calls_saved += 1
+                return call, False
+            
+            call = InFlightCall()
+            self.calls[key] = call
+            self.calls_made += 1
+            return call, True
+    
+    def finish(self, key, call, result=None, error=None, abandoned=False):
+        """
+        Publish the outcome of a call and wake up the waiting callers
+        
+        Args:
+            key: Request key
+            call: InFlightCall returned by begin()
+            result: Response text (on success)
+            error: Exception (on failure)
+            abandoned: True if the leader stopped without an outcome
+        """
+        with self.lock:
+            if self.calls.get(key) is call:
+                del self.calls[key]
+        
+        call.result = result
+        call.error = error
+        call.abandoned = abandoned
+        call.done.set()
+    
+    def do(self, key, function, *args):
+        """
+        Run a function once for all concurrent callers with the same key
+        
+        Args:
+            key: Request key
+            function: Function that makes the request
+            *args: Arguments for the function
+        
+        Returns:
+            Result of the function (shared by all callers)
+        
+        Raises:
+            The function's exception, for the leader and all waiting callers
+        """
+        while True:
+            call, is_leader = self.begin(key)
+            if is_leader:
+                break
+            
+            # Wait for the leader; if it gave up, try to become the leader
+            call.done.wait()
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            result = function(*args)
+        except Exception as e:
+            self.finish(key, call, error=e)
+            raise
+        except BaseException:
+            self.finish(key, call, abandoned=True)
+            raise
+        
+        self.finish(key, call, result=result)
+        return result
+    
+    def get_stats(self):
+        """
+        Get coalescing statistics
+        
+        Returns:
+            Dictionary with calls made, calls saved and calls currently in flight
+        """
+        with self.lock:
+            return {
+                'calls_made': self.calls_made,
+                'calls_saved': self.calls_saved,
+                'in_flight': len(self.calls)
+            }
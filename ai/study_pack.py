@@ -0,0 +1,192 @@
+"""
+Study Pack Generator
+Creates a summary and practice questions for a lesson with a single AI request
+"""
+
+import re
+from ai.ai_client import get_ai_client, is_error_response
+from ai.summarizer import Summarizer, CHUNK_TOKEN_BUDGET
+from ai.question_generator import QuestionGenerator
+from ai.rate_limiter import estimate_tokens, PRIORITY_INTERACTIVE
+from utils.text_normalizer import normalize_text
+
+# Section headings the AI is asked to use, so the response can be split
+SUMMARY_HEADING = "### SUMMARY"
+QUESTIONS_HEADING = "### QUESTIONS"
+
+# Models do not always copy the headings exactly, so any heading level,
+# bold text, a colon or other capitalization is accepted: "## Summary", "**Questions:**"
+SECTION_HEADING_PATTERN = re.compile(
+    r"^[ \t]*(?:#{1,6}[ \t]*)?(?:\*\*|__)?[ \t]*(summary|questions)[ \t]*:?[ \t]*(?:\*\*|__)?[ \t]*:?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Shown in the questions box when the response has no questions section
+MISSING_QUESTIONS_MESSAGE = "Error: The AI response did not contain any questions. Please try again."
+
+class StudyPackGenerator:
+    # Bump when the prompt template changes, so cached responses are not reused
+    PROMPT_VERSION = "study-pack-v1"
+    REDUCE_PROMPT_VERSION = "study-pack-reduce-v1"
+    
+    def __init__(self):
+        """
+        Initialize the study pack generator
+        """
+        # Shared client (the model is set up once per process)
+        self.ai_client = get_ai_client()
+        
+        # Used to fill the summary and question caches with the results
+        self.summarizer = Summarizer()
+        self.question_generator = QuestionGenerator()
+    
+    def generate(self, text):
+        """
+        Generate a summary and practice questions from the given text
+        The lesson is sent once instead of once per feature.
+        
+        Args:
+            text: Input lesson text
+        
+        Returns:
+            Dictionary with 'summary' and 'questions' text
+        """
+        # Check if text is empty
+        if not text or text.strip() == "":
+            return {'summary': "No text provided", 'questions': "No text provided"}
+        
+        # Same cleaning as the separate generators, so the cache entries match
+        text = normalize_text(text)
+        
+        # Long lessons do not fit in one prompt: they are summarized chunk by
+        # chunk, and one combining request writes both sections from the parts
+        if estimate_tokens(text) > CHUNK_TOKEN_BUDGET:
+            partial_summaries, error = self.summarizer.reduce_long_text(text)
+            if error:
+                return {'summary': error, 'questions': error}
+            
+            prompt = self.build_reduce_prompt(partial_summaries)
+            prompt_version = self.REDUCE_PROMPT_VERSION
+            summary_prompt = self.summarizer.build_reduce_prompt(partial_summaries)
+            summary_prompt_version = self.summarizer.REDUCE_PROMPT_VERSION
+        else:
+            prompt = self.build_prompt(text)
+            prompt_version = self.PROMPT_VERSION
+            summary_prompt = self.summarizer.build_prompt(text)
+            summary_prompt_version = self.summarizer.PROMPT_VERSION
+        
+        # Get AI response (and which backend answered it); the student is
+        # waiting for it, like for a single-feature request
+        response_info = {}
+        response = self.ai_client.send_prompt(
+            prompt,
+            prompt_version=prompt_version,
+            priority=PRIORITY_INTERACTIVE,
+            response_info=response_info
+        )
+        
+        # Show errors in both places
+        if is_error_response(response):
+            return {'summary': response, 'questions': response}
+        
+        study_pack = self.parse_response(response)
+        if not study_pack['questions']:
+            study_pack['questions'] = MISSING_QUESTIONS_MESSAGE
+            return study_pack
+        
+        # Later "Summarize" / "Generate Questions" clicks on the same text are served from the cache
+        self.ai_client.store_response(
+            summary_prompt, summary_prompt_version, study_pack['summary'], response_info['backend']
+        )
+        self.ai_client.store_response(
+            self.question_generator.build_prompt(text),
+            self.question_generator.PROMPT_VERSION,
+            study_pack['questions'],
+            response_info['backend']
+        )
+        
+        return study_pack
+    
+    def build_prompt(self, text):
+        """
+        Build the AI prompt for a study pack
+        
+        Args:
+            text: Lesson text
+        
+        Returns:
+            Formatted prompt string
+        """
+        prompt = f"""Read the following lesson and create study material for a university student.
+        Only use information from the lesson text.
+
+        Write exactly two sections, using these headings on their own lines:
+        {SUMMARY_HEADING}
+        A summary of the lesson in simple language, using bullet points.
+        {QUESTIONS_HEADING}
+        5 practice questions with a mix of question types (multiple choice, short answer, etc.).
+
+        Lesson text:
+        {text}
+        """
+        
+        return prompt
+    
+    def build_reduce_prompt(self, partial_summaries):
+        """
+        Build the AI prompt for the study pack of a long lesson
+        
+        Args:
+            partial_summaries: List of partial summary strings, in lesson order
+        
+        Returns:
+            Formatted prompt string
+        """
+        combined_summaries = "\n\n".join(partial_summaries)
+        
+        prompt = f"""The following are summaries of consecutive parts of one lesson.
+        Create study material for a university student from them.
+        Only use information from these summaries.
+
+        Write exactly two sections, using these headings on their own lines:
+        {SUMMARY_HEADING}
+        A single summary of the lesson in simple language, using bullet points, without repeated points.
+        {QUESTIONS_HEADING}
+        5 practice questions covering the whole lesson, with a mix of question types (multiple choice, short answer, etc.).
+
+        Part summaries:
+        {combined_summaries}
+        """
+        
+        return prompt
+    
+    def parse_response(self, response):
+        """
+        Split an AI response into its summary and questions sections
+        
+        Args:
+            response: Raw response text
+        
+        Returns:
+            Dictionary with 'summary' and 'questions' text
+        """
+        # First heading line of each section
+        headings = {}
+        for match in SECTION_HEADING_PATTERN.finditer(response):
+            headings.setdefault(match.group(1).lower(), match)
+        
+        # If the headings are missing, show the whole response as the summary
+        if 'summary' not in headings or 'questions' not in headings:
+            return {'summary': response.strip(), 'questions': ""}
+        
+        summary_heading = headings['summary']
+        questions_heading = headings['questions']
+        
+        if summary_heading.start() < questions_heading.start():
+            summary = response[summary_heading.end():questions_heading.start()]
+            questions = response[questions_heading.end():]
+        else:
+            questions = response[questions_heading.end():summary_heading.start()]
+            summary = response[summary_heading.end():]
+        
+        return {'summary': summary.strip(), 'questions': questions.strip()}
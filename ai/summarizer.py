@@ -1,16 +1,168 @@
 """
 Text Summarizer
 Generates summaries from lesson text using AI
+Long lessons are split into chunks, summarized in parallel, then combined (map-reduce)
 """
 
-from ai.ai_client import AIClient
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from ai.ai_client import get_ai_client, is_error_response
+from ai.rate_limiter import estimate_tokens, CHARS_PER_TOKEN, PRIORITY_BACKGROUND
+from utils.text_normalizer import normalize_text
+
+# Lessons longer than this (in tokens) are summarized chunk by chunk
+CHUNK_TOKEN_BUDGET = 6000
+
+# Content-defined chunk sizes (in tokens): chunks end where the text itself
+# says so, so editing one paragraph only changes the chunk around it
+MIN_CHUNK_TOKENS = 1500
+TARGET_CHUNK_TOKENS = 3000
+
+# Maximum number of chunks summarized at the same time (requests also
+# share the client's app-wide limit, see MAX_REQUESTS_IN_FLIGHT)
+MAX_PARALLEL_CHUNKS = 4
+
+# Pieces of a chunk are joined with a paragraph break
+CHUNK_SEPARATOR = "\n\n"
+
+# Partial summaries are summarized again at most this many times; after
+# that they are cut to fit the final request
+MAX_REDUCE_ROUNDS = 3
+
+def split_text_into_chunks(text, max_tokens=CHUNK_TOKEN_BUDGET):
+    """
+    Split text into content-defined chunks under a token budget
+    Chunks end at paragraph boundaries chosen by a hash of the paragraph,
+    not by position. Inserting or editing a paragraph therefore leaves the
+    other chunks unchanged, so their cached summaries can be reused.
+    
+    Args:
+        text: Text to split
+        max_tokens: Maximum estimated tokens per chunk
+    
+    Returns:
+        List of chunk strings
+    """
+    min_tokens = min(MIN_CHUNK_TOKENS, max_tokens // 2)
+    target_tokens = min(TARGET_CHUNK_TOKENS, max_tokens)
+    
+    chunks = []
+    current_parts = []
+    
+    # Length of the chunk so far, counting the separators between its pieces
+    current_length = 0
+    
+    for piece in split_text_into_pieces(text, max_tokens):
+        piece_tokens = estimate_tokens(piece)
+        
+        # Forced boundary: this piece would not fit
+        joined_length = current_length + len(CHUNK_SEPARATOR) + len(piece)
+        if current_parts and joined_length // CHARS_PER_TOKEN > max_tokens:
+            chunks.append(CHUNK_SEPARATOR.join(current_parts))
+            current_parts = []
+            current_length = 0
+        
+        if current_parts:
+            current_length += len(CHUNK_SEPARATOR)
+        current_parts.append(piece)
+        current_length += len(piece)
+        
+        # Content-defined boundary: decided by the piece's own text
+        if current_length // CHARS_PER_TOKEN >= min_tokens and is_chunk_boundary(piece, piece_tokens, target_tokens):
+            chunks.append(CHUNK_SEPARATOR.join(current_parts))
+            current_parts = []
+            current_length = 0
+    
+    if current_parts:
+        chunks.append(CHUNK_SEPARATOR.join(current_parts))
+    
+    return chunks
+
+def split_text_into_pieces(text, max_tokens):
+    """
+    Split text into paragraphs, breaking very long paragraphs into sentences
+    
+    Args:
+        text: Text to split
+        max_tokens: Maximum estimated tokens per piece
+    
+    Returns:
+        List of text pieces
+    """
+    # Paragraphs are separated by blank lines
+    paragraphs = re.split(r"\n\s*\n", text)
+    
+    pieces = []
+    for paragraph in paragraphs:
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        
+        if estimate_tokens(paragraph) > max_tokens:
+            pieces.extend(split_long_paragraph(paragraph, max_tokens))
+        else:
+            pieces.append(paragraph)
+    
+    return pieces
+
+def is_chunk_boundary(piece, piece_tokens, target_tokens):
+    """
+    Decide if a chunk should end after this piece
+    The chance grows with the piece size, so chunks average about target_tokens
+    
+    Args:
+        piece: Text of the piece
+        piece_tokens: Estimated tokens of the piece
+        target_tokens: Average chunk size to aim for
+    
+    Returns:
+        True if the chunk should end here
+    """
+    # Whitespace changes should not move boundaries
+    normalized_piece = " ".join(piece.split())
+    digest = hashlib.sha1(normalized_piece.encode("utf-8")).hexdigest()
+    
+    # Turn the first 8 hex digits into a number between 0 and 1
+    hash_fraction = int(digest[:8], 16) / 0xFFFFFFFF
+    return hash_fraction < piece_tokens / target_tokens
+
+def split_long_paragraph(paragraph, max_tokens):
+    """
+    Split a paragraph that is too long for one chunk
+    Splits at sentence ends, and cuts sentences that are still too long
+    
+    Args:
+        paragraph: Paragraph text
+        max_tokens: Maximum estimated tokens per piece
+    
+    Returns:
+        List of text pieces
+    """
+    max_characters = max_tokens * CHARS_PER_TOKEN
+    
+    pieces = []
+    for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+        while len(sentence) > max_characters:
+            pieces.append(sentence[:max_characters])
+            sentence = sentence[max_characters:]
+        if sentence:
+            pieces.append(sentence)
+    
+    return pieces
 
 class Summarizer:
+    # Bump when the prompt template changes, so cached responses are not reused
+    PROMPT_VERSION = "summary-v1"
+    CHUNK_PROMPT_VERSION = "summary-chunk-v1"
+    REDUCE_PROMPT_VERSION = "summary-reduce-v1"
+    
     def __init__(self):
         """
         Initialize the summarizer
         """
-        self.ai_client = AIClient()
+        # Shared client (the model is set up once per process)
+        self.ai_client = get_ai_client()
     
     def summarize(self, text):
         """
@@ -18,7 +170,7 @@ class Summarizer:
         
         Args:
             text: Input text to summarize
-            
+        
         Returns:
             Summary text
         """
@@ -26,21 +178,153 @@ class Summarizer:
         if not text or text.strip() == "":
             return "No text provided"
         
+        # Fewer input tokens: drop leftover PDF line breaks and spaces
+        text = normalize_text(text)
+        
+        # Long lessons are summarized in chunks
+        if estimate_tokens(text) > CHUNK_TOKEN_BUDGET:
+            prompt = self.build_long_text_prompt(text)
+            if is_error_response(prompt):
+                return prompt
+            return self.ai_client.send_prompt(prompt, prompt_version=self.REDUCE_PROMPT_VERSION)
+        
         # Build prompt
         prompt = self.build_prompt(text)
         
         # Get AI response
-        summary = self.ai_client.send_prompt(prompt)
+        summary = self.ai_client.send_prompt(prompt, prompt_version=self.PROMPT_VERSION)
         
         return summary
     
+    def summarize_stream(self, text):
+        """
+        Generate a summary of the given text, streamed piece by piece
+        For long lessons only the final (combining) step is streamed
+        
+        Args:
+            text: Input text to summarize
+        
+        Yields:
+            Pieces of the summary text
+        """
+        # Check if text is empty
+        if not text or text.strip() == "":
+            yield "No text provided"
+            return
+        
+        # Fewer input tokens: drop leftover PDF line breaks and spaces
+        text = normalize_text(text)
+        
+        # Long lessons are summarized in chunks first
+        if estimate_tokens(text) > CHUNK_TOKEN_BUDGET:
+            prompt = self.build_long_text_prompt(text)
+            if is_error_response(prompt):
+                yield prompt
+                return
+            yield from self.ai_client.stream_prompt(prompt, prompt_version=self.REDUCE_PROMPT_VERSION)
+            return
+        
+        # Build prompt
+        prompt = self.build_prompt(text)
+        
+        # Stream AI response
+        yield from self.ai_client.stream_prompt(prompt, prompt_version=self.PROMPT_VERSION)
+    
+    def build_long_text_prompt(self, text):
+        """
+        Summarize a long text chunk by chunk and build the final combining prompt
+        
+        Args:
+            text: Long text to summarize
+        
+        Returns:
+            Prompt that combines the partial summaries, or an error message
+        """
+        partial_summaries, error = self.reduce_long_text(text)
+        if error:
+            return error
+        
+        return self.build_reduce_prompt(partial_summaries)
+    
+    def reduce_long_text(self, text):
+        """
+        Summarize a long text chunk by chunk until the partial summaries fit in one request
+        Partial summaries that are still too long are reduced again, up to
+        MAX_REDUCE_ROUNDS times.
+        
+        Args:
+            text: Long text to summarize
+        
+        Returns:
+            Tuple of (partial summaries in lesson order, error message).
+            The error message is None unless a chunk failed.
+        """
+        partial_text = text
+        
+        for _ in range(MAX_REDUCE_ROUNDS):
+            chunks = split_text_into_chunks(partial_text)
+            partial_summaries = self.summarize_chunks(chunks)
+            
+            # Stop on the first failed chunk
+            for partial_summary in partial_summaries:
+                if is_error_response(partial_summary):
+                    return [], partial_summary
+            
+            partial_text = "\n\n".join(partial_summaries)
+            
+            # Combine once the partial summaries fit in one request
+            if estimate_tokens(partial_text) <= CHUNK_TOKEN_BUDGET or len(chunks) == 1:
+                return partial_summaries, None
+        
+        # The summaries are not getting shorter: keep what fits in one request
+        return [partial_text[:CHUNK_TOKEN_BUDGET * CHARS_PER_TOKEN]], None
+    
+    def summarize_chunks(self, chunks):
+        """
+        Summarize chunks in parallel
+        The number of workers grows with the number of chunks, up to MAX_PARALLEL_CHUNKS.
+        Chunk summaries are cached by chunk text, so unchanged chunks of an
+        edited or re-uploaded lesson cost no API call.
+        
+        Args:
+            chunks: List of chunk strings
+        
+        Returns:
+            List of partial summaries, in chunk order
+        """
+        prompts = []
+        for chunk in chunks:
+            prompts.append(self.build_chunk_prompt(chunk))
+        
+        worker_count = min(len(prompts), MAX_PARALLEL_CHUNKS)
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            return list(executor.map(self.send_chunk_prompt, prompts))
+    
+    def send_chunk_prompt(self, prompt):
+        """
+        Send one chunk prompt
+        Chunks are queued behind interactive requests, since the student only
+        sees the combined summary.
+        
+        Args:
+            prompt: Chunk prompt from build_chunk_prompt()
+        
+        Returns:
+            Partial summary text
+        """
+        return self.ai_client.send_prompt(
+            prompt,
+            prompt_version=self.CHUNK_PROMPT_VERSION,
+            priority=PRIORITY_BACKGROUND
+        )
+    
     def build_prompt(self, text):
         """
         Build the AI prompt for summarization
         
         Args:
             text: Text to summarize
-            
+        
         Returns:
             Formatted prompt string
         """
@@ -53,3 +337,46 @@ class Summarizer:
         Summary:"""
         
         return prompt
+    
+    def build_chunk_prompt(self, chunk):
+        """
+        Build the AI prompt for summarizing one part of a long lesson
+        
+        Args:
+            chunk: Text of this part
+            
+        Returns:
+            Formatted prompt string
+        """
+        prompt = f"""Summarize this part of a longer lesson for a student.
+        Use short bullet points. Keep all key facts, definitions and examples.
+
+        Lesson text (one part):
+        {chunk}
+
+        Summary of this part:"""
+        
+        return prompt
+    
+    def build_reduce_prompt(self, partial_summaries):
+        """
+        Build the AI prompt that combines partial summaries into one summary
+        
+        Args:
+            partial_summaries: List of partial summary strings, in lesson order
+        
+        Returns:
+            Formatted prompt string
+        """
+        combined_summaries = "\n\n".join(partial_summaries)
+        
+        prompt = f"""The following are summaries of consecutive parts of one lesson.
+        Combine them into a single summary for a student in simple language.
+        Use bullet points and remove repeated points.
+
+        Part summaries:
+        {combined_summaries}
+
+        Summary:"""
+        
+        return prompt
@@ -4,58 +4,823 @@ Handles SQLite database operations for lessons storage
 """
 
 import sqlite3
+import hashlib
 import os
+import queue
+import re
+import threading
+import warnings
+import zlib
+from collections import Counter, namedtuple
+from concurrent.futures import Future
 from datetime import datetime
 
-class Database:
-    def __init__(self, db_name="study_buddy.db"):
+# Default database file
+DEFAULT_DB_NAME = "study_buddy.db"
+
+# Number of prepared statements each connection keeps for reuse
+CACHED_STATEMENTS = 256
+
+# A lesson without its content, for lists and selectors
+LessonSummary = namedtuple(
+    "LessonSummary",
+    ["id", "title", "academic_year", "semester", "module", "date_added", "date_added_ts"]
+)
+
+# Columns selected for a LessonSummary (everything except the content)
+LESSON_SUMMARY_COLUMNS = "id, title, academic_year, semester, module, date_added, date_added_ts"
+
+# A search hit: the lesson without its content, plus the matching text
+LessonSearchResult = namedtuple("LessonSearchResult", LessonSummary._fields + ("snippet",))
+
+# One filter value and the number of lessons that have it
+FacetValue = namedtuple("FacetValue", ["value", "count"])
+
+# Filter columns, in the order they are stored in facet keys
+FACET_FIELDS = ("academic_year", "semester", "module")
+
+# Default number of lessons per page in paged listings
+DEFAULT_PAGE_SIZE = 100
+
+# Default maximum number of search hits
+DEFAULT_SEARCH_LIMIT = 50
+
+# Search ranking weights (title, content): a match in the title counts more
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_CONTENT_WEIGHT = 1.0
+
+# The last word is only matched as a prefix from this length on, so "C++"
+# does not find every word starting with "c"
+MIN_PREFIX_LENGTH = 3
+
+# Lessons are listed newest first (id breaks ties between lessons saved in the same second)
+LESSON_ORDER = "date_added_ts DESC, id DESC"
+
+# The full-text index reads lesson text through this view, because the
+# text itself is stored compressed in lesson_contents. decompress_content()
+# is only registered on the app's connections, so other sqlite3 clients
+# cannot query lessons_fts (or the view); use the app's search instead.
+FTS_SOURCE_VIEW = """
+CREATE VIEW lessons_fts_source AS
+SELECT lessons.id AS id, lessons.title AS title, decompress_content(lesson_contents.data) AS content
+FROM lessons
+JOIN lesson_contents ON lesson_contents.content_id = lessons.content_id
+"""
+
+def get_page_cursor(lesson):
+    """
+    Get the position of a lesson in the newest-first order (see LESSON_ORDER)
+    
+    Args:
+        lesson: LessonSummary
+    
+    Returns:
+        Tuple of (date_added_ts, id); lessons further down the list have smaller cursors
+    """
+    return (lesson.date_added_ts, lesson.id)
+
+def get_content_id(content):
+    """
+    Get the id lesson text is stored under
+    
+    Args:
+        content: Lesson text
+    
+    Returns:
+        SHA-256 hex digest of the text
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def compress_content(content):
+    """
+    Prepare lesson text for storage
+    
+    Args:
+        content: Lesson text
+    
+    Returns:
+        Tuple of (content_id, compressed data). Equal texts get the same id,
+        so they are stored only once.
+    """
+    return get_content_id(content), zlib.compress(content.encode("utf-8"))
+
+def decompress_content(data):
+    """
+    Turn stored lesson text back into a string
+    Also registered as the SQL function decompress_content() on every connection.
+    
+    Args:
+        data: Compressed data from compress_content()
+    
+    Returns:
+        Lesson text, or None for missing data
+    """
+    if data is None:
+        return None
+    return zlib.decompress(data).decode("utf-8")
+
+def move_content_to_blobs(connection):
+    """
+    Migration step: copy every lesson into lessons_new, storing its text
+    compressed and deduplicated in lesson_contents
+    
+    Args:
+        connection: Connection running the migration
+    """
+    rows = connection.execute(
+        "SELECT id, title, content, academic_year, semester, module, date_added, date_added_ts FROM lessons"
+    )
+    
+    for row in rows:
+        content_id, data = compress_content(row['content'])
+        connection.execute(
+            "INSERT OR IGNORE INTO lesson_contents (content_id, data, size) VALUES (?, ?, ?)",
+            (content_id, data, len(row['content']))
+        )
+        connection.execute(
+            """
+            INSERT INTO lessons_new
+            (id, title, content_id, academic_year, semester, module, date_added, date_added_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (row['id'], row['title'], content_id, row['academic_year'], row['semester'],
+             row['module'], row['date_added'], row['date_added_ts'])
+        )
+
+# Schema migrations, applied in order. PRAGMA user_version stores how many
+# have run, so each one runs exactly once per database file. A step is an
+# SQL statement or a Python function taking the connection. Never edit a
+# shipped migration; add a new one instead.
+MIGRATIONS = [
+    # 1: lessons table with categorization fields
+    [
+        """
+        CREATE TABLE IF NOT EXISTS lessons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            academic_year TEXT NOT NULL,
+            semester TEXT NOT NULL,
+            module TEXT NOT NULL,
+            date_added TEXT NOT NULL
+        )
+        """,
+    ],
+    # 2: numeric date (Unix time) for sorting, and indexes for filters,
+    # listings and the filter dropdowns
+    [
+        "ALTER TABLE lessons ADD COLUMN date_added_ts INTEGER NOT NULL DEFAULT 0",
+        "UPDATE lessons SET date_added_ts = CAST(strftime('%s', date_added, 'utc') AS INTEGER)",
+        """
+        CREATE INDEX idx_lessons_filters
+        ON lessons (academic_year, semester, module, date_added_ts)
+        """,
+        "CREATE INDEX idx_lessons_date ON lessons (date_added_ts)",
+        "CREATE INDEX idx_lessons_semester ON lessons (semester, date_added_ts)",
+        "CREATE INDEX idx_lessons_module ON lessons (module, date_added_ts)",
+    ],
+    # 3: full-text search index over title and content, kept in sync by triggers
+    [
         """
-        Initialize database connection
+        CREATE VIRTUAL TABLE lessons_fts USING fts5(
+            title, content,
+            content='lessons', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        """,
+        """
+        CREATE TRIGGER lessons_fts_insert AFTER INSERT ON lessons BEGIN
+            INSERT INTO lessons_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER lessons_fts_delete AFTER DELETE ON lessons BEGIN
+            INSERT INTO lessons_fts (lessons_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER lessons_fts_update AFTER UPDATE OF title, content ON lessons BEGIN
+            INSERT INTO lessons_fts (lessons_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO lessons_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+        """,
+        "INSERT INTO lessons_fts (lessons_fts) VALUES ('rebuild')",
+    ],
+    # 4: lesson text moves to a content-addressed table of compressed texts
+    # (the lessons table is rebuilt without its content column)
+    [
+        "DROP TRIGGER lessons_fts_insert",
+        "DROP TRIGGER lessons_fts_delete",
+        "DROP TRIGGER lessons_fts_update",
+        "DROP TABLE lessons_fts",
+        """
+        CREATE TABLE lesson_contents (
+            content_id TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE lessons_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            content_id TEXT NOT NULL REFERENCES lesson_contents (content_id),
+            academic_year TEXT NOT NULL,
+            semester TEXT NOT NULL,
+            module TEXT NOT NULL,
+            date_added TEXT NOT NULL,
+            date_added_ts INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        move_content_to_blobs,
+        # Keep AUTOINCREMENT's "never reuse an id" promise across the rebuild
+        """
+        UPDATE sqlite_sequence
+        SET seq = (SELECT seq FROM sqlite_sequence WHERE name = 'lessons')
+        WHERE name = 'lessons_new'
+        """,
+        "DROP TABLE lessons",
+        "ALTER TABLE lessons_new RENAME TO lessons",
+        """
+        CREATE INDEX idx_lessons_filters
+        ON lessons (academic_year, semester, module, date_added_ts)
+        """,
+        "CREATE INDEX idx_lessons_date ON lessons (date_added_ts)",
+        "CREATE INDEX idx_lessons_semester ON lessons (semester, date_added_ts)",
+        "CREATE INDEX idx_lessons_module ON lessons (module, date_added_ts)",
+        "CREATE INDEX idx_lessons_content ON lessons (content_id)",
+        FTS_SOURCE_VIEW,
+        """
+        CREATE VIRTUAL TABLE lessons_fts USING fts5(
+            title, content,
+            content='lessons_fts_source', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        """,
+        # The app updates the full-text index itself, since it has the plain
+        # text at hand; this trigger only removes texts no lesson uses anymore
+        """
+        CREATE TRIGGER lesson_contents_cleanup AFTER DELETE ON lessons BEGIN
+            DELETE FROM lesson_contents
+            WHERE content_id = old.content_id
+            AND NOT EXISTS (SELECT 1 FROM lessons WHERE content_id = old.content_id);
+        END
+        """,
+        "INSERT INTO lessons_fts (lessons_fts) VALUES ('rebuild')",
+    ],
+]
+
+# Lessons with their text, as dictionaries with a 'content' key
+LESSON_WITH_CONTENT_QUERY = """
+SELECT lessons.*, decompress_content(lesson_contents.data) AS content
+FROM lessons
+JOIN lesson_contents ON lesson_contents.content_id = lessons.content_id
+"""
+
+# Connection settings: WAL lets readers run while the writer commits,
+# and synchronous=NORMAL is safe with WAL while syncing to disk far less often
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+]
+
+# Most reading connections kept open for reuse after their thread is done with them
+MAX_IDLE_READERS = 4
+
+# Times the facet index is counted on a reader before the writer counts it instead
+# (a count is thrown away if a write was committed while it ran)
+FACET_INDEX_READ_ATTEMPTS = 3
+
+class ReaderHandle:
+    def __init__(self, manager, connection):
+        """
+        Hold a thread's reading connection
+        The handle lives in the thread's local data. Python clears that data
+        when the thread ends (and after every job on Qt pool threads), which
+        gives the connection back to the manager instead of leaking it.
+        
+        Args:
+            manager: ConnectionManager the connection belongs to
+            connection: Reading connection
+        """
+        self.manager = manager
+        self.connection = connection
+    
+    def __del__(self):
+        """
+        Give the connection back to the manager
+        """
+        self.manager.release_reader(self.connection)
+
+class FacetIndex:
+    def __init__(self):
+        """
+        Initialize an empty facet index
+        Lessons are counted per (academic year, semester, module)
+        combination, which is enough to answer every filter dropdown
+        without going back to the database.
+        """
+        self.counts = Counter()
+        self.lock = threading.Lock()
+    
+    def load(self, connection):
+        """
+        Count the lessons of every filter combination in one query
+        
+        Args:
+            connection: Connection to read with
+        """
+        query = """
+        SELECT academic_year, semester, module, COUNT(*)
+        FROM lessons
+        GROUP BY academic_year, semester, module
+        """
+        counts = Counter()
+        for academic_year, semester, module, count in connection.execute(query):
+            counts[(academic_year, semester, module)] = count
+        
+        with self.lock:
+            self.counts = counts
+    
+    def add(self, keys, change=1):
+        """
+        Update the counts after lessons are saved or deleted
+        
+        Args:
+            keys: List of (academic_year, semester, module) tuples, one per lesson
+            change: 1 for saved lessons, -1 for deleted ones
+        """
+        with self.lock:
+            for key in keys:
+                self.counts[key] += change
+                if self.counts[key] <= 0:
+                    del self.counts[key]
+    
+    def get_facets(self, academic_year=None, semester=None, module=None):
+        """
+        Get the values of each filter with their lesson counts
+        Each filter only counts lessons matching the other selected
+        filters, so e.g. the modules shown depend on the chosen year.
+        
+        Args:
+            academic_year: Selected academic year (optional)
+            semester: Selected semester (optional)
+            module: Selected module (optional)
+        
+        Returns:
+            Dictionary mapping each filter column to a list of FacetValue tuples
+        """
+        selected = (academic_year, semester, module)
+        facets = {field: Counter() for field in FACET_FIELDS}
+        
+        with self.lock:
+            items = list(self.counts.items())
+        
+        for key, count in items:
+            for position, field in enumerate(FACET_FIELDS):
+                # Check the other filters only
+                matches = True
+                for other_position, value in enumerate(selected):
+                    if other_position != position and value and key[other_position] != value:
+                        matches = False
+                        break
+                
+                if matches:
+                    facets[field][key[position]] += count
+        
+        # Newest years first, everything else alphabetically
+        return {
+            field: [
+                FacetValue(value, count)
+                for value, count in sorted(
+                    facets[field].items(),
+                    reverse=(field == "academic_year")
+                )
+            ]
+            for field in FACET_FIELDS
+        }
+
+class ConnectionManager:
+    def __init__(self, db_name=DEFAULT_DB_NAME):
+        """
+        Initialize the connection manager for one database file
+        Each thread gets its own reading connection, and all writes go
+        through a single writer thread, so writers never block each other
+        and readers never wait for a commit.
         
         Args:
             db_name: Name of the database file
         """
         self.db_name = db_name
-        self.connection = None
-        self.cursor = None
         
-        # Connect and create tables on initialization
-        self.connect()
-        self.create_tables()
+        # One reading connection per thread (a ReaderHandle)
+        self.thread_connections = threading.local()
+        
+        # Every connection opened, so they can be closed on exit
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        
+        # Reading connections no thread is using, ready to be handed out again
+        self.idle_readers = []
+        
+        # Write jobs: (function, args, future), or None to stop the writer
+        self.write_queue = queue.Queue()
+        
+        # Set by close(); no reads or writes are accepted after that
+        self.closed = False
+        self.closed_lock = threading.Lock()
+        
+        # Filter value counts, loaded on first use and then kept up to date by the writer
+        self.facet_index = None
+        
+        # Increased by the writer after every change to the lessons, so views can tell when to reload
+        self.data_version = 0
+        
+        # Number of committed write jobs, so a count made on a reader can be checked for later writes
+        self.commit_count = 0
+        
+        # Lesson changes noted by the running write job, applied once it commits
+        self.pending_lesson_changes = []
+        
+        # Set up the file once, before any reads or writes
+        self.writer_connection = self.open_connection()
+        self.writer_connection.execute("PRAGMA journal_mode = WAL")
+        self.migrate(self.writer_connection)
+        
+        self.writer_thread = threading.Thread(target=self.run_writer, name="DatabaseWriter", daemon=True)
+        self.writer_thread.start()
     
-    def connect(self):
+    def open_connection(self):
         """
-        Connect to the database
+        Open a new connection with the shared settings
+        
+        Returns:
+            sqlite3 connection
         """
-        self.connection = sqlite3.connect(self.db_name)
-        self.connection.row_factory = sqlite3.Row  # Return rows as dictionaries
-        self.cursor = self.connection.cursor()
+        # A connection is only used by one thread at a time, but readers are reused across threads
+        connection = sqlite3.connect(
+            self.db_name,
+            cached_statements=CACHED_STATEMENTS,
+            check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row  # Return rows as dictionaries
+        
+        for pragma in CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        
+        # Needed to read lesson text in queries (and by search snippets)
+        connection.create_function("decompress_content", 1, decompress_content, deterministic=True)
+        
+        with self.connections_lock:
+            self.connections.append(connection)
+        return connection
     
-    def disconnect(self):
+    def migrate(self, connection):
+        """
+        Bring the database schema up to date
+        Each migration runs in its own transaction together with the
+        version bump, so a failed migration leaves the file unchanged.
+        
+        Args:
+            connection: Connection to migrate with
+        """
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        
+        for migration_number in range(version + 1, len(MIGRATIONS) + 1):
+            connection.execute("BEGIN")
+            try:
+                for step in MIGRATIONS[migration_number - 1]:
+                    if callable(step):
+                        step(connection)
+                    else:
+                        connection.execute(step)
+                connection.execute(f"PRAGMA user_version = {migration_number}")
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+        
+        # Refresh the query planner's statistics after schema changes
+        if version < len(MIGRATIONS):
+            connection.execute("ANALYZE")
+            connection.commit()
+    
+    def get_reader(self):
         """
-        Close database connection
+        Get the calling thread's reading connection, opening it on first use
+        
+        Returns:
+            sqlite3 connection
         """
-        if self.connection:
-            self.connection.close()
+        handle = getattr(self.thread_connections, 'handle', None)
+        if handle is None:
+            if self.closed:
+                raise sqlite3.ProgrammingError("Cannot read: the database is closed")
+            
+            # Reuse a reader another thread gave back, or open a new one
+            with self.connections_lock:
+                connection = self.idle_readers.pop() if self.idle_readers else None
+            if connection is None:
+                connection = self.open_connection()
+            
+            handle = ReaderHandle(self, connection)
+            self.thread_connections.handle = handle
+        return handle.connection
     
-    def create_tables(self):
+    def release_reader(self, connection):
         """
-        Create necessary database tables
+        Take back a reading connection whose thread is done with it
+        A few are kept for the next threads; the rest are closed.
+        
+        Args:
+            connection: Reading connection
         """
-        # Create lessons table with categorization fields
-        create_lessons_table = """
-        CREATE TABLE IF NOT EXISTS lessons (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            content TEXT NOT NULL,
-            academic_year TEXT NOT NULL,
-            semester TEXT NOT NULL,
-            module TEXT NOT NULL,
-            date_added TEXT NOT NULL
-        )
+        with self.connections_lock:
+            if connection not in self.connections:
+                # Already closed by close()
+                return
+            
+            if len(self.idle_readers) < MAX_IDLE_READERS:
+                self.idle_readers.append(connection)
+                return
+            
+            self.connections.remove(connection)
+        connection.close()
+    
+    def run_writer(self):
         """
-        self.cursor.execute(create_lessons_table)
-        self.connection.commit()
+        Run write jobs one at a time, each in its own transaction (writer thread)
+        """
+        while True:
+            job = self.write_queue.get()
+            if job is None:
+                break
+            
+            function, args, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            # Changes noted by a failed job are dropped with its transaction
+            self.pending_lesson_changes = []
+            
+            try:
+                # Commits on success, rolls back on error
+                with self.writer_connection:
+                    result = function(self.writer_connection, *args)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                self.commit_count += 1
+                self.apply_lesson_changes()
+                future.set_result(result)
+    
+    def submit_write(self, function, *args):
+        """
+        Queue a write without waiting for it
+        
+        Args:
+            function: Function called as function(connection, *args) on the writer thread
+            *args: Arguments for the function
+        
+        Returns:
+            Future with the function's result
+        
+        Raises:
+            sqlite3.ProgrammingError: If the manager is closed
+        """
+        future = Future()
+        
+        # Checked under the lock so no write can be queued behind close()'s stop signal
+        with self.closed_lock:
+            if self.closed:
+                raise sqlite3.ProgrammingError("Cannot write: the database is closed")
+            self.write_queue.put((function, args, future))
+        return future
+    
+    def write(self, function, *args):
+        """
+        Run a write and wait until it is committed
+        
+        Args:
+            function: Function called as function(connection, *args) on the writer thread
+            *args: Arguments for the function
+        
+        Returns:
+            The function's result
+        """
+        return self.submit_write(function, *args).result()
+    
+    def get_facet_index(self):
+        """
+        Get the facet index, loading it on first use
+        The lessons are counted on the calling thread's reader, so queued
+        writes do not hold it up. The writer only takes the count if nothing
+        was committed since it started, so no write can be missed.
+        
+        Returns:
+            FacetIndex instance
+        """
+        facet_index = self.facet_index
+        if facet_index is not None:
+            return facet_index
+        
+        for _ in range(FACET_INDEX_READ_ATTEMPTS):
+            commit_count = self.commit_count
+            facet_index = FacetIndex()
+            facet_index.load(self.get_reader())
+            
+            facet_index = self.write(self.install_facet_index, facet_index, commit_count)
+            if facet_index is not None:
+                return facet_index
+        
+        # Lessons keep being written: count them on the writer instead
+        return self.write(self.load_facet_index)
+    
+    def install_facet_index(self, connection, facet_index, commit_count):
+        """
+        Start using a facet index counted on a reader (writer thread)
+        
+        Args:
+            connection: Writer connection (unused)
+            facet_index: FacetIndex loaded on a reader
+            commit_count: Value of commit_count before it was loaded
+        
+        Returns:
+            The facet index in use, or None if writes were committed since the count
+        """
+        if self.facet_index is None:
+            if self.commit_count != commit_count:
+                return None
+            self.facet_index = facet_index
+        return self.facet_index
+    
+    def load_facet_index(self, connection):
+        """
+        Load the facet index unless another request already did (writer thread)
+        
+        Args:
+            connection: Writer connection
+        
+        Returns:
+            FacetIndex instance
+        """
+        if self.facet_index is None:
+            facet_index = FacetIndex()
+            facet_index.load(connection)
+            self.facet_index = facet_index
+        return self.facet_index
+    
+    def record_lesson_changes(self, keys, change):
+        """
+        Note saved or deleted lessons (writer thread)
+        Nothing changes until the write job commits, so a rolled back job
+        never leaves the facet counts off.
+        
+        Args:
+            keys: List of (academic_year, semester, module) tuples, one per lesson
+            change: 1 for saved lessons, -1 for deleted ones
+        """
+        self.pending_lesson_changes.append((keys, change))
+    
+    def apply_lesson_changes(self):
+        """
+        Apply the lesson changes of a committed write job (writer thread)
+        Bumps the data version and updates the facet counts, if they are loaded.
+        """
+        if not self.pending_lesson_changes:
+            return
+        
+        self.data_version += 1
+        
+        if self.facet_index is not None:
+            for keys, change in self.pending_lesson_changes:
+                self.facet_index.add(keys, change)
+        
+        self.pending_lesson_changes = []
+    
+    def close(self):
+        """
+        Finish queued writes, stop the writer and close every connection
+        Writes submitted after this raise instead of waiting forever.
+        """
+        with self.closed_lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.write_queue.put(None)
+        
+        # The writer runs everything queued before the stop signal
+        self.writer_thread.join()
+        
+        # Nothing can be queued after the stop signal, but never leave a caller waiting
+        while not self.write_queue.empty():
+            job = self.write_queue.get()
+            if job is not None:
+                job[2].set_exception(sqlite3.ProgrammingError("Cannot write: the database is closed"))
+        
+        with self.connections_lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections = []
+            self.idle_readers = []
+
+# Shared managers by database file (created on first use)
+_connection_managers = {}
+
+# Set by close_connection_managers(), so nothing reopens the files while the app exits
+_connection_managers_closed = False
+_connection_managers_lock = threading.Lock()
+
+def get_connection_manager(db_name=DEFAULT_DB_NAME):
+    """
+    Get the shared connection manager for a database file
+    
+    Args:
+        db_name: Name of the database file
+    
+    Returns:
+        Shared ConnectionManager instance
+    
+    Raises:
+        sqlite3.ProgrammingError: If close_connection_managers() was called
+    """
+    key = os.path.abspath(db_name)
+    with _connection_managers_lock:
+        if _connection_managers_closed:
+            raise sqlite3.ProgrammingError("Cannot open the database: the app is closing")
+        
+        if key not in _connection_managers:
+            _connection_managers[key] = ConnectionManager(db_name)
+        return _connection_managers[key]
+
+def close_connection_managers():
+    """
+    Close every shared connection manager (call when the app exits)
+    No new managers can be created afterwards.
+    """
+    global _connection_managers_closed
+    with _connection_managers_lock:
+        _connection_managers_closed = True
+        for connection_manager in _connection_managers.values():
+            connection_manager.close()
+        _connection_managers.clear()
+
+def build_match_expression(query):
+    """
+    Turn what the student typed into a safe full-text search expression
+    Punctuation is dropped, so input like "C++" or a stray quote cannot
+    break the search syntax.
+    
+    Args:
+        query: Search text
+    
+    Returns:
+        FTS5 match expression, or an empty string if there are no words
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return ""
+    
+    terms = []
+    for word in words:
+        terms.append(f'"{word}"')
+    
+    # Prefix match on the last word, unless it is too short to narrow anything down
+    if len(words[-1]) >= MIN_PREFIX_LENGTH:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+class Database:
+    def __init__(self, db_name=DEFAULT_DB_NAME):
+        """
+        Initialize database access
+        Instances are cheap: they share one connection manager per file,
+        and the tables are only created the first time.
+        
+        Args:
+            db_name: Name of the database file
+        """
+        self.db_name = db_name
+        self.manager = get_connection_manager(db_name)
+    
+    def connect(self):
+        """
+        Get the calling thread's reading connection
+        
+        Returns:
+            sqlite3 connection
+        """
+        return self.manager.get_reader()
+    
+    def disconnect(self):
+        """
+        Release this instance (shared connections stay open until close_connection_managers())
+        """
+        pass
     
     def save_lesson(self, title, content, academic_year, semester, module):
         """
@@ -71,75 +836,319 @@ class Database:
         Returns:
             ID of the saved lesson
         """
-        date_added = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lesson = {
+            'title': title,
+            'content': content,
+            'academic_year': academic_year,
+            'semester': semester,
+            'module': module
+        }
+        return self.insert_lessons([lesson])
+    
+    def save_lessons(self, lessons):
+        """
+        Save many lessons in a single transaction
+        Much faster than calling save_lesson() for each one, because the
+        database file is only synced to disk once.
         
-        query = """
-        INSERT INTO lessons (title, content, academic_year, semester, module, date_added)
-        VALUES (?, ?, ?, ?, ?, ?)
+        Args:
+            lessons: List of dictionaries with 'title', 'content',
+                'academic_year', 'semester' and 'module'
+            
+        Returns:
+            Number of lessons saved
         """
+        self.insert_lessons(lessons)
+        return len(lessons)
+    
+    def insert_lessons(self, lessons):
+        """
+        Insert lessons in one transaction, storing each distinct text once
+        Texts are compressed on the calling thread, so the writer thread
+        only has to insert them.
+        
+        Args:
+            lessons: List of lesson dictionaries (see save_lessons())
+            
+        Returns:
+            ID of the last inserted lesson
+        """
+        now = datetime.now()
+        date_added = now.strftime("%Y-%m-%d %H:%M:%S")
+        date_added_ts = int(now.timestamp())
+        
+        content_rows = {}
+        lesson_rows = []
+        contents = []
+        for lesson in lessons:
+            content_id, data = compress_content(lesson['content'])
+            content_rows[content_id] = (content_id, data, len(lesson['content']))
+            lesson_rows.append((
+                lesson['title'],
+                content_id,
+                lesson['academic_year'],
+                lesson['semester'],
+                lesson['module'],
+                date_added,
+                date_added_ts
+            ))
+            contents.append(lesson['content'])
+        
+        # Commits once at the end, or rolls back everything on error
+        return self.manager.write(self.write_lesson_rows, list(content_rows.values()), lesson_rows, contents)
+    
+    def write_lesson_rows(self, connection, content_rows, lesson_rows, contents):
+        """
+        Insert prepared lesson rows and index their text (runs on the writer thread)
+        
+        Args:
+            connection: Writer connection
+            content_rows: List of (content_id, data, size) tuples
+            lesson_rows: List of lesson tuples referencing the content ids
+            contents: Plain text of each lesson, in the same order as lesson_rows
+        
+        Returns:
+            ID of the last inserted lesson
+        """
+        # Texts that are already stored are skipped
+        connection.executemany(
+            "INSERT OR IGNORE INTO lesson_contents (content_id, data, size) VALUES (?, ?, ?)",
+            content_rows
+        )
+        
+        index_rows = []
+        for lesson_row, content in zip(lesson_rows, contents):
+            cursor = connection.execute(
+                """
+                INSERT INTO lessons (title, content_id, academic_year, semester, module, date_added, date_added_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                lesson_row
+            )
+            index_rows.append((cursor.lastrowid, lesson_row[0], content))
         
-        self.cursor.execute(query, (title, content, academic_year, semester, module, date_added))
-        self.connection.commit()
+        # The plain text is at hand here, so the index never has to decompress it
+        connection.executemany(
+            "INSERT INTO lessons_fts (rowid, title, content) VALUES (?, ?, ?)",
+            index_rows
+        )
         
-        return self.cursor.lastrowid
+        # Filter values are the last three columns before the dates
+        self.manager.record_lesson_changes([row[2:5] for row in lesson_rows], 1)
+        return connection.execute("SELECT last_insert_rowid()").fetchone()[0]
     
     def get_all_lessons(self):
         """
         Get all lessons from the database
+        Deprecated: loads every lesson's text. Use list_lessons_page() and
+        get_lesson_by_id() instead.
         
         Returns:
             List of all lessons as dictionaries
         """
-        query = "SELECT * FROM lessons ORDER BY date_added DESC"
-        self.cursor.execute(query)
-        return [dict(row) for row in self.cursor.fetchall()]
+        return self.get_lessons_by_filters()
     
-    def get_lesson_by_id(self, lesson_id):
+    def list_lessons_page(self, academic_year=None, semester=None, module=None,
+                          after=None, limit=DEFAULT_PAGE_SIZE):
         """
-        Get a specific lesson by ID
+        Get one page of lessons without their content, newest first
+        Pages continue from the last lesson of the previous page (keyset
+        pagination), so every page is an index lookup, however deep it is.
+        The cursor holds the sort key itself, so paging also continues after
+        that lesson was deleted.
         
         Args:
-            lesson_id: ID of the lesson
+            academic_year: Filter by academic year (optional)
+            semester: Filter by semester (optional)
+            module: Filter by module (optional)
+            after: get_page_cursor() of the last lesson of the previous page
+                (None for the first page)
+            limit: Maximum number of lessons in the page
             
         Returns:
-            Lesson dictionary or None if not found
+            List of LessonSummary tuples (fewer than limit on the last page)
         """
-        query = "SELECT * FROM lessons WHERE id = ?"
-        self.cursor.execute(query, (lesson_id,))
-        row = self.cursor.fetchone()
-        return dict(row) if row else None
+        conditions, params = self.build_filter_conditions(academic_year, semester, module)
+        
+        # Lessons that sort after the previous page's last lesson
+        if after is not None:
+            conditions.append("(date_added_ts, id) < (?, ?)")
+            params.extend(after)
+        
+        where_clause = ""
+        if conditions:
+            where_clause = " WHERE " + " AND ".join(conditions)
+        
+        query = f"SELECT {LESSON_SUMMARY_COLUMNS} FROM lessons{where_clause} ORDER BY {LESSON_ORDER} LIMIT ?"
+        
+        rows = self.connect().execute(query, params + [limit]).fetchall()
+        return [LessonSummary._make(row) for row in rows]
     
-    def get_lessons_by_filters(self, academic_year=None, semester=None, module=None):
+    def search_lessons(self, query, academic_year=None, semester=None, module=None,
+                       limit=DEFAULT_SEARCH_LIMIT):
         """
-        Get lessons filtered by category
+        Search lesson titles and content, best matches first
+        Every word must match; the last word also matches as a prefix
+        (from MIN_PREFIX_LENGTH letters), so results appear while the
+        student is still typing.
         
         Args:
+            query: Words to search for
             academic_year: Filter by academic year (optional)
             semester: Filter by semester (optional)
             module: Filter by module (optional)
+            limit: Maximum number of results
             
         Returns:
-            List of filtered lessons
+            List of LessonSearchResult tuples (snippet marks matches with [ ])
+        """
+        match_expression = build_match_expression(query)
+        if not match_expression:
+            return []
+        
+        conditions, params = self.build_filter_conditions(academic_year, semester, module)
+        filter_clause = ""
+        for condition in conditions:
+            filter_clause += f" AND lessons.{condition}"
+        
+        # Rank first, then build snippets for the returned hits only
+        search_query = f"""
+        WITH hits AS (
+            SELECT lessons_fts.rowid AS id,
+                   bm25(lessons_fts, {SEARCH_TITLE_WEIGHT}, {SEARCH_CONTENT_WEIGHT}) AS score
+            FROM lessons_fts
+            JOIN lessons ON lessons.id = lessons_fts.rowid
+            WHERE lessons_fts MATCH ?{filter_clause}
+            ORDER BY score
+            LIMIT ?
+        )
+        SELECT lessons.id, lessons.title, lessons.academic_year, lessons.semester,
+               lessons.module, lessons.date_added, lessons.date_added_ts,
+               snippet(lessons_fts, 1, '[', ']', '...', 12) AS snippet
+        FROM hits
+        JOIN lessons_fts ON lessons_fts.rowid = hits.id
+        JOIN lessons ON lessons.id = hits.id
+        WHERE lessons_fts MATCH ?
+        ORDER BY hits.score
+        """
+        
+        search_params = [match_expression] + params + [limit, match_expression]
+        rows = self.connect().execute(search_query, search_params).fetchall()
+        return [LessonSearchResult._make(row) for row in rows]
+    
+    def build_filter_clause(self, academic_year=None, semester=None, module=None):
+        """
+        Build the WHERE clause for the category filters
+        
+        Args:
+            academic_year: Filter by academic year (optional)
+            semester: Filter by semester (optional)
+            module: Filter by module (optional)
+            
+        Returns:
+            Tuple of (where clause, list of parameters). The clause is empty without filters.
+        """
+        conditions, params = self.build_filter_conditions(academic_year, semester, module)
+        
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
+    
+    def build_filter_conditions(self, academic_year=None, semester=None, module=None):
+        """
+        Build the conditions for the category filters
+        
+        Args:
+            academic_year: Filter by academic year (optional)
+            semester: Filter by semester (optional)
+            module: Filter by module (optional)
+            
+        Returns:
+            Tuple of (list of conditions, list of parameters)
         """
-        query = "SELECT * FROM lessons WHERE 1=1"
+        conditions = []
         params = []
         
         if academic_year:
-            query += " AND academic_year = ?"
+            conditions.append("academic_year = ?")
             params.append(academic_year)
         
         if semester:
-            query += " AND semester = ?"
+            conditions.append("semester = ?")
             params.append(semester)
         
         if module:
-            query += " AND module = ?"
+            conditions.append("module = ?")
             params.append(module)
         
-        query += " ORDER BY date_added DESC"
+        return conditions, params
+    
+    def get_lesson_by_id(self, lesson_id):
+        """
+        Get a specific lesson by ID
+        
+        Args:
+            lesson_id: ID of the lesson
+            
+        Returns:
+            Lesson dictionary or None if not found
+        """
+        query = f"{LESSON_WITH_CONTENT_QUERY} WHERE lessons.id = ?"
+        row = self.connect().execute(query, (lesson_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def has_content(self, content):
+        """
+        Check if a lesson with exactly this text is saved
+        
+        Args:
+            content: Lesson text
+            
+        Returns:
+            True if the text is already stored
+        """
+        query = "SELECT 1 FROM lesson_contents WHERE content_id = ?"
+        return self.connect().execute(query, (get_content_id(content),)).fetchone() is not None
+    
+    def get_lesson_summary(self, lesson_id):
+        """
+        Get a lesson without its content
+        
+        Args:
+            lesson_id: ID of the lesson
+            
+        Returns:
+            LessonSummary, or None if not found
+        """
+        query = f"SELECT {LESSON_SUMMARY_COLUMNS} FROM lessons WHERE id = ?"
+        row = self.connect().execute(query, (lesson_id,)).fetchone()
+        return LessonSummary._make(row) if row else None
+    
+    def get_lessons_by_filters(self, academic_year=None, semester=None, module=None):
+        """
+        Get lessons filtered by category
+        Deprecated: loads every matching lesson's text. Use list_lessons_page()
+        and get_lesson_by_id() instead.
+        
+        Args:
+            academic_year: Filter by academic year (optional)
+            semester: Filter by semester (optional)
+            module: Filter by module (optional)
+            
+        Returns:
+            List of filtered lessons
+        """
+        warnings.warn(
+            "get_lessons_by_filters() loads every lesson's text; use list_lessons_page() instead",
+            DeprecationWarning,
+            stacklevel=2
+        )
+        
+        where_clause, params = self.build_filter_clause(academic_year, semester, module)
+        query = f"{LESSON_WITH_CONTENT_QUERY}{where_clause} ORDER BY {LESSON_ORDER}"
         
-        self.cursor.execute(query, params)
-        return [dict(row) for row in self.cursor.fetchall()]
+        rows = self.connect().execute(query, params).fetchall()
+        return [dict(row) for row in rows]
     
     def delete_lesson(self, lesson_id):
         """
@@ -148,9 +1157,76 @@ class Database:
         Args:
             lesson_id: ID of the lesson to delete
         """
-        query = "DELETE FROM lessons WHERE id = ?"
-        self.cursor.execute(query, (lesson_id,))
-        self.connection.commit()
+        self.manager.write(self.delete_lesson_row, lesson_id)
+    
+    def delete_lesson_row(self, connection, lesson_id):
+        """
+        Delete a lesson row and update the search index and filter counts (runs on the writer thread)
+        
+        Args:
+            connection: Writer connection
+            lesson_id: ID of the lesson to delete
+        """
+        query = """
+        SELECT lessons.title, lessons.academic_year, lessons.semester, lessons.module, lesson_contents.data
+        FROM lessons
+        JOIN lesson_contents ON lesson_contents.content_id = lessons.content_id
+        WHERE lessons.id = ?
+        """
+        row = connection.execute(query, (lesson_id,)).fetchone()
+        if row is None:
+            return
+        
+        # The index needs the text it stored to remove it
+        connection.execute(
+            "INSERT INTO lessons_fts (lessons_fts, rowid, title, content) VALUES ('delete', ?, ?, ?)",
+            (lesson_id, row['title'], decompress_content(row['data']))
+        )
+        
+        connection.execute("DELETE FROM lessons WHERE id = ?", (lesson_id,))
+        self.manager.record_lesson_changes([(row['academic_year'], row['semester'], row['module'])], -1)
+    
+    def get_facets(self, academic_year=None, semester=None, module=None):
+        """
+        Get the values of each filter with their lesson counts
+        Served from an in-memory index, so filling the dropdowns does not
+        touch the database after the first call.
+        
+        Args:
+            academic_year: Selected academic year (optional)
+            semester: Selected semester (optional)
+            module: Selected module (optional)
+            
+        Returns:
+            Dictionary with 'academic_year', 'semester' and 'module' lists of
+            FacetValue tuples. Each list only counts lessons matching the
+            other selected filters.
+        """
+        return self.manager.get_facet_index().get_facets(academic_year, semester, module)
+    
+    def is_facet_index_loaded(self):
+        """
+        Check if get_facets() can answer without querying the database
+        
+        Returns:
+            True once the filter counts are loaded
+        """
+        return self.manager.facet_index is not None
+    
+    def load_facet_index(self):
+        """
+        Load the filter counts now (e.g. in the background), so get_facets() does not have to
+        """
+        self.manager.get_facet_index()
+    
+    def get_data_version(self):
+        """
+        Get a number that changes whenever lessons are saved or deleted
+        
+        Returns:
+            Current data version
+        """
+        return self.manager.data_version
     
     def get_unique_years(self):
         """
@@ -159,9 +1235,7 @@ class Database:
         Returns:
             List of academic years
         """
-        query = "SELECT DISTINCT academic_year FROM lessons ORDER BY academic_year DESC"
-        self.cursor.execute(query)
-        return [row['academic_year'] for row in self.cursor.fetchall()]
+        return [facet.value for facet in self.get_facets()['academic_year']]
     
     def get_unique_semesters(self):
         """
@@ -170,9 +1244,7 @@ class Database:
         Returns:
             List of semesters
         """
-        query = "SELECT DISTINCT semester FROM lessons ORDER BY semester"
-        self.cursor.execute(query)
-        return [row['semester'] for row in self.cursor.fetchall()]
+        return [facet.value for facet in self.get_facets()['semester']]
     
     def get_unique_modules(self):
         """
@@ -181,13 +1253,12 @@ class Database:
         Returns:
             List of modules
         """
-        query = "SELECT DISTINCT module FROM lessons ORDER BY module"
-        self.cursor.execute(query)
-        return [row['module'] for row in self.cursor.fetchall()]
+        return [facet.value for facet in self.get_facets()['module']]
     
     def execute_query(self, query, params=None):
         """
         Execute a database query
+        SELECT queries run on the calling thread; anything else goes through the writer.
         
         Args:
             query: SQL query string
@@ -196,13 +1267,34 @@ class Database:
         Returns:
             Query results
         """
-        if not self.connection:
-            self.connect()
+        params = params or ()
+        
+        if query.lstrip().upper().startswith("SELECT"):
+            return self.connect().execute(query, params).fetchall()
+        
+        return self.manager.write(self.write_query, query, params)
+    
+    def write_query(self, connection, query, params):
+        """
+        Run a query that may change lessons (runs on the writer thread)
+        
+        Args:
+            connection: Writer connection
+            query: SQL query string
+            params: Query parameters
+            
+        Returns:
+            Query results
+        """
+        changes_before = connection.total_changes
+        rows = connection.execute(query, params).fetchall()
         
-        if params:
-            self.cursor.execute(query, params)
-        else:
-            self.cursor.execute(query)
+        # The full-text index is kept in sync by save and delete, not by
+        # triggers, so rebuild it when arbitrary SQL changed anything
+        if connection.total_changes != changes_before:
+            connection.execute("INSERT INTO lessons_fts (lessons_fts) VALUES ('rebuild')")
         
-        self.connection.commit()
-        return self.cursor.fetchall()
+        # The query may have changed any lesson, so count the filter values again when next needed
+        self.manager.facet_index = None
+        self.manager.data_version += 1
+        return rows
@@ -1,13 +1,27 @@
 """
 Study Buddy - Main Entry Point
+Run with --profile-startup to print how long each startup step takes
 """
 
-from ui.app import App
+import sys
+from utils.startup_profile import start_startup_profile, record_startup_step
+
+# Command line flag for the startup timing report
+PROFILE_STARTUP_FLAG = "--profile-startup"
 
 def main():
     """
     Start the Study Buddy application
     """
+    # Qt does not know the flag, so take it out of the arguments
+    if PROFILE_STARTUP_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_STARTUP_FLAG)
+        start_startup_profile()
+    
+    # Imported here so the profile includes loading the UI modules
+    from ui.app import App
+    record_startup_step("import ui.app")
+    
     app = App()
     app.run()
 
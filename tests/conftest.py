@@ -0,0 +1,25 @@
+"""
+Test Setup
+Makes the app's packages importable when pytest is run from any directory
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import ai_client, response_cache
+
+@pytest.fixture
+def fake_ai(tmp_path, monkeypatch):
+    """
+    Fresh shared AI client on the offline fake backend, with an empty response cache
+    """
+    monkeypatch.setenv("AI_BACKEND", "fake")
+    monkeypatch.setenv("FAKE_AI_LATENCY", "0")
+    monkeypatch.setenv("FAKE_AI_TOKENS_PER_SECOND", "100000")
+    monkeypatch.setattr(ai_client, "_clients", {})
+    monkeypatch.setattr(ai_client, "_api_key", None)
+    monkeypatch.setattr(response_cache, "_response_cache", response_cache.ResponseCache(str(tmp_path / "cache.db")))
+    return ai_client.get_ai_client()
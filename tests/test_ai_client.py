@@ -0,0 +1,21 @@
+"""
+AI Client Tests
+Shared clients and the app-wide API key
+"""
+
+from ai import ai_client
+
+def test_clients_are_shared(fake_ai):
+    assert ai_client.get_ai_client() is fake_ai
+    assert ai_client.get_ai_client("other-model") is not fake_ai
+
+def test_api_key_set_before_first_use_is_kept(fake_ai):
+    ai_client.set_api_key("key-before")
+    client = ai_client.get_ai_client("new-model")
+    
+    assert client.api_key == "key-before"
+
+def test_api_key_reaches_existing_clients(fake_ai):
+    ai_client.set_api_key("key-after")
+    
+    assert fake_ai.api_key == "key-after"
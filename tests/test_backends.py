@@ -0,0 +1,44 @@
+"""
+Backend Tests
+Settings read from the environment and the offline fake backend
+"""
+
+import pytest
+from ai.backends import (
+    create_backend, FakeBackend, LOCAL_BACKEND, FAKE_BACKEND,
+    DEFAULT_FAKE_LATENCY_SECONDS, DEFAULT_FAKE_TOKENS_PER_SECOND, DEFAULT_LOCAL_TIMEOUT_SECONDS
+)
+
+def test_local_backend_uses_the_request_timeout(monkeypatch):
+    monkeypatch.setenv("AI_REQUEST_TIMEOUT", "12.5")
+    
+    assert create_backend(LOCAL_BACKEND, "gemini-model", None).timeout == 12.5
+
+def test_local_backend_has_a_default_timeout(monkeypatch):
+    monkeypatch.delenv("AI_REQUEST_TIMEOUT", raising=False)
+    
+    assert create_backend(LOCAL_BACKEND, "gemini-model", None).timeout == DEFAULT_LOCAL_TIMEOUT_SECONDS
+
+@pytest.mark.parametrize("latency, tokens_per_second", [
+    ("fast", "0"),
+    ("-1", "-5"),
+    ("nan", "inf"),
+])
+def test_invalid_fake_settings_fall_back_to_defaults(monkeypatch, latency, tokens_per_second):
+    monkeypatch.setenv("FAKE_AI_LATENCY", latency)
+    monkeypatch.setenv("FAKE_AI_TOKENS_PER_SECOND", tokens_per_second)
+    
+    backend = create_backend(FAKE_BACKEND, "gemini-model", None)
+    
+    assert backend.latency == DEFAULT_FAKE_LATENCY_SECONDS
+    assert backend.tokens_per_second == DEFAULT_FAKE_TOKENS_PER_SECOND
+
+def test_fake_answers_are_repeatable_and_keep_headings():
+    backend = FakeBackend(latency=0, tokens_per_second=100000)
+    prompt = "Write two sections:\n### SUMMARY\nA summary.\n### QUESTIONS\nFive questions."
+    
+    response = backend.generate(prompt)
+    
+    assert response == "".join(backend.stream(prompt))
+    assert response.index("### SUMMARY") < response.index("### QUESTIONS")
+    assert backend.generate("Another prompt") != response
@@ -0,0 +1,184 @@
+"""
+Database Tests
+Schema migrations, compressed lesson storage, paged lesson listings and filter counts
+"""
+
+import sqlite3
+import pytest
+from data.database import Database, FacetValue, MIGRATIONS, get_page_cursor
+
+# Schema of the first release, before PRAGMA user_version was used
+BASELINE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lessons (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    academic_year TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    module TEXT NOT NULL,
+    date_added TEXT NOT NULL
+)
+"""
+
+def make_lesson(number, module="Databases"):
+    """
+    Build a lesson dictionary for save_lessons()
+    """
+    return {
+        'title': f"Lesson {number}",
+        'content': f"Lesson {number} explains normal forms and primary keys.",
+        'academic_year': "2025/2026",
+        'semester': "Semester 1",
+        'module': module
+    }
+
+@pytest.fixture
+def db(tmp_path):
+    """
+    Empty database in a temporary folder
+    """
+    database = Database(str(tmp_path / "lessons.db"))
+    yield database
+    database.manager.close()
+
+def test_migrates_baseline_database(tmp_path):
+    db_path = str(tmp_path / "baseline.db")
+    
+    # Three lessons saved by the first release, the newest one deleted again
+    connection = sqlite3.connect(db_path)
+    connection.execute(BASELINE_SCHEMA)
+    for number in range(1, 4):
+        connection.execute(
+            """
+            INSERT INTO lessons (title, content, academic_year, semester, module, date_added)
+            VALUES (?, ?, '2024/2025', 'Semester 2', 'Networks', '2025-03-0' || ? || ' 10:00:00')
+            """,
+            (f"Old lesson {number}", f"Routing tables and subnet masks, part {number}.", number)
+        )
+    connection.execute("DELETE FROM lessons WHERE id = 3")
+    connection.commit()
+    connection.close()
+    
+    database = Database(db_path)
+    try:
+        reader = database.connect()
+        assert reader.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        
+        # Content survives the move to compressed storage
+        lesson = database.get_lesson_by_id(2)
+        assert lesson['content'] == "Routing tables and subnet masks, part 2."
+        
+        # The full-text index covers the old lessons
+        assert {hit.id for hit in database.search_lessons("subnet")} == {1, 2}
+        
+        # AUTOINCREMENT still never reuses the deleted lesson's id
+        new_id = database.save_lesson("New lesson", "Spanning trees.", "2025/2026", "Semester 1", "Networks")
+        assert new_id == 4
+        assert [hit.id for hit in database.search_lessons("spanning")] == [4]
+    finally:
+        database.manager.close()
+
+def count_contents(database):
+    """
+    Count the stored texts
+    """
+    return database.execute_query("SELECT COUNT(*) FROM lesson_contents")[0][0]
+
+def test_equal_texts_are_stored_once(db):
+    db.save_lessons([make_lesson(1), make_lesson(1), make_lesson(2)])
+    
+    assert count_contents(db) == 2
+
+def test_deleting_the_last_user_removes_the_text(db):
+    first_id = db.save_lesson("Copy A", "Shared text.", "2025/2026", "Semester 1", "Databases")
+    second_id = db.save_lesson("Copy B", "Shared text.", "2025/2026", "Semester 1", "Databases")
+    
+    db.delete_lesson(first_id)
+    assert count_contents(db) == 1
+    assert db.get_lesson_by_id(second_id)['content'] == "Shared text."
+    
+    db.delete_lesson(second_id)
+    assert count_contents(db) == 0
+
+def test_raw_queries_keep_search_in_sync(db):
+    lesson_id = db.save_lesson("Joins", "Inner and outer joins.", "2025/2026", "Semester 1", "Databases")
+    
+    db.execute_query("UPDATE lessons SET title = ? WHERE id = ?", ("Relational algebra", lesson_id))
+    assert [hit.id for hit in db.search_lessons("algebra")] == [lesson_id]
+    
+    db.execute_query("DELETE FROM lessons WHERE id = ?", (lesson_id,))
+    assert db.search_lessons("outer") == []
+    assert db.execute_query("SELECT COUNT(*) FROM lessons_fts")[0][0] == 0
+
+def test_pages_cover_every_lesson_once(db):
+    db.save_lessons([make_lesson(number) for number in range(10)])
+    
+    pages = []
+    after = None
+    while True:
+        page = db.list_lessons_page(after=after, limit=3)
+        pages.append(page)
+        if len(page) < 3:
+            break
+        after = get_page_cursor(page[-1])
+    
+    listed_ids = [lesson.id for page in pages for lesson in page]
+    assert listed_ids == sorted(listed_ids, reverse=True)
+    assert len(listed_ids) == 10
+    assert len(set(listed_ids)) == 10
+
+def test_paging_continues_after_cursor_lesson_is_deleted(db):
+    db.save_lessons([make_lesson(number) for number in range(6)])
+    first_page = db.list_lessons_page(limit=3)
+    expected_next_page = db.list_lessons_page(after=get_page_cursor(first_page[-1]), limit=3)
+    
+    db.delete_lesson(first_page[-1].id)
+    
+    assert db.list_lessons_page(after=get_page_cursor(first_page[-1]), limit=3) == expected_next_page
+
+def test_pages_respect_filters(db):
+    db.save_lessons([make_lesson(number, module="Databases") for number in range(4)])
+    db.save_lessons([make_lesson(number, module="Networks") for number in range(4)])
+    
+    first_page = db.list_lessons_page(module="Databases", limit=3)
+    second_page = db.list_lessons_page(module="Databases", after=get_page_cursor(first_page[-1]), limit=3)
+    
+    modules = {lesson.module for lesson in first_page + second_page}
+    assert modules == {"Databases"}
+    assert len(first_page) + len(second_page) == 4
+
+def delete_then_fail(connection, database, lesson_id):
+    """
+    Write job that deletes a lesson and then fails, so it is rolled back
+    """
+    database.delete_lesson_row(connection, lesson_id)
+    raise ValueError("write failed")
+
+def test_facet_counts_follow_saves_and_deletes(db):
+    db.save_lessons([make_lesson(number, module="Databases") for number in range(3)])
+    db.load_facet_index()
+    
+    lesson_id = db.save_lesson("Routing", "Routing tables.", "2024/2025", "Semester 2", "Networks")
+    db.delete_lesson(db.list_lessons_page(module="Databases", limit=1)[0].id)
+    
+    assert db.get_facets()['module'] == [FacetValue("Databases", 2), FacetValue("Networks", 1)]
+    assert db.get_facets()['academic_year'] == [FacetValue("2025/2026", 2), FacetValue("2024/2025", 1)]
+    
+    # Each filter counts only lessons matching the other selected filters
+    assert db.get_facets(module="Networks")['academic_year'] == [FacetValue("2024/2025", 1)]
+    assert db.get_facets(module="Networks")['module'] == [FacetValue("Databases", 2), FacetValue("Networks", 1)]
+    
+    db.delete_lesson(lesson_id)
+    assert db.get_facets()['module'] == [FacetValue("Databases", 2)]
+
+def test_rolled_back_write_keeps_facet_counts(db):
+    lesson_id = db.save_lesson("Joins", "Inner joins.", "2025/2026", "Semester 1", "Databases")
+    db.load_facet_index()
+    data_version = db.get_data_version()
+    
+    with pytest.raises(ValueError):
+        db.manager.write(delete_then_fail, db, lesson_id)
+    
+    assert db.get_lesson_by_id(lesson_id) is not None
+    assert db.get_facets()['module'] == [FacetValue("Databases", 1)]
+    assert db.get_data_version() == data_version
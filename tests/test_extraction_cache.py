@@ -0,0 +1,51 @@
+"""
+Extraction Cache Tests
+Extracted text stored by file content
+"""
+
+import os
+from utils.extraction_cache import ExtractionCache, HASH_BLOCK_SIZE
+
+def test_key_follows_file_content(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    original = tmp_path / "lesson.pdf"
+    copy = tmp_path / "copy.pdf"
+    edited = tmp_path / "edited.pdf"
+    
+    # Larger than one hash block, so the whole file must be read
+    content = b"%PDF" + b"x" * HASH_BLOCK_SIZE
+    original.write_bytes(content)
+    copy.write_bytes(content)
+    edited.write_bytes(content + b"y")
+    
+    key = cache.make_key(str(original), "v1")
+    assert cache.make_key(str(copy), "v1") == key
+    assert cache.make_key(str(edited), "v1") != key
+    assert cache.make_key(str(original), "v2") != key
+
+def test_stored_text_is_returned(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    
+    assert cache.get("missing") is None
+    cache.put("key", "Extracted lesson text")
+    
+    assert cache.get("key") == "Extracted lesson text"
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 1
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    
+    # Room for three entries of the same size
+    for number in range(3):
+        cache.put(f"key{number}", f"Lesson {number} " * 200)
+        os.utime(cache.get_entry_path(f"key{number}"), (number, number))
+    cache.max_size_bytes = cache.get_stats()['size_bytes']
+    
+    # key0 is used again, so key1 is now the least recently used
+    cache.get("key0")
+    cache.put("key3", "Lesson 3 " * 200)
+    
+    assert cache.get("key1") is None
+    assert cache.get("key0") is not None
+    assert cache.get("key3") is not None
@@ -0,0 +1,130 @@
+"""
+Lesson Importer Tests
+Lesson details inferred from folder names, and importing a folder of PDFs
+"""
+
+import os
+import pytest
+from data.database import Database
+from utils.lesson_importer import (
+    import_folder, infer_lesson_info, DEFAULT_ACADEMIC_YEAR, DEFAULT_SEMESTER, DEFAULT_MODULE
+)
+
+def make_pdf(text):
+    """
+    Build a one-page PDF showing a line of text
+    """
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return output
+
+def cancel_now():
+    """
+    is_cancelled callback of an import cancelled right away
+    """
+    return True
+
+@pytest.fixture
+def import_setup(tmp_path, monkeypatch):
+    """
+    Folder with three lesson PDFs and one broken file, and an empty database
+    """
+    # The extraction cache folder is created in the working directory
+    monkeypatch.chdir(tmp_path)
+    
+    folder = tmp_path / "Archive" / "Databases"
+    folder.mkdir(parents=True)
+    for number in range(3):
+        (folder / f"lesson_{number}.pdf").write_bytes(make_pdf(f"Lesson {number} covers normal forms"))
+    (folder / "broken.pdf").write_bytes(b"not a pdf")
+    
+    database = Database(str(tmp_path / "lessons.db"))
+    yield str(tmp_path / "Archive"), database
+    database.manager.close()
+
+def test_year_semester_and_module_from_folders():
+    root = os.path.join("home", "student", "Archive")
+    file_path = os.path.join(root, "2025-26", "Sem 2", "Databases", "week_3-intro.pdf")
+    
+    assert infer_lesson_info(file_path, root) == {
+        'title': "week 3 intro",
+        'academic_year': "2025/2026",
+        'semester': "Semester 2",
+        'module': "Databases"
+    }
+
+def test_root_folder_name_is_not_a_module():
+    root = os.path.join("home", "student", "Archive")
+    
+    info = infer_lesson_info(os.path.join(root, "Databases.pdf"), root)
+    
+    assert info['module'] == DEFAULT_MODULE
+    assert info['academic_year'] == DEFAULT_ACADEMIC_YEAR
+    assert info['semester'] == DEFAULT_SEMESTER
+
+def test_root_folder_counts_as_year_or_semester():
+    root = os.path.join("home", "student", "Semester 1")
+    
+    info = infer_lesson_info(os.path.join(root, "Networks", "routing.pdf"), root)
+    
+    assert info['semester'] == "Semester 1"
+    assert info['module'] == "Networks"
+
+def test_nearest_folder_is_the_module():
+    root = os.path.join("home", "student", "2024")
+    file_path = os.path.join(root, "Computer Science", "Algorithms", "sorting.pdf")
+    
+    info = infer_lesson_info(file_path, root)
+    
+    assert info['academic_year'] == "2024"
+    assert info['module'] == "Algorithms"
+
+def test_import_reports_every_file(import_setup):
+    folder, db = import_setup
+    progress = []
+    
+    report = import_folder(folder, db, progress_callback=progress.append)
+    
+    assert report['imported'] == 3
+    assert [path for path, _ in report['skipped']] == [os.path.join(folder, "Databases", "broken.pdf")]
+    assert sorted(progress) == [(done, 4) for done in range(1, 5)]
+
+def test_importing_again_adds_no_duplicates(import_setup):
+    folder, db = import_setup
+    import_folder(folder, db)
+    
+    report = import_folder(folder, db)
+    
+    assert report['imported'] == 0
+    assert len(report['skipped']) == 4
+    assert db.execute_query("SELECT COUNT(*) FROM lessons")[0][0] == 3
+
+def test_cancel_stops_before_cached_files(import_setup):
+    folder, db = import_setup
+    import_folder(folder, db)
+    db.execute_query("DELETE FROM lessons")
+    
+    # Every file is cached now, so nothing would be left to cancel later
+    report = import_folder(folder, db, is_cancelled=cancel_now)
+    
+    assert report['cancelled']
+    assert report['imported'] == 0
@@ -0,0 +1,43 @@
+"""
+Rate Limiter Tests
+Waiting requests are served by priority, then in arrival order
+"""
+
+import threading
+import time
+from ai.rate_limiter import RateLimiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+
+def test_interactive_requests_go_before_background_ones():
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=100000)
+    order = []
+    
+    def request(name, priority):
+        limiter.acquire(10, priority)
+        order.append(name)
+    
+    # Nobody may send until the pause is over, so all three queue up
+    limiter.pause(0.5)
+    threads = []
+    for name, priority in [("background 1", PRIORITY_BACKGROUND),
+                           ("background 2", PRIORITY_BACKGROUND),
+                           ("interactive", PRIORITY_INTERACTIVE)]:
+        thread = threading.Thread(target=request, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+    
+    for thread in threads:
+        thread.join(5)
+    
+    assert order == ["interactive", "background 1", "background 2"]
+
+def test_requests_wait_for_the_request_quota():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100000)
+    
+    # Use up the bucket; the next request needs 0.1 s of refill
+    for _ in range(600):
+        limiter.acquire(1)
+    
+    start = time.monotonic()
+    limiter.acquire(1)
+    assert time.monotonic() - start >= 0.05
@@ -0,0 +1,62 @@
+"""
+Response Cache Tests
+AI responses stored on disk by prompt
+"""
+
+import time
+from ai.ai_client import is_error_response
+from ai.response_cache import ResponseCache
+
+def fail_request(prompt):
+    """
+    Backend generate() replacement for a service that is down
+    """
+    raise ConnectionError("service unavailable")
+
+def test_keys_ignore_whitespace_but_not_versions(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    
+    key = cache.make_key("gemini", "summary-v1", "Summarize:\n  keys")
+    assert cache.make_key("gemini", "summary-v1", "Summarize: keys") == key
+    assert cache.make_key("gemini", "summary-v2", "Summarize: keys") != key
+    assert cache.make_key("fake", "summary-v1", "Summarize: keys") != key
+
+def test_responses_survive_a_restart(tmp_path):
+    db_name = str(tmp_path / "cache.db")
+    cache = ResponseCache(db_name)
+    cache.put("key", "- Keys identify rows.")
+    cache.connection.close()
+    
+    assert ResponseCache(db_name).get("key") == "- Keys identify rows."
+
+def test_old_and_least_recently_used_responses_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.db"), max_size_bytes=25)
+    
+    cache.put("old", "expired")
+    month_ago = time.time() - 31 * 24 * 60 * 60
+    cache.connection.execute("UPDATE responses SET last_used = ? WHERE cache_key = 'old'", (month_ago,))
+    cache.put("first", "1234567890")
+    cache.put("second", "1234567890")
+    cache.get("first")
+    cache.put("third", "1234567890")
+    
+    assert cache.get("old") is None
+    assert cache.get("second") is None
+    assert cache.get("first") == "1234567890"
+    assert cache.get("third") == "1234567890"
+
+def test_client_answers_repeated_prompts_from_the_cache(fake_ai):
+    first = fake_ai.send_prompt("Summarize: keys", prompt_version="summary-v1")
+    
+    assert fake_ai.send_prompt("Summarize:   keys", prompt_version="summary-v1") == first
+    assert fake_ai.response_cache.get_stats()['hits'] == 1
+    assert fake_ai.response_cache.get_stats()['entries'] == 1
+
+def test_error_responses_are_not_cached(fake_ai, monkeypatch):
+    monkeypatch.setattr(fake_ai.get_backend(), "generate", fail_request)
+    monkeypatch.setattr(fake_ai, "max_retries", 0)
+    
+    response = fake_ai.send_prompt("Summarize: keys", prompt_version="summary-v1")
+    
+    assert is_error_response(response)
+    assert fake_ai.response_cache.get_stats()['entries'] == 0
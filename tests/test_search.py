@@ -0,0 +1,41 @@
+"""
+Search Tests
+Full-text search over lesson titles and content
+"""
+
+import pytest
+from data.database import Database, build_match_expression
+
+@pytest.fixture
+def db(tmp_path):
+    """
+    Database with a few lessons about programming and networks
+    """
+    database = Database(str(tmp_path / "lessons.db"))
+    database.save_lesson("C++ templates", "Templates generate code at compile time.", "2025/2026", "Semester 1", "Programming")
+    database.save_lesson("Compilers", "A compiler turns code into machine instructions.", "2025/2026", "Semester 1", "Programming")
+    database.save_lesson("Routing", "Routers forward packets between networks.", "2024/2025", "Semester 2", "Networks")
+    yield database
+    database.manager.close()
+
+def test_match_expression_quotes_words():
+    assert build_match_expression('say "hi" OR drop') == '"say" "hi" "OR" "drop"*'
+    assert build_match_expression("?!") == ""
+
+def test_short_last_word_is_not_a_prefix():
+    assert build_match_expression("C++") == '"C"'
+    assert build_match_expression("compi") == '"compi"*'
+
+def test_search_finds_title_and_content(db):
+    assert [hit.title for hit in db.search_lessons("packets")] == ["Routing"]
+    assert [hit.title for hit in db.search_lessons("templates")] == ["C++ templates"]
+
+def test_last_word_matches_while_typing(db):
+    assert {hit.title for hit in db.search_lessons("compil")} == {"Compilers", "C++ templates"}
+
+def test_cpp_does_not_match_every_c_word(db):
+    assert [hit.title for hit in db.search_lessons("C++")] == ["C++ templates"]
+
+def test_search_respects_filters(db):
+    assert db.search_lessons("code", module="Networks") == []
+    assert len(db.search_lessons("code", module="Programming")) == 2
@@ -0,0 +1,95 @@
+"""
+Single Flight Tests
+Concurrent identical requests share one call
+"""
+
+import threading
+import pytest
+from ai.single_flight import SingleFlight
+
+def run_in_threads(count, target):
+    """
+    Start count threads running target and wait for all of them
+    """
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+def test_concurrent_callers_share_one_call():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+    
+    def slow_request(prompt):
+        calls.append(prompt)
+        release.wait(5)
+        return f"answer to {prompt}"
+    
+    def caller():
+        results.append(single_flight.do("key", slow_request, "prompt"))
+    
+    # Let every caller join before the leader finishes
+    threading.Timer(0.2, release.set).start()
+    run_in_threads(5, caller)
+    
+    assert calls == ["prompt"]
+    assert results == ["answer to prompt"] * 5
+    assert single_flight.get_stats() == {'calls_made': 1, 'calls_saved': 4, 'in_flight': 0}
+
+def test_error_is_raised_for_every_caller():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+    
+    def failing_request():
+        release.wait(5)
+        raise RuntimeError("quota exceeded")
+    
+    def caller():
+        try:
+            single_flight.do("key", failing_request)
+        except RuntimeError as e:
+            errors.append(str(e))
+    
+    threading.Timer(0.2, release.set).start()
+    run_in_threads(3, caller)
+    
+    assert errors == ["quota exceeded"] * 3
+
+def test_finished_call_is_not_reused():
+    single_flight = SingleFlight()
+    answers = iter(["first", "second"])
+    
+    def request():
+        return next(answers)
+    
+    assert single_flight.do("key", request) == "first"
+    assert single_flight.do("key", request) == "second"
+
+def test_cancelled_leader_lets_a_waiter_retry():
+    single_flight = SingleFlight()
+    call, is_leader = single_flight.begin("key")
+    assert is_leader
+    
+    results = []
+    
+    def waiter_call():
+        results.append(single_flight.do("key", str.upper, "retried"))
+    
+    waiter = threading.Thread(target=waiter_call)
+    waiter.start()
+    
+    # The leader stops without a result (e.g. its job was cancelled)
+    single_flight.finish("key", call, abandoned=True)
+    waiter.join(5)
+    
+    assert results == ["RETRIED"]
+
+def test_leader_exception_is_raised():
+    single_flight = SingleFlight()
+    
+    with pytest.raises(ValueError):
+        single_flight.do("key", int, "not a number")
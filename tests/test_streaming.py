@@ -0,0 +1,46 @@
+"""
+Streaming Tests
+Responses delivered piece by piece, and what gets cached
+"""
+
+from ai.ai_client import is_error_response
+
+PROMPT = "Summarize: primary keys identify rows."
+
+def stream_then_fail(prompt):
+    """
+    Backend stream() replacement that breaks after the first pieces
+    """
+    yield "- Primary keys "
+    yield "identify "
+    raise ConnectionError("connection reset")
+
+def test_pieces_add_up_to_the_full_response(fake_ai):
+    pieces = list(fake_ai.stream_prompt(PROMPT, prompt_version="summary-v1"))
+    
+    assert len(pieces) > 1
+    assert "".join(pieces) == fake_ai.get_backend().generate(PROMPT)
+
+def test_streamed_response_is_cached(fake_ai):
+    pieces = list(fake_ai.stream_prompt(PROMPT, prompt_version="summary-v1"))
+    
+    # Served from the cache in one piece, for streaming and plain requests alike
+    assert list(fake_ai.stream_prompt(PROMPT, prompt_version="summary-v1")) == ["".join(pieces)]
+    assert fake_ai.send_prompt(PROMPT, prompt_version="summary-v1") == "".join(pieces)
+
+def test_stopped_stream_is_not_cached(fake_ai):
+    stream = fake_ai.stream_prompt(PROMPT, prompt_version="summary-v1")
+    next(stream)
+    stream.close()
+    
+    assert fake_ai.response_cache.get_stats()['entries'] == 0
+    assert len(list(fake_ai.stream_prompt(PROMPT, prompt_version="summary-v1"))) > 1
+
+def test_broken_stream_ends_with_an_error(fake_ai, monkeypatch):
+    monkeypatch.setattr(fake_ai.get_backend(), "stream", stream_then_fail)
+    
+    pieces = list(fake_ai.stream_prompt(PROMPT, prompt_version="summary-v1"))
+    
+    assert pieces[:2] == ["- Primary keys ", "identify "]
+    assert is_error_response(pieces[2].strip())
+    assert fake_ai.response_cache.get_stats()['entries'] == 0
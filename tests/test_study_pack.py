@@ -0,0 +1,70 @@
+"""
+Study Pack Tests
+Splitting combined responses and sending long lessons in one combining request
+"""
+
+import pytest
+from ai.study_pack import StudyPackGenerator, MISSING_QUESTIONS_MESSAGE
+from ai.summarizer import split_text_into_chunks
+from utils.text_normalizer import normalize_text
+
+def answer_without_questions(prompt, **kwargs):
+    """
+    send_prompt replacement answering with a summary only
+    """
+    return "- Keys identify rows."
+
+@pytest.fixture
+def generator(fake_ai):
+    """
+    Study pack generator on the fake backend
+    """
+    return StudyPackGenerator()
+
+@pytest.mark.parametrize("response", [
+    "### SUMMARY\n- Keys\n### QUESTIONS\n1. What is a key?",
+    "## Summary\n- Keys\n\n## Questions\n1. What is a key?",
+    "**Summary:**\n- Keys\n**Questions:**\n1. What is a key?",
+    "Sure!\n\nsummary\n- Keys\nQUESTIONS:\n1. What is a key?",
+    "### QUESTIONS\n1. What is a key?\n### SUMMARY\n- Keys",
+])
+def test_headings_are_matched_tolerantly(generator, response):
+    assert generator.parse_response(response) == {'summary': "- Keys", 'questions': "1. What is a key?"}
+
+def test_response_without_headings_is_the_summary(generator):
+    assert generator.parse_response("- Keys\n- Joins") == {'summary': "- Keys\n- Joins", 'questions': ""}
+
+def test_missing_questions_are_reported(generator, monkeypatch):
+    monkeypatch.setattr(generator.ai_client, "send_prompt", answer_without_questions)
+    
+    study_pack = generator.generate("Keys identify rows.")
+    
+    assert study_pack['summary'] == "- Keys identify rows."
+    assert study_pack['questions'] == MISSING_QUESTIONS_MESSAGE
+
+def test_short_lesson_fills_both_caches(generator, fake_ai):
+    text = "Primary keys identify rows. Foreign keys point to other tables."
+    
+    study_pack = generator.generate(text)
+    misses = fake_ai.response_cache.misses
+    
+    assert generator.summarizer.summarize(text) == study_pack['summary']
+    assert generator.question_generator.generate(text) == study_pack['questions']
+    assert fake_ai.response_cache.misses == misses
+
+def test_long_lesson_uses_one_combining_request(generator, fake_ai):
+    paragraphs = [f"Paragraph {number} explains how index {number} speeds up lookups in a table." * 5
+                  for number in range(300)]
+    text = "\n\n".join(paragraphs)
+    chunk_count = len(split_text_into_chunks(normalize_text(text)))
+    
+    study_pack = generator.generate(text)
+    
+    # One request per chunk and one that writes both sections
+    assert chunk_count > 1
+    assert fake_ai.response_cache.misses == chunk_count + 1
+    assert study_pack['summary'] and study_pack['questions']
+    
+    # The questions view answers from the cache
+    assert generator.question_generator.generate(text) == study_pack['questions']
+    assert fake_ai.response_cache.misses == chunk_count + 1
@@ -0,0 +1,49 @@
+"""
+Summarizer Tests
+Content-defined chunking of long lessons
+"""
+
+from ai.rate_limiter import estimate_tokens
+from ai.summarizer import split_text_into_chunks, CHUNK_TOKEN_BUDGET
+
+def make_long_text(paragraph_count=400):
+    """
+    Build a lesson long enough to be split into several chunks
+    """
+    paragraphs = []
+    for number in range(paragraph_count):
+        paragraphs.append(
+            f"Paragraph {number} describes how relational databases store rows in pages, "
+            f"how indexes number {number * 7} speed up lookups, and why transactions matter."
+        )
+    return "\n\n".join(paragraphs)
+
+def test_chunks_fit_the_budget():
+    chunks = split_text_into_chunks(make_long_text())
+    
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert estimate_tokens(chunk) <= CHUNK_TOKEN_BUDGET
+
+def test_editing_a_paragraph_keeps_other_chunks():
+    text = make_long_text()
+    edited_text = text.replace("Paragraph 200 describes", "Paragraph 200 (revised) explains")
+    
+    chunks = split_text_into_chunks(text)
+    edited_chunks = split_text_into_chunks(edited_text)
+    
+    # Only the chunk holding the edit (and at most its neighbour) may change
+    unchanged = set(chunks) & set(edited_chunks)
+    assert len(unchanged) >= len(chunks) - 2
+
+def test_inserting_a_paragraph_keeps_earlier_chunks():
+    text = make_long_text()
+    edited_text = text.replace("Paragraph 300 describes", "A new note.\n\nParagraph 300 describes")
+    
+    chunks = split_text_into_chunks(text)
+    edited_chunks = split_text_into_chunks(edited_text)
+    
+    # Chunks are decided paragraph by paragraph, so everything before the insert is identical
+    first_changed = next(index for index, chunk in enumerate(chunks) if chunk not in edited_chunks)
+    assert chunks[:first_changed] == edited_chunks[:first_changed]
+    assert len(set(chunks) & set(edited_chunks)) >= len(chunks) - 2
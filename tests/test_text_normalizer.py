@@ -0,0 +1,89 @@
+"""
+Text Normalizer Tests
+Removal of PDF headers, footers, page numbers and broken words
+"""
+
+from utils.text_normalizer import normalize_pages, normalize_text
+
+def make_page(number, page_count, body_lines):
+    """
+    Build the text of a slide page with a header and a page number footer
+    """
+    lines = ["Databases 101 - Lecture 3"]
+    lines.extend(body_lines)
+    lines.append(f"Page {number} of {page_count}")
+    return "\n".join(lines)
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    topics = ["tables", "keys", "joins", "indexes", "transactions"]
+    pages = []
+    for number, topic in enumerate(topics, start=1):
+        body_lines = [f"About {topic}: {word} point." for word in ["first", "second", "third", "fourth", "fifth", "sixth"]]
+        pages.append(make_page(number, len(topics), body_lines))
+    
+    text, stats = normalize_pages(pages)
+    
+    assert "Lecture 3" not in text
+    assert "Page " not in text
+    assert "About joins: first point." in text
+    assert "About transactions: sixth point." in text
+    assert stats['removed_lines'] == 10
+    assert stats['removed_characters'] > 0
+
+def test_numbered_headings_are_kept():
+    # Every page starts and ends with lines that differ only by a number
+    pages = []
+    for number in range(1, 9):
+        pages.append("\n".join([
+            f"Question {number}",
+            f"Table orders_{number} has columns id, customer and total.",
+            "Write the SQL.",
+            "Explain your answer in one sentence.",
+            "Hint: think about the keys first.",
+            f"Expected rows: {number * 3} of the sample data.",
+            f"Marks: {number + 2}"
+        ]))
+    
+    text, _ = normalize_pages(pages)
+    
+    for number in range(1, 9):
+        assert f"Question {number}" in text
+        assert f"Table orders_{number} has columns" in text
+        assert f"Expected rows: {number * 3}" in text
+        assert f"Marks: {number + 2}" in text
+
+def test_short_slides_keep_their_titles():
+    pages = []
+    for number in range(1, 41):
+        pages.append(f"Slide title {number}\nPoint {number}.1\nPoint {number}.2\n{number}")
+    
+    text, stats = normalize_pages(pages)
+    
+    for number in range(1, 41):
+        assert f"Slide title {number}" in text
+        assert f"Point {number}.2" in text
+    
+    # Only the page numbers go
+    assert stats['removed_lines'] == 40
+
+def test_running_headers_with_page_numbers_are_removed():
+    pages = []
+    for number in range(1, 6):
+        pages.append(f"Lecture 3 - page {number}\nNormal forms, part {number}.\nMore about keys.")
+    
+    text, _ = normalize_pages(pages)
+    
+    assert "Lecture 3" not in text
+    assert "Normal forms, part 4." in text
+
+def test_few_pages_keep_repeated_lines():
+    body_lines = [f"Line {line} of the body." for line in range(6)]
+    pages = [make_page(1, 2, body_lines), make_page(2, 2, body_lines)]
+    
+    text, _ = normalize_pages(pages)
+    
+    # Too few pages to tell a header from a repeated sentence
+    assert text.count("Databases 101 - Lecture 3") == 2
+
+def test_broken_words_and_whitespace_are_fixed():
+    assert normalize_text("The mito-\nchondria   is\n\n\n\nthe  powerhouse") == "The mitochondria is\n\nthe powerhouse"
@@ -3,14 +3,15 @@ Main Application Window
 Handles the primary UI and navigation
 """
 
+import importlib
 import sys
 from pathlib import Path
-from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QLabel
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QLabel, QStackedWidget
+from PyQt6.QtCore import Qt, QTimer
 from ui.sidebar import Sidebar
-from ui.summarizer_view import SummarizerView
-from ui.question_view import QuestionView
-from ui.lessons_view import LessonsView
+from data.database import close_connection_managers
+from utils.pdf_document import shutdown_pdf_process_pool
+from utils.startup_profile import record_startup_step, is_startup_profile_enabled, print_startup_report
 
 class App:
     def __init__(self):
@@ -19,6 +20,10 @@ class App:
         """
         # Create QApplication instance
         self.app = QApplication(sys.argv)
+        record_startup_step("create QApplication")
+        
+        # Stop background work and finish queued database writes before the process exits
+        self.app.aboutToQuit.connect(self.shutdown)
         
         # Create main window
         self.window = QMainWindow()
@@ -30,6 +35,7 @@ class App:
         
         # Apply stylesheet from external QSS if present, otherwise use built-in theme
         self._apply_external_stylesheet()
+        record_startup_step("apply stylesheet")
     
     def setup_ui(self):
         """
@@ -46,27 +52,31 @@ class App:
         # Create sidebar
         self.sidebar = Sidebar(self.switch_view)
         layout.addWidget(self.sidebar)
+        record_startup_step("create sidebar")
         
-        # Create main content container
-        self.content_container = QWidget()
-        self.content_layout = QHBoxLayout()
-        self.content_container.setLayout(self.content_layout)
-        layout.addWidget(self.content_container)
+        # Create main content container (holds every view visited so far, one shown at a time)
+        self.content_stack = QStackedWidget()
+        layout.addWidget(self.content_stack)
         
         # Set stretch factors (sidebar:content = 1:4)
         layout.setStretch(0, 1)
         layout.setStretch(1, 4)
         
-        # Create view mapping for cleaner view switching
+        # Create view mapping for cleaner view switching: (module, class name).
+        # A view's module is only imported when the view is first opened.
         self.view_classes = {
-            "summarizer": SummarizerView,
-            "questions": QuestionView,
-            "lessons": LessonsView
+            "summarizer": ("ui.summarizer_view", "SummarizerView"),
+            "questions": ("ui.question_view", "QuestionView"),
+            "lessons": ("ui.lessons_view", "LessonsView")
         }
         
+        # Views are created on first visit and then kept, with their state
+        self.views = {}
+        
         # Initialize with summarizer view
         self.current_view = None
         self.switch_view("summarizer")
+        record_startup_step("create first view")
     
     def switch_view(self, view_name):
         """
@@ -75,27 +85,56 @@ class App:
         Args:
             view_name: Name of the view to display
         """
-        # Clear current view
-        if self.current_view:
-            self.content_layout.removeWidget(self.current_view)
-            self.current_view.deleteLater()
-            self.current_view = None
+        view = self.views.get(view_name)
+        
+        if view is None:
+            # First visit: create the view using dictionary lookup
+            view = self.create_view(view_name)
+            self.views[view_name] = view
+            self.content_stack.addWidget(view)
+        elif hasattr(view, 'refresh'):
+            # Returning to a kept view: reload only if its lessons changed
+            view.refresh()
+        
+        self.current_view = view
+        self.content_stack.setCurrentWidget(view)
+    
+    def create_view(self, view_name):
+        """
+        Create a view
+        
+        Args:
+            view_name: Name of the view to create
         
-        # Load new view using dictionary lookup
+        Returns:
+            The new view widget
+        """
         view_class = self.view_classes.get(view_name)
         if view_class:
-            self.current_view = view_class()
-        else:
-            # Default view - coming soon
-            self.current_view = QWidget()
-            layout = QHBoxLayout()
-            label = QLabel(f"{view_name.title()} - Coming Soon!")
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            label.setStyleSheet("font-size: 20px;")
-            layout.addWidget(label)
-            self.current_view.setLayout(layout)
-        
-        self.content_layout.addWidget(self.current_view)
+            module_name, class_name = view_class
+            module = importlib.import_module(module_name)
+            return getattr(module, class_name)()
+        
+        # Default view - coming soon
+        view = QWidget()
+        layout = QHBoxLayout()
+        label = QLabel(f"{view_name.title()} - Coming Soon!")
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        label.setStyleSheet("font-size: 20px;")
+        layout.addWidget(label)
+        view.setLayout(layout)
+        return view
+    
+    def shutdown(self):
+        """
+        Let the views stop their background work, then stop the PDF workers and close the database
+        """
+        for view in self.views.values():
+            if hasattr(view, 'shutdown'):
+                view.shutdown()
+        
+        shutdown_pdf_process_pool()
+        close_connection_managers()
     
     # Note: embedded stylesheet removed. All styling should come from external QSS files.
 
@@ -118,4 +157,17 @@ class App:
         Start the application main loop
         """
         self.window.show()
+        record_startup_step("show window")
+        
+        # Report once the event loop has drawn the first window
+        if is_startup_profile_enabled():
+            QTimer.singleShot(0, self.finish_startup_profile)
+        
         sys.exit(self.app.exec())
+    
+    def finish_startup_profile(self):
+        """
+        Record the first event loop pass and print the startup timing report
+        """
+        record_startup_step("first event loop pass")
+        print_startup_report()
@@ -0,0 +1,230 @@
+"""
+Lesson List Model
+Qt model that loads lessons page by page as the list is scrolled
+"""
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from data.database import DEFAULT_PAGE_SIZE, get_page_cursor
+
+def format_lesson_title(lesson):
+    """
+    Default display text for a lesson
+    Search results also show where the words were found.
+    
+    Args:
+        lesson: LessonSummary (or LessonSearchResult)
+    
+    Returns:
+        Display text
+    """
+    text = f"{lesson.title} - {lesson.module} ({lesson.academic_year}, {lesson.semester})"
+    
+    snippet = getattr(lesson, 'snippet', None)
+    if snippet:
+        text += "\n    " + " ".join(snippet.split())
+    
+    return text
+
+class LessonListModel(QAbstractListModel):
+    def __init__(self, db, format_lesson=format_lesson_title, placeholder_text=None,
+                 page_size=DEFAULT_PAGE_SIZE, parent=None):
+        """
+        Initialize the lesson list model
+        Only the pages the view has scrolled to are queried, so the list
+        opens just as fast with 100 lessons as with 100,000.
+        
+        Args:
+            db: Database to load lessons from
+            format_lesson: Function turning a lesson into its display text
+            placeholder_text: Text of an extra first row with no lesson (e.g. for combo boxes)
+            page_size: Number of lessons loaded per page
+            parent: Parent object
+        """
+        super().__init__(parent)
+        
+        self.db = db
+        self.format_lesson = format_lesson
+        self.placeholder_text = placeholder_text
+        self.page_size = page_size
+        
+        # Loaded lessons, in display order
+        self.lessons = []
+        
+        # Category filters of the current listing
+        self.filters = (None, None, None)
+        
+        # False once the last page is loaded (or for search results)
+        self.has_more = False
+    
+    def get_row_offset(self):
+        """
+        Get how many rows come before the first lesson
+        
+        Returns:
+            1 with a placeholder row, 0 otherwise
+        """
+        return 1 if self.placeholder_text is not None else 0
+    
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Get the number of loaded rows
+        
+        Args:
+            parent: Parent index (lists have no children)
+        
+        Returns:
+            Row count
+        """
+        if parent.isValid():
+            return 0
+        return len(self.lessons) + self.get_row_offset()
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """
+        Get the data shown for a row
+        
+        Args:
+            index: Row index
+            role: Kind of data wanted (display text or lesson ID)
+        
+        Returns:
+            Display text for DisplayRole, the lesson ID for UserRole, otherwise None
+        """
+        if not index.isValid():
+            return None
+        
+        lesson_index = index.row() - self.get_row_offset()
+        
+        # Placeholder row: text but no lesson
+        if lesson_index < 0:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.placeholder_text
+            return None
+        
+        lesson = self.lessons[lesson_index]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.format_lesson(lesson)
+        if role == Qt.ItemDataRole.UserRole:
+            return lesson.id
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        """
+        Check if more lessons can be loaded (called by the view while scrolling)
+        
+        Args:
+            parent: Parent index
+        
+        Returns:
+            True if another page may exist
+        """
+        return not parent.isValid() and self.has_more
+    
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        Load the next page of lessons (called by the view while scrolling)
+        
+        Args:
+            parent: Parent index
+        """
+        if parent.isValid() or not self.has_more:
+            return
+        
+        after = get_page_cursor(self.lessons[-1]) if self.lessons else None
+        academic_year, semester, module = self.filters
+        page = self.db.list_lessons_page(academic_year, semester, module, after, self.page_size)
+        self.append_page(page)
+    
+    def append_page(self, page):
+        """
+        Add a loaded page of lessons after the current rows
+        
+        Args:
+            page: List of LessonSummary tuples
+        """
+        # A short page is the last one
+        self.has_more = len(page) == self.page_size
+        if not page:
+            return
+        
+        first_row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(page) - 1)
+        self.lessons.extend(page)
+        self.endInsertRows()
+    
+    def set_filters(self, academic_year=None, semester=None, module=None, first_page=None):
+        """
+        List lessons matching the filters, starting again from the first page
+        
+        Args:
+            academic_year: Filter by academic year (optional)
+            semester: Filter by semester (optional)
+            module: Filter by module (optional)
+            first_page: First page if it was already loaded (e.g. in the background)
+        """
+        self.beginResetModel()
+        self.lessons = []
+        self.filters = (academic_year, semester, module)
+        self.has_more = True
+        self.endResetModel()
+        
+        # Views only ask for more rows once they are shown, so fill the first page now
+        if first_page is None:
+            self.fetchMore()
+        else:
+            self.append_page(first_page)
+    
+    def set_lessons(self, lessons):
+        """
+        Show a fixed list of lessons (e.g. search results), without paging
+        
+        Args:
+            lessons: List of LessonSummary or LessonSearchResult tuples
+        """
+        self.beginResetModel()
+        self.lessons = list(lessons)
+        self.has_more = False
+        self.endResetModel()
+    
+    def load_lesson_row(self, lesson_id):
+        """
+        Load pages until a lesson is loaded, and get its row
+        Used to restore a selection that was further down than the first page.
+        
+        Args:
+            lesson_id: ID of the lesson (None for no lesson)
+        
+        Returns:
+            Row number, or -1 if the lesson is not in the list
+        """
+        if lesson_id is None:
+            return -1
+        
+        # Pages are only loaded up to where the lesson sorts (not at all if it was deleted)
+        lesson = self.db.get_lesson_summary(lesson_id)
+        if lesson is None:
+            return -1
+        
+        target = get_page_cursor(lesson)
+        while self.has_more and (not self.lessons or get_page_cursor(self.lessons[-1]) > target):
+            self.fetchMore()
+        
+        for lesson_index, loaded_lesson in enumerate(self.lessons):
+            if loaded_lesson.id == lesson_id:
+                return lesson_index + self.get_row_offset()
+        return -1
+    
+    def get_lesson_id(self, row):
+        """
+        Get the lesson ID of a row
+        
+        Args:
+            row: Row number
+        
+        Returns:
+            Lesson ID, or None for the placeholder row
+        """
+        lesson_index = row - self.get_row_offset()
+        if 0 <= lesson_index < len(self.lessons):
+            return self.lessons[lesson_index].id
+        return None
@@ -4,10 +4,20 @@ Interface for managing saved lessons
 """
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                              QPushButton, QListWidget, QListWidgetItem,
-                              QComboBox, QMessageBox)
-from PyQt6.QtCore import Qt
-from data.database import Database
+                              QPushButton, QListView,
+                              QComboBox, QMessageBox, QFileDialog, QProgressDialog,
+                              QLineEdit)
+from PyQt6.QtCore import Qt, QTimer
+from data.database import Database, FACET_FIELDS
+from ui.lesson_list_model import LessonListModel
+from utils.background import BackgroundJob, JobRunner
+from utils.lesson_importer import import_folder
+
+# Wait this long after the last filter change or keystroke before querying (milliseconds)
+FILTER_DELAY_MS = 200
+
+# Longest wait for a cancelled import to save its last batch when the app closes (milliseconds)
+IMPORT_SHUTDOWN_TIMEOUT_MS = 5000
 
 class LessonsView(QWidget):
     def __init__(self):
@@ -18,6 +28,22 @@ class LessonsView(QWidget):
         
         self.db = Database()
         
+        # Folder imports run one at a time, separate from AI requests
+        self.import_runner = JobRunner(max_concurrent=1)
+        self.import_job = None
+        self.import_progress = None
+        
+        # Lesson queries run off the GUI thread; only the newest one is shown
+        self.query_runner = JobRunner(max_concurrent=1)
+        self.query_job = None
+        self.query_generation = 0
+        
+        # Bursts of filter changes and keystrokes are applied once, after a short pause
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
+        
         # Setup UI
         self.setup_ui()
         
@@ -38,6 +64,13 @@ class LessonsView(QWidget):
         title.setStyleSheet("font-size: 24px; font-weight: bold; padding: 20px;")
         layout.addWidget(title)
         
+        # Search box (searches titles and content)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search lessons...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.schedule_filters)
+        layout.addWidget(self.search_input)
+        
         # Filter section
         filter_layout = QHBoxLayout()
         
@@ -46,27 +79,30 @@ class LessonsView(QWidget):
         
         # Academic Year filter
         self.year_filter = QComboBox()
-        self.year_filter.addItem("All Years")
-        self.year_filter.currentTextChanged.connect(self.apply_filters)
+        self.year_filter.addItem("All Years", None)
+        self.year_filter.currentIndexChanged.connect(self.schedule_filters)
         filter_layout.addWidget(self.year_filter)
         
         # Semester filter
         self.semester_filter = QComboBox()
-        self.semester_filter.addItem("All Semesters")
-        self.semester_filter.currentTextChanged.connect(self.apply_filters)
+        self.semester_filter.addItem("All Semesters", None)
+        self.semester_filter.currentIndexChanged.connect(self.schedule_filters)
         filter_layout.addWidget(self.semester_filter)
         
         # Module filter
         self.module_filter = QComboBox()
-        self.module_filter.addItem("All Modules")
-        self.module_filter.currentTextChanged.connect(self.apply_filters)
+        self.module_filter.addItem("All Modules", None)
+        self.module_filter.currentIndexChanged.connect(self.schedule_filters)
         filter_layout.addWidget(self.module_filter)
         
         filter_layout.addStretch()
         layout.addLayout(filter_layout)
         
-        # Lessons list
-        self.lessons_list = QListWidget()
+        # Lessons list (rows are loaded page by page while scrolling)
+        self.lessons_model = LessonListModel(self.db, parent=self)
+        self.lessons_list = QListView()
+        self.lessons_list.setModel(self.lessons_model)
+        self.lessons_list.setUniformItemSizes(True)
         self.lessons_list.setMinimumHeight(400)
         layout.addWidget(self.lessons_list)
         
@@ -79,6 +115,13 @@ class LessonsView(QWidget):
         delete_button.setMinimumHeight(40)
         button_layout.addWidget(delete_button)
         
+        # Import Folder button
+        import_button = QPushButton("Import Folder")
+        import_button.setToolTip("Import every PDF in a folder (year, semester and module are taken from the folder names)")
+        import_button.clicked.connect(self.import_folder)
+        import_button.setMinimumHeight(40)
+        button_layout.addWidget(import_button)
+        
         # Refresh button
         refresh_button = QPushButton("Refresh")
         refresh_button.clicked.connect(self.load_lessons)
@@ -91,97 +134,169 @@ class LessonsView(QWidget):
         """
         Load all lessons from database and populate list
         """
-        # Clear current list
-        self.lessons_list.clear()
-        
-        # Load filter options
-        self.load_filter_options()
+        # Remember which lessons are shown
+        self.lessons_version = self.db.get_data_version()
         
-        # Get all lessons
-        lessons = self.db.get_all_lessons()
+        # Refresh the filter options and show the matching lessons
+        self.apply_filters()
+    
+    def schedule_filters(self, *args):
+        """
+        Apply the filters after a short pause, restarting the wait on every change
         
-        # Populate list
-        for lesson in lessons:
-            item_text = f"{lesson['title']} - {lesson['module']} ({lesson['academic_year']}, {lesson['semester']})"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.ItemDataRole.UserRole, lesson['id'])
-            self.lessons_list.addItem(item)
+        Args:
+            *args: Signal arguments such as the new text or index (ignored,
+                so they are never taken as the timer interval)
+        """
+        self.filter_timer.start()
+    
+    def refresh(self):
+        """
+        Reload the lessons if any were saved or deleted since they were loaded
+        """
+        if self.db.get_data_version() != self.lessons_version:
+            self.load_lessons()
     
     def load_filter_options(self):
         """
-        Load unique years, semesters, and modules for filters
+        Fill the filters with the values that have lessons, and their counts
+        Each filter only offers values that match the other selected filters.
+        
+        Returns:
+            Tuple of the selected (academic_year, semester, module), None meaning all
         """
+        filters = [
+            (self.year_filter, "All Years"),
+            (self.semester_filter, "All Semesters"),
+            (self.module_filter, "All Modules")
+        ]
+        
         # Save current selections
-        current_year = self.year_filter.currentText()
-        current_semester = self.semester_filter.currentText()
-        current_module = self.module_filter.currentText()
-        
-        # Clear filters
-        self.year_filter.clear()
-        self.semester_filter.clear()
-        self.module_filter.clear()
-        
-        # Add "All" options
-        self.year_filter.addItem("All Years")
-        self.semester_filter.addItem("All Semesters")
-        self.module_filter.addItem("All Modules")
-        
-        # Load unique values from database
-        years = self.db.get_unique_years()
-        semesters = self.db.get_unique_semesters()
-        modules = self.db.get_unique_modules()
-        
-        # Populate filters
-        self.year_filter.addItems(years)
-        self.semester_filter.addItems(semesters)
-        self.module_filter.addItems(modules)
-        
-        # Restore selections if they still exist
-        year_index = self.year_filter.findText(current_year)
-        if year_index >= 0:
-            self.year_filter.setCurrentIndex(year_index)
-        
-        semester_index = self.semester_filter.findText(current_semester)
-        if semester_index >= 0:
-            self.semester_filter.setCurrentIndex(semester_index)
-        
-        module_index = self.module_filter.findText(current_module)
-        if module_index >= 0:
-            self.module_filter.setCurrentIndex(module_index)
+        selected = [combo.currentData() for combo, all_text in filters]
+        
+        while True:
+            facets = self.db.get_facets(*selected)
+            
+            for position, (combo, all_text) in enumerate(filters):
+                facet_values = facets[FACET_FIELDS[position]]
+                
+                # Refill without reporting each change as a new selection
+                combo.blockSignals(True)
+                combo.clear()
+                combo.addItem(all_text, None)
+                for facet in facet_values:
+                    combo.addItem(f"{facet.value} ({facet.count})", facet.value)
+                
+                # Restore the selection if it still has lessons
+                index = combo.findData(selected[position])
+                combo.setCurrentIndex(max(index, 0))
+                combo.blockSignals(False)
+            
+            # A selection that disappeared changes what the other filters offer,
+            # so drop the last one (year beats semester beats module) and try again
+            missing = [
+                position for position, (combo, all_text) in enumerate(filters)
+                if combo.currentData() != selected[position]
+            ]
+            if not missing:
+                return tuple(selected)
+            selected[missing[-1]] = None
     
     def apply_filters(self):
         """
         Apply selected filters to lessons list
+        The lessons are queried in the background and shown by show_lessons().
         """
-        # Get filter values
-        year = self.year_filter.currentText()
-        semester = self.semester_filter.currentText()
-        module = self.module_filter.currentText()
+        # A pending delayed update is covered by this one
+        self.filter_timer.stop()
         
-        # Convert "All" to None
-        year = None if year == "All Years" else year
-        semester = None if semester == "All Semesters" else semester
-        module = None if module == "All Modules" else module
+        # Update the filter counts for the new selection; the first time they
+        # are counted by the query job, and the filters are filled when it is done
+        load_facets = not self.db.is_facet_index_loaded()
+        if load_facets:
+            filters = (
+                self.year_filter.currentData(),
+                self.semester_filter.currentData(),
+                self.module_filter.currentData()
+            )
+        else:
+            filters = self.load_filter_options()
+        search_text = self.search_input.text().strip()
         
-        # Get filtered lessons
-        lessons = self.db.get_lessons_by_filters(year, semester, module)
+        # Results of older queries are dropped when they arrive
+        self.query_generation += 1
+        self.query_runner.cancel(self.query_job)
         
-        # Clear and populate list
-        self.lessons_list.clear()
-        for lesson in lessons:
-            item_text = f"{lesson['title']} - {lesson['module']} ({lesson['academic_year']}, {lesson['semester']})"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.ItemDataRole.UserRole, lesson['id'])
-            self.lessons_list.addItem(item)
+        self.query_job = self.query_runner.submit(
+            self.query_lessons, self.query_generation, search_text, filters, load_facets
+        )
+        self.query_job.signals.result.connect(self.show_lessons)
+        self.query_job.signals.error.connect(self.show_query_error)
+    
+    def query_lessons(self, generation, search_text, filters, load_facets):
+        """
+        Load the lessons to show (runs in the background)
+        
+        Args:
+            generation: Number of the query, to recognise outdated results
+            search_text: Search words, or an empty string to list by date
+            filters: Tuple of (academic_year, semester, module)
+            load_facets: Whether to count the filter values first
+        
+        Returns:
+            Tuple of (generation, search_text, filters, load_facets, lessons)
+        """
+        # Counting every lesson's filters takes a while on large libraries
+        if load_facets:
+            self.db.load_facet_index()
+        
+        # Best matches first while searching, otherwise the first page of the newest lessons
+        if search_text:
+            lessons = self.db.search_lessons(search_text, *filters)
+        else:
+            lessons = self.db.list_lessons_page(*filters, limit=self.lessons_model.page_size)
+        
+        return generation, search_text, filters, load_facets, lessons
+    
+    def show_lessons(self, result):
+        """
+        Show the lessons of a finished query, unless a newer one was started
+        
+        Args:
+            result: Tuple from query_lessons()
+        """
+        generation, search_text, filters, load_facets, lessons = result
+        if generation != self.query_generation:
+            return
+        
+        # Fill the filters now that their counts are loaded; if the selection
+        # has no lessons any more, query again with the corrected one
+        if load_facets and self.load_filter_options() != filters:
+            self.apply_filters()
+            return
+        
+        if search_text:
+            self.lessons_model.set_lessons(lessons)
+        else:
+            self.lessons_model.set_filters(*filters, first_page=lessons)
+    
+    def show_query_error(self, error_message):
+        """
+        Show an error from a failed lesson query
+        
+        Args:
+            error_message: Error text from the background job
+        """
+        QMessageBox.warning(self, "Error", f"Error loading lessons: {error_message}")
     
     def delete_lesson(self):
         """
         Delete the selected lesson
         """
-        # Get selected item
-        current_item = self.lessons_list.currentItem()
+        # Get selected lesson
+        lesson_id = self.lessons_model.get_lesson_id(self.lessons_list.currentIndex().row())
         
-        if not current_item:
+        if lesson_id is None:
             QMessageBox.warning(self, "No Selection", "Please select a lesson to delete.")
             return
         
@@ -194,11 +309,113 @@ class LessonsView(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            # Get lesson ID and delete
-            lesson_id = current_item.data(Qt.ItemDataRole.UserRole)
+            # Delete the lesson
             self.db.delete_lesson(lesson_id)
             
             # Reload lessons
             self.load_lessons()
             
             QMessageBox.information(self, "Success", "Lesson deleted successfully!")
+    
+    def import_folder(self):
+        """
+        Import every PDF in a chosen folder as a lesson, in the background
+        """
+        # Only one import at a time
+        if self.import_job is not None:
+            QMessageBox.information(self, "Import Running", "A folder is already being imported.")
+            return
+        
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder to Import")
+        if not folder:
+            return
+        
+        # Progress dialog with a working Cancel button
+        self.import_progress = QProgressDialog("Looking for PDF files...", "Cancel", 0, 0, self)
+        self.import_progress.setWindowTitle("Import Folder")
+        self.import_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.import_progress.setAutoClose(False)
+        self.import_progress.setAutoReset(False)
+        self.import_progress.setMinimumDuration(0)
+        
+        # The import checks the job's cancel flag between files
+        job = BackgroundJob(import_folder, folder, self.db)
+        job.kwargs['progress_callback'] = job.report_progress
+        job.kwargs['is_cancelled'] = job.is_cancelled
+        
+        job.signals.progress.connect(self.show_import_progress)
+        job.signals.result.connect(self.show_import_result)
+        job.signals.error.connect(self.show_import_error)
+        job.signals.finished.connect(self.finish_import)
+        self.import_progress.canceled.connect(job.cancel)
+        
+        self.import_job = self.import_runner.start(job)
+    
+    def shutdown(self):
+        """
+        Stop background work before the app closes the database
+        A running import is cancelled and gets a moment to save what it has.
+        """
+        self.filter_timer.stop()
+        self.query_runner.cancel(self.query_job)
+        self.import_runner.cancel(self.import_job)
+        
+        self.query_runner.wait_for_done(IMPORT_SHUTDOWN_TIMEOUT_MS)
+        self.import_runner.wait_for_done(IMPORT_SHUTDOWN_TIMEOUT_MS)
+    
+    def show_import_progress(self, progress):
+        """
+        Update the import progress dialog
+        
+        Args:
+            progress: Tuple of (files_done, file_count)
+        """
+        files_done, file_count = progress
+        
+        if self.import_progress is not None:
+            self.import_progress.setMaximum(file_count)
+            self.import_progress.setLabelText(f"Importing file {files_done} of {file_count}...")
+            self.import_progress.setValue(files_done)
+    
+    def show_import_result(self, report):
+        """
+        Show a summary of a finished import
+        
+        Args:
+            report: Dictionary from import_folder()
+        """
+        if report['file_count'] == 0:
+            QMessageBox.information(self, "Import Folder", "No PDF files were found in this folder.")
+            return
+        
+        message = f"Imported {report['imported']} of {report['file_count']} PDF files."
+        
+        # List a few of the files that could not be imported
+        if report['skipped']:
+            message += f"\n\n{len(report['skipped'])} files were skipped, for example:"
+            for file_path, reason in report['skipped'][:5]:
+                message += f"\n- {file_path}: {reason}"
+        
+        QMessageBox.information(self, "Import Complete", message)
+    
+    def show_import_error(self, error_message):
+        """
+        Show an error from a failed import
+        
+        Args:
+            error_message: Error text from the background job
+        """
+        QMessageBox.warning(self, "Import Failed", error_message)
+    
+    def finish_import(self):
+        """
+        Close the progress dialog and show the imported lessons
+        """
+        if self.import_progress is not None:
+            self.import_progress.close()
+            self.import_progress = None
+        
+        self.import_job = None
+        
+        # Lessons saved before a cancel are kept, so reload in every case
+        self.load_lessons()
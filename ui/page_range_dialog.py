@@ -0,0 +1,168 @@
+"""
+Page Range Dialog
+Dialog for choosing which pages of a large PDF to extract
+"""
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+                              QSpinBox, QPushButton, QListWidget, QListWidgetItem,
+                              QTextEdit)
+from PyQt6.QtCore import Qt
+
+# Number of characters of the first page shown as a preview
+PREVIEW_LENGTH = 600
+
+class PageRangeDialog(QDialog):
+    def __init__(self, document, parent=None):
+        """
+        Initialize the page range dialog
+        
+        Args:
+            document: PdfDocument to choose pages from
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        
+        self.document = document
+        self.page_count = document.get_page_count()
+        
+        self.setWindowTitle("Choose Pages")
+        self.setMinimumWidth(500)
+        
+        # Store result (start page inclusive, end page exclusive, both 0-based)
+        self.page_range = None
+        
+        # Setup UI
+        self.setup_ui()
+        
+        # Show the first page
+        self.update_preview()
+    
+    def setup_ui(self):
+        """
+        Create the dialog interface
+        """
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        
+        info_label = QLabel(f"This PDF has {self.page_count} pages. Choose the pages you need:")
+        layout.addWidget(info_label)
+        
+        # Chapters from the PDF's bookmarks (only shown if there are any)
+        outline = self.document.get_outline()
+        if outline:
+            chapters_label = QLabel("Chapters:")
+            layout.addWidget(chapters_label)
+            
+            self.chapters_list = QListWidget()
+            for entry in outline:
+                indent = "    " * entry['level']
+                item_text = f"{indent}{entry['title']} (pages {entry['start_page'] + 1}-{entry['end_page']})"
+                item = QListWidgetItem(item_text)
+                item.setData(Qt.ItemDataRole.UserRole, (entry['start_page'], entry['end_page']))
+                self.chapters_list.addItem(item)
+            self.chapters_list.currentItemChanged.connect(self.select_chapter)
+            layout.addWidget(self.chapters_list)
+        
+        # Page range row
+        range_layout = QHBoxLayout()
+        
+        range_layout.addWidget(QLabel("From page:"))
+        self.start_input = QSpinBox()
+        self.start_input.setRange(1, self.page_count)
+        self.start_input.setValue(1)
+        self.start_input.valueChanged.connect(self.update_preview)
+        range_layout.addWidget(self.start_input)
+        
+        range_layout.addWidget(QLabel("To page:"))
+        self.end_input = QSpinBox()
+        self.end_input.setRange(1, self.page_count)
+        self.end_input.setValue(self.page_count)
+        range_layout.addWidget(self.end_input)
+        
+        range_layout.addStretch()
+        layout.addLayout(range_layout)
+        
+        # Preview of the first chosen page (extracted on demand)
+        preview_label = QLabel("First page preview:")
+        layout.addWidget(preview_label)
+        
+        self.preview_output = QTextEdit()
+        self.preview_output.setReadOnly(True)
+        self.preview_output.setMaximumHeight(150)
+        layout.addWidget(self.preview_output)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        
+        extract_button = QPushButton("Extract Pages")
+        extract_button.clicked.connect(self.accept_range)
+        button_layout.addWidget(extract_button)
+        
+        all_pages_button = QPushButton("All Pages")
+        all_pages_button.clicked.connect(self.accept_all_pages)
+        button_layout.addWidget(all_pages_button)
+        
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        
+        layout.addLayout(button_layout)
+    
+    def select_chapter(self, current_item, previous_item):
+        """
+        Set the page range to the chosen chapter
+        
+        Args:
+            current_item: Selected chapter item
+            previous_item: Previously selected item (unused)
+        """
+        if current_item is None:
+            return
+        
+        start_page, end_page = current_item.data(Qt.ItemDataRole.UserRole)
+        self.start_input.setValue(start_page + 1)
+        self.end_input.setValue(end_page)
+    
+    def update_preview(self):
+        """
+        Show the beginning of the first chosen page
+        """
+        page_text = self.document.get_page_text(self.start_input.value() - 1).strip()
+        
+        if not page_text:
+            page_text = "(No text on this page)"
+        elif len(page_text) > PREVIEW_LENGTH:
+            page_text = page_text[:PREVIEW_LENGTH] + "..."
+        
+        self.preview_output.setPlainText(page_text)
+    
+    def accept_range(self):
+        """
+        Use the chosen page range
+        """
+        start_page = self.start_input.value()
+        end_page = self.end_input.value()
+        
+        # Accept ranges entered the wrong way round
+        if end_page < start_page:
+            start_page, end_page = end_page, start_page
+        
+        self.page_range = (start_page - 1, end_page)
+        self.accept()
+    
+    def accept_all_pages(self):
+        """
+        Use every page of the document
+        """
+        self.page_range = (0, self.page_count)
+        self.accept()
+    
+    def get_page_range(self):
+        """
+        Get the chosen page range
+        
+        Returns:
+            Tuple of (start_page, end_page) with 0-based indexes (end exclusive),
+            or None if cancelled
+        """
+        return self.page_range
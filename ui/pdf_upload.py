@@ -0,0 +1,201 @@
+"""
+PDF Upload
+Extracts a chosen PDF in the background and shows its pages in a text box as they arrive
+"""
+
+from PyQt6.QtCore import QObject, Qt
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from ui.page_range_dialog import PageRangeDialog
+from utils.background import JobRunner
+from utils.helpers import extract_text_from_pdf
+from utils.pdf_document import PdfDocument
+
+# PDFs with more pages than this ask which pages to extract
+PAGE_RANGE_DIALOG_THRESHOLD = 30
+
+class PdfUpload(QObject):
+    def __init__(self, text_edit):
+        """
+        Initialize the PDF upload helper
+        
+        Args:
+            text_edit: QTextEdit the extracted text is added to
+        """
+        super().__init__(text_edit)
+        
+        self.text_edit = text_edit
+        
+        # One extraction at a time, separate from AI requests
+        self.runner = JobRunner(max_concurrent=1)
+        self.job = None
+        self.document = None
+        self.progress_dialog = None
+        
+        # Text box content from before the upload, and whether the extraction finished
+        self.original_text = ""
+        self.received_result = False
+    
+    def start(self):
+        """
+        Ask for a PDF (and for large files, which pages) and start extracting it
+        """
+        # Only one upload at a time
+        if self.job is not None:
+            QMessageBox.information(self.text_edit, "Upload PDF", "A PDF is already being extracted.")
+            return
+        
+        parent_widget = self.text_edit.window()
+        file_path, _ = QFileDialog.getOpenFileName(
+            parent_widget,
+            "Select PDF File",
+            "",
+            "PDF Files (*.pdf)"
+        )
+        
+        # Check if file was selected
+        if not file_path:
+            return
+        
+        # Large PDFs: only extract the pages the student needs
+        self.document = PdfDocument(file_path)
+        page_range = None
+        try:
+            page_count = self.document.get_page_count()
+        except Exception as e:
+            QMessageBox.warning(parent_widget, "Upload PDF", f"Error reading PDF file: {str(e)}")
+            self.document = None
+            return
+        
+        if page_count > PAGE_RANGE_DIALOG_THRESHOLD:
+            page_range_dialog = PageRangeDialog(self.document, parent_widget)
+            if not page_range_dialog.exec():
+                self.document = None
+                return
+            
+            # The whole file shares its cache entry with other uploads of it
+            page_range = page_range_dialog.get_page_range()
+            if page_range == (0, page_count):
+                page_range = None
+        
+        # Pages are shown after the existing text while they arrive
+        self.original_text = self.text_edit.toPlainText()
+        self.received_result = False
+        self.text_edit.setReadOnly(True)
+        if self.original_text.strip():
+            self.append_text("\n\n")
+        else:
+            self.text_edit.clear()
+        
+        # Show progress while extracting (only appears for slow files)
+        self.progress_dialog = QProgressDialog("Extracting text from PDF...", "Cancel", 0, 0, parent_widget)
+        self.progress_dialog.setWindowTitle("Upload PDF")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(500)
+        
+        # The reader opened for the page count is reused by the job
+        self.job = self.runner.submit_with_progress(
+            extract_text_from_pdf,
+            file_path,
+            page_range=page_range,
+            reader=self.document.get_reader()
+        )
+        self.job.signals.progress.connect(self.show_page)
+        self.job.signals.result.connect(self.show_result)
+        self.job.signals.error.connect(self.show_error)
+        self.job.signals.finished.connect(self.finish)
+        self.progress_dialog.canceled.connect(self.job.cancel)
+    
+    def is_current_job(self):
+        """
+        Check if the signal being handled comes from the running extraction
+        
+        Returns:
+            True if the sender is the current job
+        """
+        return self.job is not None and self.sender() is self.job.signals
+    
+    def append_text(self, text):
+        """
+        Add text at the end of the text box
+        
+        Args:
+            text: Text to add
+        """
+        cursor = self.text_edit.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+    
+    def show_page(self, progress):
+        """
+        Show a page that was just extracted
+        
+        Args:
+            progress: Tuple of (pages_done, page_count, page_text)
+        """
+        if not self.is_current_job():
+            return
+        
+        pages_done, page_count, page_text = progress
+        self.append_text(page_text + "\n")
+        
+        if self.progress_dialog is not None:
+            self.progress_dialog.setMaximum(page_count)
+            self.progress_dialog.setLabelText(f"Extracting page {pages_done} of {page_count}...")
+            self.progress_dialog.setValue(pages_done)
+    
+    def show_result(self, text):
+        """
+        Replace the pages shown so far with the cleaned-up text of the whole file
+        
+        Args:
+            text: Extracted text (or a message if nothing could be extracted),
+                None if the extraction was cancelled
+        """
+        if not self.is_current_job() or text is None:
+            return
+        
+        self.received_result = True
+        
+        # Combine existing text with extracted text
+        if self.original_text.strip():
+            self.text_edit.setPlainText(self.original_text + "\n\n" + text)
+        else:
+            self.text_edit.setPlainText(text)
+    
+    def show_error(self, error_message):
+        """
+        Show an error from a failed extraction
+        
+        Args:
+            error_message: Error text from the background job
+        """
+        if self.is_current_job():
+            QMessageBox.warning(self.text_edit.window(), "Upload PDF", error_message)
+    
+    def finish(self):
+        """
+        Close the progress dialog and unlock the text box
+        Without a result (cancelled or failed), the text box goes back to how it was.
+        """
+        if not self.is_current_job():
+            return
+        
+        if not self.received_result:
+            self.text_edit.setPlainText(self.original_text)
+        self.text_edit.setReadOnly(False)
+        
+        if self.progress_dialog is not None:
+            self.progress_dialog.close()
+            self.progress_dialog = None
+        
+        # Free the pages read for the page range dialog
+        self.document.close()
+        self.document = None
+        self.job = None
+    
+    def shutdown(self):
+        """
+        Cancel a running extraction (e.g. when the app closes)
+        """
+        self.runner.cancel(self.job)
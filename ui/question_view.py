@@ -7,8 +7,12 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTextEdi
                               QPushButton, QComboBox, QMessageBox)
 from PyQt6.QtCore import Qt
 from ai.question_generator import QuestionGenerator
-from utils.helpers import open_pdf_dialog
+from ai.study_pack import StudyPackGenerator
+from utils.background import get_ai_runner
+from ui.streaming_output import StreamingOutput
+from ui.pdf_upload import PdfUpload
 from data.database import Database
+from ui.lesson_list_model import LessonListModel
 from ui.save_lesson_dialog import SaveLessonDialog
 
 class QuestionView(QWidget):
@@ -19,8 +23,13 @@ class QuestionView(QWidget):
         super().__init__()
         
         self.question_generator = QuestionGenerator()
+        self.study_pack_generator = StudyPackGenerator()
         self.db = Database()
         
+        # Background runner for AI requests (keeps the window responsive)
+        self.runner = get_ai_runner()
+        self.question_job = None
+        
         # Setup UI
         self.setup_ui()
         
@@ -47,8 +56,14 @@ class QuestionView(QWidget):
         selector_label = QLabel("Load Saved Lesson:")
         selector_layout.addWidget(selector_label)
         
+        self.lesson_model = LessonListModel(
+            self.db,
+            format_lesson=self.format_lesson_option,
+            placeholder_text="-- Select a lesson --",
+            parent=self
+        )
         self.lesson_selector = QComboBox()
-        self.lesson_selector.addItem("-- Select a lesson --")
+        self.lesson_selector.setModel(self.lesson_model)
         self.lesson_selector.currentIndexChanged.connect(self.load_selected_lesson)
         selector_layout.addWidget(self.lesson_selector)
         
@@ -65,6 +80,9 @@ class QuestionView(QWidget):
         self.text_input.setMinimumHeight(200)
         layout.addWidget(self.text_input)
         
+        # Uploaded PDFs are extracted in the background into the input area
+        self.pdf_upload = PdfUpload(self.text_input)
+        
         # Button row (Upload PDF + Save Lesson + Generate Questions)
         button_layout = QHBoxLayout()
         
@@ -86,6 +104,13 @@ class QuestionView(QWidget):
         generate_button.setMinimumHeight(40)
         button_layout.addWidget(generate_button)
         
+        # Study Pack button (summary + questions in one request)
+        study_pack_button = QPushButton("Study Pack")
+        study_pack_button.setToolTip("Create the summary and practice questions together in one request")
+        study_pack_button.clicked.connect(self.generate_study_pack)
+        study_pack_button.setMinimumHeight(40)
+        button_layout.addWidget(study_pack_button)
+        
         layout.addLayout(button_layout)
         
         # Output label
@@ -98,6 +123,9 @@ class QuestionView(QWidget):
         self.questions_output.setReadOnly(True)
         self.questions_output.setMinimumHeight(200)
         layout.addWidget(self.questions_output)
+        
+        # Shows streamed AI text as it arrives
+        self.questions_stream = StreamingOutput(self.questions_output)
     
     def generate_questions(self):
         """
@@ -111,55 +139,118 @@ class QuestionView(QWidget):
             self.questions_output.setPlainText("Please enter some text to generate questions from.")
             return
         
+        # Drop questions that are still being generated for older text
+        self.runner.cancel(self.question_job)
+        
+        # Stream the questions into the output box as it is generated
+        self.question_job = self.runner.submit_stream(self.question_generator.generate_stream, text)
+        self.questions_stream.watch(self.question_job, "Generating questions...")
+    
+    def generate_study_pack(self):
+        """
+        Generate the summary and practice questions together in one request
+        This view shows the questions. The summary is cached, so "Summarize"
+        in the summarizer view answers instantly for the same text.
+        """
+        # Get input text
+        text = self.text_input.toPlainText()
+        
+        # Check if text is empty
+        if not text or text.strip() == "":
+            self.questions_output.setPlainText("Please enter some text to generate questions from.")
+            return
+        
+        # Drop a request that is still running for older text
+        self.runner.cancel(self.question_job)
+        self.questions_stream.stop()
+        
         # Show loading message
-        self.questions_output.setPlainText("Generating questions...")
+        self.questions_output.setPlainText("Generating summary and questions...")
+        
+        # Generate study pack in the background
+        self.question_job = self.runner.submit(self.study_pack_generator.generate, text)
+        self.question_job.signals.result.connect(self.show_study_pack)
+        self.question_job.signals.error.connect(self.show_study_pack_error)
+    
+    def show_study_pack(self, study_pack):
+        """
+        Display the questions part of a finished study pack
+        
+        Args:
+            study_pack: Dictionary with 'summary' and 'questions' text
+        """
+        if self.is_current_job():
+            self.questions_output.setPlainText(study_pack['questions'])
+    
+    def show_study_pack_error(self, error_message):
+        """
+        Display an error from the study pack job
         
-        # Generate questions
-        questions = self.question_generator.generate(text)
+        Args:
+            error_message: Error message text
+        """
+        if self.is_current_job():
+            self.questions_output.setPlainText(error_message)
+    
+    def is_current_job(self):
+        """
+        Check if the signal being handled comes from the latest request
+        A study pack for older text may finish after a newer request started.
         
-        # Display questions
-        self.questions_output.setPlainText(questions)
+        Returns:
+            True if the sender is the current job
+        """
+        return self.question_job is not None and self.sender() is self.question_job.signals
     
     def upload_pdf(self):
         """
         Open file dialog to select and upload a PDF file
-        Extract text and insert into input area
+        The text is extracted in the background and added to the input area
         """
-        # Use shared PDF dialog function
-        extracted_text = open_pdf_dialog(self)
-        
-        # Check if file was selected and text extracted
-        if not extracted_text:
-            return
-        
-        # Get existing text in input area
-        existing_text = self.text_input.toPlainText()
+        self.pdf_upload.start()
+    
+    def shutdown(self):
+        """
+        Stop a running PDF extraction before the app closes
+        """
+        self.pdf_upload.shutdown()
+    
+    def format_lesson_option(self, lesson):
+        """
+        Get the text shown for a lesson in the selector
         
-        # Combine existing text with extracted text
-        if existing_text and existing_text.strip():
-            combined_text = existing_text + "\n\n" + extracted_text
-        else:
-            combined_text = extracted_text
+        Args:
+            lesson: LessonSummary
         
-        # Insert combined text into input area
-        self.text_input.setPlainText(combined_text)
+        Returns:
+            Display text
+        """
+        return f"{lesson.title} ({lesson.academic_year} - {lesson.semester} - {lesson.module})"
     
     def load_lessons_selector(self):
         """
         Populate the lesson selector dropdown with saved lessons
         """
-        # Clear existing items (except placeholder)
-        self.lesson_selector.clear()
-        self.lesson_selector.addItem("-- Select a lesson --")
+        # Remember which lessons are shown
+        self.lessons_version = self.db.get_data_version()
         
-        # Get all lessons from database
-        lessons = self.db.get_all_lessons()
+        # Keep the selection without reloading the lesson over the text being edited
+        lesson_id = self.lesson_selector.currentData()
+        self.lesson_selector.blockSignals(True)
+        
+        # Start again from the first page (more are loaded as the dropdown is scrolled,
+        # content is loaded when a lesson is selected)
+        self.lesson_model.set_filters()
         
-        # Add lessons to dropdown
-        for lesson in lessons:
-            # Format display: "Title (Year - Semester - Module)"
-            display_text = f"{lesson['title']} ({lesson['academic_year']} - {lesson['semester']} - {lesson['module']})"
-            self.lesson_selector.addItem(display_text, lesson['id'])
+        self.lesson_selector.setCurrentIndex(max(self.lesson_model.load_lesson_row(lesson_id), 0))
+        self.lesson_selector.blockSignals(False)
+    
+    def refresh(self):
+        """
+        Reload the lesson selector if lessons were saved or deleted since it was filled
+        """
+        if self.db.get_data_version() != self.lessons_version:
+            self.load_lessons_selector()
     
     def load_selected_lesson(self):
         """
@@ -0,0 +1,116 @@
+"""
+Streaming Output
+Shows AI text in an output box as it arrives, with batched repaints
+"""
+
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QTextCursor
+
+# How often buffered text is drawn (milliseconds)
+FLUSH_INTERVAL_MS = 50
+
+class StreamingOutput(QObject):
+    def __init__(self, text_edit):
+        """
+        Initialize the streaming output helper
+        
+        Args:
+            text_edit: Read-only QTextEdit that displays the text
+        """
+        super().__init__(text_edit)
+        
+        self.text_edit = text_edit
+        
+        # Signals of the job currently being shown
+        self.job_signals = None
+        
+        # Text received since the last repaint
+        self.pending_chunks = []
+        self.received_text = False
+        
+        # Timer that draws pending text in batches instead of once per piece
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+    
+    def watch(self, job, loading_message):
+        """
+        Show the output of a streaming job
+        A loading message is shown until the first piece arrives
+        
+        Args:
+            job: StreamJob whose pieces should be displayed
+            loading_message: Message to show, e.g. "Generating summary..."
+        """
+        self.job_signals = job.signals
+        self.pending_chunks = []
+        self.received_text = False
+        self.text_edit.setPlainText(loading_message)
+        
+        job.signals.progress.connect(self.append_chunk)
+        job.signals.result.connect(self.finish)
+        job.signals.error.connect(self.finish)
+        
+        self.flush_timer.start()
+    
+    def is_current_job(self):
+        """
+        Check if the signal being handled comes from the watched job
+        Pieces from an older, cancelled job may still be queued.
+        
+        Returns:
+            True if the sender is the watched job
+        """
+        return self.sender() is self.job_signals
+    
+    def append_chunk(self, chunk):
+        """
+        Queue a piece of text to be drawn on the next flush
+        
+        Args:
+            chunk: Piece of response text
+        """
+        if self.is_current_job():
+            self.pending_chunks.append(chunk)
+    
+    def flush(self):
+        """
+        Draw all queued text at the end of the output box
+        """
+        if not self.pending_chunks:
+            return
+        
+        # Replace the loading message with the first real text
+        if not self.received_text:
+            self.text_edit.clear()
+            self.received_text = True
+        
+        cursor = self.text_edit.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText("".join(self.pending_chunks))
+        self.pending_chunks = []
+    
+    def finish(self, full_text):
+        """
+        Stop streaming and show the complete text
+        
+        Args:
+            full_text: The complete response (or an error message)
+        """
+        if not self.is_current_job():
+            return
+        
+        self.flush_timer.stop()
+        self.flush()
+        
+        # Errors and cached responses may differ from what was streamed
+        if self.text_edit.toPlainText() != full_text:
+            self.text_edit.setPlainText(full_text)
+    
+    def stop(self):
+        """
+        Stop showing the watched job (e.g. when a different result replaces it)
+        """
+        self.flush_timer.stop()
+        self.pending_chunks = []
+        self.job_signals = None
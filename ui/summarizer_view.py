@@ -6,8 +6,12 @@ Interface for summarizing lessons
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QPushButton, QComboBox, QMessageBox)
 from PyQt6.QtCore import Qt
 from ai.summarizer import Summarizer
-from utils.helpers import open_pdf_dialog
+from ai.study_pack import StudyPackGenerator
+from utils.background import get_ai_runner
+from ui.streaming_output import StreamingOutput
+from ui.pdf_upload import PdfUpload
 from data.database import Database
+from ui.lesson_list_model import LessonListModel
 from ui.save_lesson_dialog import SaveLessonDialog
 
 class SummarizerView(QWidget):
@@ -18,8 +22,13 @@ class SummarizerView(QWidget):
         super().__init__()
         
         self.summarizer = Summarizer()
+        self.study_pack_generator = StudyPackGenerator()
         self.db = Database()
         
+        # Background runner for AI requests (keeps the window responsive)
+        self.runner = get_ai_runner()
+        self.summary_job = None
+        
         # Setup UI
         self.setup_ui()
         
@@ -46,8 +55,14 @@ class SummarizerView(QWidget):
         selector_label = QLabel("Load Saved Lesson:")
         selector_layout.addWidget(selector_label)
         
+        self.lesson_model = LessonListModel(
+            self.db,
+            format_lesson=self.format_lesson_option,
+            placeholder_text="-- Select a lesson --",
+            parent=self
+        )
         self.lesson_selector = QComboBox()
-        self.lesson_selector.addItem("-- Select a lesson --")
+        self.lesson_selector.setModel(self.lesson_model)
         self.lesson_selector.currentIndexChanged.connect(self.load_selected_lesson)
         selector_layout.addWidget(self.lesson_selector)
         
@@ -64,6 +79,9 @@ class SummarizerView(QWidget):
         self.text_input.setMinimumHeight(200)
         layout.addWidget(self.text_input)
         
+        # Uploaded PDFs are extracted in the background into the input area
+        self.pdf_upload = PdfUpload(self.text_input)
+        
         # Button row (Upload PDF + Save Lesson + Summarize)
         button_layout = QHBoxLayout()
         
@@ -85,6 +103,13 @@ class SummarizerView(QWidget):
         summarize_button.setMinimumHeight(40)
         button_layout.addWidget(summarize_button)
         
+        # Study Pack button (summary + questions in one request)
+        study_pack_button = QPushButton("Study Pack")
+        study_pack_button.setToolTip("Create the summary and practice questions together in one request")
+        study_pack_button.clicked.connect(self.generate_study_pack)
+        study_pack_button.setMinimumHeight(40)
+        button_layout.addWidget(study_pack_button)
+        
         layout.addLayout(button_layout)
         
         # Output label
@@ -97,22 +122,46 @@ class SummarizerView(QWidget):
         self.summary_output.setReadOnly(True)
         self.summary_output.setMinimumHeight(200)
         layout.addWidget(self.summary_output)
+        
+        # Shows streamed AI text as it arrives
+        self.summary_stream = StreamingOutput(self.summary_output)
+    
+    def format_lesson_option(self, lesson):
+        """
+        Get the text shown for a lesson in the selector
+        
+        Args:
+            lesson: LessonSummary
+        
+        Returns:
+            Display text
+        """
+        return f"{lesson.title} - {lesson.module} ({lesson.academic_year})"
     
     def load_lessons_selector(self):
         """
         Load all lessons into the selector dropdown
         """
-        # Clear current items
-        self.lesson_selector.clear()
-        self.lesson_selector.addItem("-- Select a lesson --", None)
+        # Remember which lessons are shown
+        self.lessons_version = self.db.get_data_version()
+        
+        # Keep the selection without reloading the lesson over the text being edited
+        lesson_id = self.lesson_selector.currentData()
+        self.lesson_selector.blockSignals(True)
         
-        # Get all lessons from database
-        lessons = self.db.get_all_lessons()
+        # Start again from the first page (more are loaded as the dropdown is scrolled,
+        # content is loaded when a lesson is selected)
+        self.lesson_model.set_filters()
         
-        # Add lessons to selector
-        for lesson in lessons:
-            display_text = f"{lesson['title']} - {lesson['module']} ({lesson['academic_year']})"
-            self.lesson_selector.addItem(display_text, lesson['id'])
+        self.lesson_selector.setCurrentIndex(max(self.lesson_model.load_lesson_row(lesson_id), 0))
+        self.lesson_selector.blockSignals(False)
+    
+    def refresh(self):
+        """
+        Reload the lesson selector if lessons were saved or deleted since it was filled
+        """
+        if self.db.get_data_version() != self.lessons_version:
+            self.load_lessons_selector()
     
     def load_selected_lesson(self):
         """
@@ -177,35 +226,78 @@ class SummarizerView(QWidget):
             self.summary_output.setPlainText("Please enter some text to summarize.")
             return
         
-        # Show loading message
-        self.summary_output.setPlainText("Generating summary...")
-        
-        # Generate summary
-        summary = self.summarizer.summarize(text)
+        # Drop a summary that is still running for older text
+        self.runner.cancel(self.summary_job)
         
-        # Display summary
-        self.summary_output.setPlainText(summary)
+        # Stream the summary into the output box as it is generated
+        self.summary_job = self.runner.submit_stream(self.summarizer.summarize_stream, text)
+        self.summary_stream.watch(self.summary_job, "Generating summary...")
     
-    def upload_pdf(self):
+    def generate_study_pack(self):
         """
-        Open file dialog to select and upload a PDF file
-        Extract text and insert into input area
+        Generate the summary and practice questions together in one request
+        This view shows the summary. The questions are cached, so "Generate
+        Questions" in the questions view answers instantly for the same text.
         """
-        # Use shared PDF dialog function
-        extracted_text = open_pdf_dialog(self)
+        # Get input text
+        text = self.text_input.toPlainText()
         
-        # Check if file was selected and text extracted
-        if not extracted_text:
+        # Check if text is empty
+        if not text or text.strip() == "":
+            self.summary_output.setPlainText("Please enter some text to summarize.")
             return
         
-        # Get existing text in input area
-        existing_text = self.text_input.toPlainText()
+        # Drop a request that is still running for older text
+        self.runner.cancel(self.summary_job)
+        self.summary_stream.stop()
+        
+        # Show loading message
+        self.summary_output.setPlainText("Generating summary and questions...")
+        
+        # Generate study pack in the background
+        self.summary_job = self.runner.submit(self.study_pack_generator.generate, text)
+        self.summary_job.signals.result.connect(self.show_study_pack)
+        self.summary_job.signals.error.connect(self.show_study_pack_error)
+    
+    def show_study_pack(self, study_pack):
+        """
+        Display the summary part of a finished study pack
         
-        # Combine existing text with extracted text
-        if existing_text and existing_text.strip():
-            combined_text = existing_text + "\n\n" + extracted_text
-        else:
-            combined_text = extracted_text
+        Args:
+            study_pack: Dictionary with 'summary' and 'questions' text
+        """
+        if self.is_current_job():
+            self.summary_output.setPlainText(study_pack['summary'])
+    
+    def show_study_pack_error(self, error_message):
+        """
+        Display an error from the study pack job
+        
+        Args:
+            error_message: Error message text
+        """
+        if self.is_current_job():
+            self.summary_output.setPlainText(error_message)
+    
+    def is_current_job(self):
+        """
+        Check if the signal being handled comes from the latest request
+        A study pack for older text may finish after a newer request started.
         
-        # Insert combined text into input area
-        self.text_input.setPlainText(combined_text)
+        Returns:
+            True if the sender is the current job
+        """
+        return self.summary_job is not None and self.sender() is self.summary_job.signals
+    
+    def upload_pdf(self):
+        """
+        Open file dialog to select and upload a PDF file
+        The text is extracted in the background and added to the input area
+        """
+        self.pdf_upload.start()
+    
+    def shutdown(self):
+        """
+        Stop a running PDF extraction before the app closes
+        """
+        self.pdf_upload.shutdown()
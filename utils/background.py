@@ -0,0 +1,267 @@
+"""
+Background Jobs
+Runs slow work (AI requests, file processing) off the Qt GUI thread
+"""
+
+from functools import partial
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ai.rate_limiter import MAX_REQUESTS_IN_FLIGHT
+
+# Default number of jobs a runner runs at the same time
+DEFAULT_MAX_CONCURRENT_JOBS = 3
+
+class JobSignals(QObject):
+    """
+    Signals emitted by a background job
+    Signals are delivered on the GUI thread, so slots can update widgets safely
+    """
+    progress = pyqtSignal(object)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+class BackgroundJob(QRunnable):
+    def __init__(self, function, *args, **kwargs):
+        """
+        Initialize a background job
+        
+        Args:
+            function: Function to run in the background
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+        """
+        super().__init__()
+        
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self.cancelled = False
+        
+        # The runner keeps a reference to the job, so Qt must not delete it
+        self.setAutoDelete(False)
+    
+    def cancel(self):
+        """
+        Cancel the job
+        A job that has not started yet will never run. A running job finishes
+        its current call, but its result is discarded.
+        """
+        self.cancelled = True
+    
+    def is_cancelled(self):
+        """
+        Check if the job has been cancelled
+        
+        Returns:
+            True if cancelled, False otherwise
+        """
+        return self.cancelled
+    
+    def report_progress(self, value):
+        """
+        Report progress from inside the running function
+        
+        Args:
+            value: Progress value (message, page count, text chunk, ...)
+        
+        Returns:
+            False once the job is cancelled (so long loops know to stop), True otherwise
+        """
+        if self.cancelled:
+            return False
+        
+        self.signals.progress.emit(value)
+        return True
+    
+    def run(self):
+        """
+        Run the function on a worker thread and emit the outcome
+        """
+        try:
+            # Skip jobs that were cancelled while waiting in the queue
+            if self.cancelled:
+                return
+            
+            result = self.function(*self.args, **self.kwargs)
+            
+            # Only deliver results nobody has cancelled
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(f"Something went wrong: {str(e)}")
+        
+        finally:
+            self.signals.finished.emit()
+
+class StreamJob(BackgroundJob):
+    def __init__(self, stream_function, *args, **kwargs):
+        """
+        Initialize a job that consumes a generator of text pieces
+        Each piece is emitted through the progress signal as it arrives,
+        and the joined text is emitted through the result signal at the end.
+        
+        Args:
+            stream_function: Generator function yielding text pieces
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+        """
+        super().__init__(self.collect_stream)
+        
+        self.stream_function = stream_function
+        self.stream_args = args
+        self.stream_kwargs = kwargs
+    
+    def collect_stream(self):
+        """
+        Read the stream until it ends or the job is cancelled
+        
+        Returns:
+            All pieces joined into one string
+        """
+        chunks = []
+        stream = self.stream_function(*self.stream_args, **self.stream_kwargs)
+        
+        try:
+            for chunk in stream:
+                # Stop reading (and stop the request) once cancelled
+                if self.cancelled:
+                    break
+                
+                chunks.append(chunk)
+                self.report_progress(chunk)
+        finally:
+            stream.close()
+        
+        return "".join(chunks)
+
+class JobRunner:
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT_JOBS):
+        """
+        Initialize the job runner
+        
+        Args:
+            max_concurrent: Maximum number of jobs running at the same time
+        """
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(max_concurrent)
+        
+        # Jobs that are queued or running
+        self.active_jobs = set()
+    
+    def submit(self, function, *args, **kwargs):
+        """
+        Run a function in the background
+        
+        Args:
+            function: Function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+        
+        Returns:
+            BackgroundJob handle with progress, result, error and finished signals
+        """
+        job = BackgroundJob(function, *args, **kwargs)
+        return self.start(job)
+    
+    def submit_with_progress(self, function, *args, **kwargs):
+        """
+        Run a function in the background and give it a progress callback
+        The function receives the callback as its `progress_callback` keyword argument.
+        
+        Args:
+            function: Function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+        
+        Returns:
+            BackgroundJob handle
+        """
+        job = BackgroundJob(function, *args, **kwargs)
+        job.kwargs['progress_callback'] = job.report_progress
+        return self.start(job)
+    
+    def submit_stream(self, stream_function, *args, **kwargs):
+        """
+        Run a streaming function in the background
+        
+        Args:
+            stream_function: Generator function yielding text pieces
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+        
+        Returns:
+            StreamJob handle (progress carries pieces, result carries the full text)
+        """
+        job = StreamJob(stream_function, *args, **kwargs)
+        return self.start(job)
+    
+    def start(self, job):
+        """
+        Queue an already created job
+        
+        Args:
+            job: BackgroundJob to run
+        
+        Returns:
+            The same job
+        """
+        self.active_jobs.add(job)
+        job.signals.finished.connect(partial(self.forget_job, job))
+        self.thread_pool.start(job)
+        return job
+    
+    def forget_job(self, job):
+        """
+        Stop keeping a finished job alive
+        
+        Args:
+            job: BackgroundJob that finished
+        """
+        self.active_jobs.discard(job)
+    
+    def cancel(self, job):
+        """
+        Cancel a job and remove it from the queue if it has not started
+        
+        Args:
+            job: BackgroundJob to cancel
+        """
+        if job is None:
+            return
+        
+        job.cancel()
+        
+        # A job taken from the queue never runs, so clean it up here
+        if self.thread_pool.tryTake(job):
+            self.active_jobs.discard(job)
+    
+    def wait_for_done(self, timeout_ms):
+        """
+        Wait for the queued and running jobs to finish
+        
+        Args:
+            timeout_ms: Longest time to wait in milliseconds
+        
+        Returns:
+            True if every job finished in time
+        """
+        return self.thread_pool.waitForDone(timeout_ms)
+
+# Shared runner used for AI requests (created on first use)
+_ai_runner = None
+
+def get_ai_runner():
+    """
+    Get the shared job runner for AI requests
+    All views share it, so the concurrency cap applies to the whole app
+    
+    Returns:
+        Shared JobRunner instance
+    """
+    global _ai_runner
+    if _ai_runner is None:
+        _ai_runner = JobRunner(MAX_REQUESTS_IN_FLIGHT)
+    return _ai_runner
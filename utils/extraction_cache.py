@@ -0,0 +1,220 @@
+"""
+Extraction Cache
+Stores text extracted from PDFs on disk, so the same file is only extracted once
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+
+# Cache folder lives next to the lessons database (study_buddy.db)
+CACHE_DIR_NAME = "study_buddy_pdf_cache"
+
+# Eviction limit (compressed size on disk)
+DEFAULT_MAX_SIZE_BYTES = 200 * 1024 * 1024
+
+# Files are hashed in blocks, so large PDFs are never fully in memory
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Extension of cache entries (zlib-compressed UTF-8 text)
+ENTRY_EXTENSION = ".txt.z"
+
+class ExtractionCache:
+    def __init__(self, cache_dir=CACHE_DIR_NAME, max_size_bytes=DEFAULT_MAX_SIZE_BYTES):
+        """
+        Initialize the extraction cache
+        
+        Args:
+            cache_dir: Folder that holds the cache entries
+            max_size_bytes: Maximum total size of the cache entries
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        
+        # Hit/miss counters for this session
+        self.hits = 0
+        self.misses = 0
+        
+        # File hashes by (path, size, modification time), so unchanged files are hashed once
+        self.file_hashes = {}
+        
+        # Extraction runs in background threads, so guard the folder
+        self.lock = threading.Lock()
+    
+    def make_key(self, file_path, extractor_version):
+        """
+        Build a cache key from the file content
+        Renamed or copied files share an entry; edited files get a new one.
+        
+        Args:
+            file_path: Path to the PDF file
+            extractor_version: Version of the extraction code (changing it invalidates old entries)
+        
+        Returns:
+            Hex digest string
+        """
+        file_stat = os.stat(file_path)
+        stat_key = (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)
+        
+        file_hash = self.file_hashes.get(stat_key)
+        if file_hash is None:
+            digest = hashlib.sha256()
+            with open(file_path, "rb") as pdf_file:
+                block = pdf_file.read(HASH_BLOCK_SIZE)
+                while block:
+                    digest.update(block)
+                    block = pdf_file.read(HASH_BLOCK_SIZE)
+            file_hash = digest.hexdigest()
+            self.file_hashes[stat_key] = file_hash
+        
+        key_source = f"{extractor_version}\n{file_hash}"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    
+    def get_entry_path(self, cache_key):
+        """
+        Get the file path of a cache entry
+        
+        Args:
+            cache_key: Key from make_key()
+        
+        Returns:
+            Path string
+        """
+        return os.path.join(self.cache_dir, cache_key + ENTRY_EXTENSION)
+    
+    def get(self, cache_key):
+        """
+        Look up cached text
+        
+        Args:
+            cache_key: Key from make_key()
+        
+        Returns:
+            Cached text, or None if not cached
+        """
+        entry_path = self.get_entry_path(cache_key)
+        
+        with self.lock:
+            try:
+                with open(entry_path, "rb") as entry_file:
+                    text = zlib.decompress(entry_file.read()).decode("utf-8")
+                
+                # Mark entry as recently used (for LRU eviction)
+                os.utime(entry_path)
+            except (OSError, zlib.error, UnicodeDecodeError):
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            return text
+    
+    def put(self, cache_key, text):
+        """
+        Store extracted text in the cache
+        A failed write is ignored: the cache only saves time.
+        
+        Args:
+            cache_key: Key from make_key()
+            text: Extracted text to store
+        """
+        entry_path = self.get_entry_path(cache_key)
+        temp_path = entry_path + ".tmp"
+        
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                
+                # Write to a temporary file first, so readers never see half an entry
+                with open(temp_path, "wb") as entry_file:
+                    entry_file.write(zlib.compress(text.encode("utf-8")))
+                os.replace(temp_path, entry_path)
+                
+                self.evict()
+            except OSError:
+                pass
+    
+    def list_entries(self):
+        """
+        List the cache entries
+        Caller must hold the lock.
+        
+        Returns:
+            List of (last_used, size, path) tuples
+        """
+        entries = []
+        
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(ENTRY_EXTENSION):
+                entry_stat = entry.stat()
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+        
+        return entries
+    
+    def evict(self):
+        """
+        Remove least recently used entries until under the size limit
+        Caller must hold the lock.
+        """
+        entries = self.list_entries()
+        
+        total_size = 0
+        for _, size, _ in entries:
+            total_size += size
+        
+        # Oldest first
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            os.remove(entry_path)
+            total_size -= size
+    
+    def clear(self):
+        """
+        Remove every cache entry
+        """
+        with self.lock:
+            for _, _, entry_path in self.list_entries():
+                os.remove(entry_path)
+    
+    def get_stats(self):
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, misses, entries and total size in bytes
+        """
+        with self.lock:
+            entries = self.list_entries()
+        
+        total_size = 0
+        for _, size, _ in entries:
+            total_size += size
+        
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'size_bytes': total_size
+        }
+
+# Shared cache instance (created on first use)
+_extraction_cache = None
+_extraction_cache_lock = threading.Lock()
+
+def get_extraction_cache():
+    """
+    Get the shared extraction cache
+    
+    Returns:
+        Shared ExtractionCache instance
+    """
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = ExtractionCache()
+    return _extraction_cache
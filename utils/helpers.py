@@ -3,8 +3,22 @@ Utility Functions
 Helper functions used across the application
 """
 
-from pypdf import PdfReader
-from PyQt6.QtWidgets import QFileDialog
+import logging
+from utils.extraction_cache import get_extraction_cache
+from utils.text_normalizer import normalize_pages
+from utils.pdf_document import open_pdf_reader, extract_page_texts, get_pdf_process_pool, get_pdf_worker_count
+
+# Bump when the extraction output changes, so cached texts are not reused
+EXTRACTOR_VERSION = "pypdf-v3-normalized"
+
+# PDFs with more pages than this are extracted by several processes
+PARALLEL_PAGE_THRESHOLD = 40
+
+# Number of pages in the first task, so the first pages are shown quickly
+# (the other pages are split evenly over the worker processes)
+PAGES_PER_TASK = 10
+
+logger = logging.getLogger(__name__)
 
 def validate_text_input(text):
     """
@@ -49,56 +63,153 @@ def format_response(response):
     response = response.strip()
     return response
 
-def extract_text_from_pdf(file_path):
+def join_page_texts(page_texts):
+    """
+    Join the texts of all pages into the text of the whole document
+    Repeated headers/footers, page numbers and broken words are cleaned up,
+    so they are not sent to the AI with every request.
+    
+    Args:
+        page_texts: List of page texts, in page order
+        
+    Returns:
+        Document text
+    """
+    text, stats = normalize_pages(page_texts)
+    
+    # Report how much was cut, so over-eager cleaning is easy to spot
+    logger.info(
+        "Removed %d lines (%d of %d characters) of PDF boilerplate",
+        stats['removed_lines'], stats['removed_characters'], stats['original_characters']
+    )
+    return text
+
+def split_page_blocks(first_page, last_page, worker_count):
+    """
+    Split a page range into blocks for the worker processes
+    The first block is small so its pages arrive quickly; the rest is one
+    block per worker, because every block opens and parses the file again.
+    
+    Args:
+        first_page: First page index (inclusive)
+        last_page: Last page index (exclusive)
+        worker_count: Number of worker processes
+        
+    Returns:
+        List of (start_page, end_page) tuples, in page order
+    """
+    blocks = []
+    
+    first_block_end = min(first_page + PAGES_PER_TASK, last_page)
+    blocks.append((first_page, first_block_end))
+    
+    remaining_pages = last_page - first_block_end
+    block_size = max(PAGES_PER_TASK, (remaining_pages + worker_count - 1) // worker_count)
+    for start_page in range(first_block_end, last_page, block_size):
+        blocks.append((start_page, min(start_page + block_size, last_page)))
+    
+    return blocks
+
+def iter_pdf_pages(file_path, reader=None, page_range=None):
+    """
+    Extract the text of a PDF page by page
+    Large files are split across worker processes, so all CPU cores are used.
+    Pages are always produced in order, and the first pages are available
+    before the rest of the file is done.
+    
+    Args:
+        file_path: Path to the PDF file
+        reader: Already opened PdfReader for the file (optional)
+        page_range: Tuple of (start_page, end_page), 0-based with the end
+            exclusive (optional, default is every page)
+        
+    Yields:
+        Text of each page
+    """
+    if reader is None:
+        reader = open_pdf_reader(file_path)
+    
+    first_page, last_page = page_range or (0, len(reader.pages))
+    page_count = last_page - first_page
+    worker_count = get_pdf_worker_count()
+    
+    # Small ranges (or single-core machines) are faster without extra processes
+    if page_count <= PARALLEL_PAGE_THRESHOLD or worker_count < 2:
+        for page_index in range(first_page, last_page):
+            yield reader.pages[page_index].extract_text() or ""
+        return
+    
+    executor = get_pdf_process_pool()
+    futures = []
+    try:
+        for start_page, end_page in split_page_blocks(first_page, last_page, worker_count):
+            futures.append(executor.submit(extract_page_texts, file_path, start_page, end_page))
+        
+        # Collect blocks in page order
+        for future in futures:
+            for page_text in future.result():
+                yield page_text
+    finally:
+        # Drop blocks that have not started if the caller stopped early
+        for future in futures:
+            future.cancel()
+
+def extract_text_from_pdf(file_path, progress_callback=None, page_range=None, reader=None):
     """
     Extract text content from a PDF file
     
     Args:
         file_path: Path to the PDF file
+        progress_callback: Function called with a (pages_done, page_count, page_text)
+            tuple after each page (optional), so callers can show pages as they
+            arrive. If it returns False, extraction stops.
+        page_range: Tuple of (start_page, end_page), 0-based with the end
+            exclusive (optional, default is every page)
+        reader: Already opened PdfReader for the file (optional)
         
     Returns:
-        Extracted text as a string, or error message if extraction fails
+        Extracted text as a string, error message if extraction fails,
+        or None if the progress callback cancelled it
     """
     try:
+        # A file that was extracted before is read from the cache
+        # (each page range is its own entry)
+        extraction_version = EXTRACTOR_VERSION
+        if page_range:
+            extraction_version += f":pages {page_range[0]}-{page_range[1]}"
+        
+        extraction_cache = get_extraction_cache()
+        cache_key = extraction_cache.make_key(file_path, extraction_version)
+        cached_text = extraction_cache.get(cache_key)
+        if cached_text is not None:
+            return cached_text
+        
         # Open and read the PDF
-        reader = PdfReader(file_path)
+        if reader is None:
+            reader = open_pdf_reader(file_path)
+        
+        if page_range:
+            page_count = page_range[1] - page_range[0]
+        else:
+            page_count = len(reader.pages)
+        
+        # Extract text from the chosen pages (joined once at the end)
+        page_texts = []
+        for page_text in iter_pdf_pages(file_path, reader, page_range):
+            page_texts.append(page_text)
+            
+            if progress_callback and progress_callback((len(page_texts), page_count, page_text)) is False:
+                return None
         
-        # Extract text from all pages
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
+        text = join_page_texts(page_texts)
         
         # Check if any text was extracted
-        if not text or text.strip() == "":
+        if not text:
             return "No text could be extracted from this PDF. The file may be image-based or empty."
         
-        return text.strip()
+        extraction_cache.put(cache_key, text)
+        
+        return text
     
     except Exception as e:
         return f"Error reading PDF file: {str(e)}"
-
-def open_pdf_dialog(parent_widget):
-    """
-    Open a file dialog to select a PDF and extract its text
-    Shared function for all views that need PDF upload functionality
-    
-    Args:
-        parent_widget: The parent widget (for dialog positioning)
-        
-    Returns:
-        Extracted text from the PDF, or None if no file was selected
-    """
-    # Open file dialog
-    file_path, _ = QFileDialog.getOpenFileName(
-        parent_widget,
-        "Select PDF File",
-        "",
-        "PDF Files (*.pdf)"
-    )
-    
-    # Check if file was selected
-    if not file_path:
-        return None
-    
-    # Extract and return text from PDF
-    return extract_text_from_pdf(file_path)
@@ -0,0 +1,266 @@
+"""
+Lesson Importer
+Imports a whole folder of PDFs into the lessons library in one go
+"""
+
+import os
+import re
+from concurrent.futures import as_completed
+from utils.extraction_cache import get_extraction_cache
+from utils.helpers import EXTRACTOR_VERSION, join_page_texts
+from utils.pdf_document import extract_page_texts, get_pdf_process_pool
+
+# Lessons are written to the database in transactions of this size
+IMPORT_BATCH_SIZE = 200
+
+# Used when the folder path does not say which year / semester / module a file belongs to
+DEFAULT_ACADEMIC_YEAR = "Unknown Year"
+DEFAULT_SEMESTER = "Unknown Semester"
+DEFAULT_MODULE = "General"
+
+# Folder name patterns, e.g. "2025-2026", "2025_26", "Semester 1", "Sem2", "Term 3"
+ACADEMIC_YEAR_PATTERN = re.compile(r"\b((?:19|20)\d{2})\s*[-_/]\s*((?:19|20)?\d{2})\b")
+SINGLE_YEAR_PATTERN = re.compile(r"^(?:19|20)\d{2}$")
+SEMESTER_PATTERN = re.compile(r"\b(?:semester|sem|term|s)\s*[-_]?\s*(\d)\b", re.IGNORECASE)
+
+def find_pdf_files(folder):
+    """
+    Find all PDF files in a folder and its subfolders
+    
+    Args:
+        folder: Folder to search
+    
+    Returns:
+        Sorted list of PDF file paths
+    """
+    pdf_files = []
+    for directory, _, file_names in os.walk(folder):
+        for file_name in file_names:
+            if file_name.lower().endswith(".pdf"):
+                pdf_files.append(os.path.join(directory, file_name))
+    
+    pdf_files.sort()
+    return pdf_files
+
+def parse_academic_year(folder_name):
+    """
+    Read an academic year from a folder name
+    
+    Args:
+        folder_name: Name of one folder
+    
+    Returns:
+        Academic year like "2025/2026", or None if the name is not a year
+    """
+    match = ACADEMIC_YEAR_PATTERN.search(folder_name)
+    if match:
+        start_year, end_year = match.groups()
+        
+        # "2025-26" means "2025/2026"
+        if len(end_year) == 2:
+            end_year = start_year[:2] + end_year
+        return f"{start_year}/{end_year}"
+    
+    if SINGLE_YEAR_PATTERN.match(folder_name.strip()):
+        return folder_name.strip()
+    
+    return None
+
+def parse_semester(folder_name):
+    """
+    Read a semester from a folder name
+    
+    Args:
+        folder_name: Name of one folder
+    
+    Returns:
+        Semester like "Semester 1", or None if the name is not a semester
+    """
+    match = SEMESTER_PATTERN.search(folder_name)
+    if match:
+        return f"Semester {match.group(1)}"
+    return None
+
+def infer_lesson_info(file_path, root_folder):
+    """
+    Work out a lesson's title, year, semester and module from where the file is
+    e.g. "Archive/2025-2026/Semester 1/Databases/Week 3.pdf"
+    
+    Args:
+        file_path: Path to the PDF file
+        root_folder: Folder the import started from
+    
+    Returns:
+        Dictionary with 'title', 'academic_year', 'semester' and 'module'
+    """
+    # The chosen folder's own name only counts as a year or semester (e.g. importing
+    # just "Semester 1"); a name like "Archive" or "Downloads" is not a module
+    relative_folder = os.path.relpath(os.path.dirname(file_path), root_folder)
+    folder_names = []
+    root_name = os.path.basename(os.path.abspath(root_folder))
+    if parse_academic_year(root_name) or parse_semester(root_name):
+        folder_names.append(root_name)
+    if relative_folder != ".":
+        folder_names.extend(relative_folder.split(os.sep))
+    
+    academic_year = None
+    semester = None
+    module = None
+    
+    for folder_name in folder_names:
+        year_match = parse_academic_year(folder_name)
+        semester_match = parse_semester(folder_name)
+        
+        if year_match:
+            academic_year = year_match
+        elif semester_match:
+            semester = semester_match
+        else:
+            # The folder nearest to the file wins
+            module = folder_name
+    
+    # File name without extension, e.g. "week_3-intro" -> "week 3 intro"
+    title = os.path.splitext(os.path.basename(file_path))[0]
+    title = " ".join(re.split(r"[_\-\s]+", title)).strip()
+    
+    return {
+        'title': title or "Untitled",
+        'academic_year': academic_year or DEFAULT_ACADEMIC_YEAR,
+        'semester': semester or DEFAULT_SEMESTER,
+        'module': module or DEFAULT_MODULE
+    }
+
+def extract_pdf_file(file_path):
+    """
+    Extract the text of a whole PDF (runs in a worker process)
+    
+    Args:
+        file_path: Path to the PDF file
+    
+    Returns:
+        Extracted text (empty if the file has no text)
+    """
+    return join_page_texts(extract_page_texts(file_path))
+
+def import_folder(folder, db, progress_callback=None, is_cancelled=None):
+    """
+    Import every PDF in a folder tree as a lesson
+    Files are extracted by several processes at once and saved in large
+    transactions. Files extracted before are read from the extraction cache.
+    Files whose text is already in the library are skipped, so importing a
+    folder again only adds the new files.
+    
+    Args:
+        folder: Folder to import
+        db: Database the lessons are saved to
+        progress_callback: Function called with a (files_done, file_count) tuple (optional)
+        is_cancelled: Function returning True when the import should stop (optional)
+    
+    Returns:
+        Dictionary with 'imported' (count), 'skipped' (list of (path, reason)),
+        'file_count' and 'cancelled'
+    """
+    pdf_files = find_pdf_files(folder)
+    file_count = len(pdf_files)
+    extraction_cache = get_extraction_cache()
+    
+    report = {'imported': 0, 'skipped': [], 'file_count': file_count, 'cancelled': False}
+    pending_lessons = []
+    pending_contents = set()
+    files_done = 0
+    
+    def report_file_done():
+        """
+        Count a finished file and report progress
+        """
+        nonlocal files_done
+        files_done += 1
+        
+        if progress_callback:
+            progress_callback((files_done, file_count))
+    
+    def skip_file(file_path, reason):
+        """
+        Record a file that is not imported
+        """
+        report['skipped'].append((file_path, reason))
+        report_file_done()
+    
+    def add_lesson(file_path, text):
+        """
+        Queue a lesson for saving, writing a batch when enough are queued
+        """
+        if not text:
+            skip_file(file_path, "No text could be extracted")
+            return
+        
+        # Same text as a saved lesson (or one earlier in this import)
+        if text in pending_contents or db.has_content(text):
+            skip_file(file_path, "Already in the library")
+            return
+        
+        lesson = infer_lesson_info(file_path, folder)
+        lesson['content'] = text
+        pending_lessons.append(lesson)
+        pending_contents.add(text)
+        
+        if len(pending_lessons) >= IMPORT_BATCH_SIZE:
+            report['imported'] += db.save_lessons(pending_lessons)
+            pending_lessons.clear()
+            pending_contents.clear()
+        
+        report_file_done()
+    
+    # Files extracted before need no worker
+    files_to_extract = {}
+    for file_path in pdf_files:
+        if is_cancelled and is_cancelled():
+            report['cancelled'] = True
+            break
+        
+        try:
+            cache_key = extraction_cache.make_key(file_path, EXTRACTOR_VERSION)
+        except OSError as e:
+            skip_file(file_path, str(e))
+            continue
+        
+        cached_text = extraction_cache.get(cache_key)
+        if cached_text is not None:
+            add_lesson(file_path, cached_text)
+        else:
+            files_to_extract[file_path] = cache_key
+    
+    if files_to_extract and not report['cancelled']:
+        # Shared spawn-started workers (see get_pdf_process_pool())
+        executor = get_pdf_process_pool()
+        futures = {}
+        try:
+            for file_path in files_to_extract:
+                futures[executor.submit(extract_pdf_file, file_path)] = file_path
+            
+            # Save files in the order they finish
+            for future in as_completed(futures):
+                if is_cancelled and is_cancelled():
+                    report['cancelled'] = True
+                    break
+                
+                file_path = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    skip_file(file_path, f"Error reading PDF file: {str(e)}")
+                    continue
+                
+                if text:
+                    extraction_cache.put(files_to_extract[file_path], text)
+                add_lesson(file_path, text)
+        finally:
+            # Files not started yet are dropped; the pool stays open for later use
+            for future in futures:
+                future.cancel()
+    
+    # Save the last, partly filled batch (also when cancelled, so finished work is kept)
+    if pending_lessons:
+        report['imported'] += db.save_lessons(pending_lessons)
+    
+    return report
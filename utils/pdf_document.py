@@ -0,0 +1,204 @@
+"""
+PDF Document
+Opens a PDF lazily and extracts pages only when they are asked for,
+and runs the worker processes that extract large PDFs
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Shared pool of worker processes for PDF extraction (created on first use)
+_pdf_process_pool = None
+_pdf_process_pool_lock = threading.Lock()
+
+def open_pdf_reader(file_path):
+    """
+    Open a PDF file for reading
+    pypdf is imported here rather than at startup, because it is slow to
+    load and many sessions never open a PDF.
+    
+    Args:
+        file_path: Path to the PDF file
+    
+    Returns:
+        PdfReader instance
+    """
+    from pypdf import PdfReader
+    return PdfReader(file_path)
+
+def extract_page_texts(file_path, start_page=0, end_page=None):
+    """
+    Extract the text of a range of pages (runs in a worker process)
+    
+    Args:
+        file_path: Path to the PDF file
+        start_page: First page index (inclusive)
+        end_page: Last page index (exclusive, default is the last page)
+        
+    Returns:
+        List of page texts
+    """
+    reader = open_pdf_reader(file_path)
+    if end_page is None:
+        end_page = len(reader.pages)
+    
+    page_texts = []
+    for page_index in range(start_page, end_page):
+        page_texts.append(reader.pages[page_index].extract_text() or "")
+    return page_texts
+
+def get_pdf_process_pool():
+    """
+    Get the shared pool of PDF worker processes
+    The workers are started with "spawn" rather than forked: the app
+    process runs Qt and database threads, which a fork cannot copy safely.
+    Reusing one pool also saves starting new processes for every file.
+    
+    Returns:
+        Shared ProcessPoolExecutor
+    """
+    global _pdf_process_pool
+    with _pdf_process_pool_lock:
+        if _pdf_process_pool is None:
+            _pdf_process_pool = ProcessPoolExecutor(
+                max_workers=get_pdf_worker_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_process_pool
+
+def get_pdf_worker_count():
+    """
+    Get how many PDF worker processes can run at once
+    
+    Returns:
+        Number of worker processes
+    """
+    return os.cpu_count() or 1
+
+def shutdown_pdf_process_pool():
+    """
+    Stop the PDF worker processes (call when the app exits)
+    Queued work is dropped; a new pool is started if one is needed again.
+    """
+    global _pdf_process_pool
+    with _pdf_process_pool_lock:
+        if _pdf_process_pool is not None:
+            _pdf_process_pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_process_pool = None
+
+class PdfDocument:
+    def __init__(self, file_path):
+        """
+        Initialize a lazily loaded PDF document
+        Nothing is read until the page count, a page or the outline is needed.
+        
+        Args:
+            file_path: Path to the PDF file
+        """
+        self.file_path = file_path
+        self.reader = None
+        
+        # Extracted page texts by page index (only pages that were asked for)
+        self.page_texts = {}
+        
+        # Chapters from the PDF's bookmarks (read on first use)
+        self.outline = None
+    
+    def get_reader(self):
+        """
+        Get the PDF reader, opening the file on first use
+        
+        Returns:
+            PdfReader instance
+        """
+        if self.reader is None:
+            self.reader = open_pdf_reader(self.file_path)
+        return self.reader
+    
+    def get_page_count(self):
+        """
+        Get the number of pages
+        
+        Returns:
+            Page count
+        """
+        return len(self.get_reader().pages)
+    
+    def get_page_text(self, page_index):
+        """
+        Get the text of one page, extracting it on first use
+        
+        Args:
+            page_index: Page index, starting at 0
+        
+        Returns:
+            Page text
+        """
+        if page_index not in self.page_texts:
+            page = self.get_reader().pages[page_index]
+            self.page_texts[page_index] = page.extract_text() or ""
+        return self.page_texts[page_index]
+    
+    def get_outline(self):
+        """
+        Get the chapters listed in the PDF's bookmarks
+        
+        Returns:
+            List of dictionaries with 'title', 'level', 'start_page' and
+            'end_page' (exclusive). Empty if the PDF has no bookmarks.
+        """
+        if self.outline is not None:
+            return self.outline
+        
+        entries = []
+        try:
+            self.collect_outline_entries(self.get_reader().outline, 0, entries)
+        except Exception:
+            # Broken bookmarks should not stop the PDF from opening
+            entries = []
+        
+        # A chapter ends where the next chapter on the same (or a higher) level starts
+        page_count = self.get_page_count()
+        for entry_index, entry in enumerate(entries):
+            entry['end_page'] = page_count
+            for next_entry in entries[entry_index + 1:]:
+                if next_entry['level'] <= entry['level']:
+                    entry['end_page'] = max(next_entry['start_page'], entry['start_page'] + 1)
+                    break
+        
+        self.outline = entries
+        return self.outline
+    
+    def collect_outline_entries(self, outline_items, level, entries):
+        """
+        Flatten pypdf's nested outline into a list
+        
+        Args:
+            outline_items: Outline list from pypdf (nested lists are sub-chapters)
+            level: Nesting level of outline_items
+            entries: List to add the entries to
+        """
+        for item in outline_items:
+            if isinstance(item, list):
+                self.collect_outline_entries(item, level + 1, entries)
+                continue
+            
+            start_page = self.get_reader().get_destination_page_number(item)
+            if start_page is None or start_page < 0:
+                continue
+            
+            entries.append({
+                'title': str(item.title),
+                'level': level,
+                'start_page': start_page
+            })
+    
+    def close(self):
+        """
+        Forget the reader and the extracted pages
+        """
+        self.reader = None
+        self.page_texts = {}
+        self.outline = None
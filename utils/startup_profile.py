@@ -0,0 +1,74 @@
+"""
+Startup Profile
+Measures how long each step of starting the app takes (main.py --profile-startup)
+"""
+
+import sys
+import time
+
+# Modules that are slow to import and should only load when first needed
+HEAVY_MODULES = ["google.generativeai", "pypdf", "dotenv"]
+
+# Time the profile starts counting from (set by start_startup_profile)
+_start_time = None
+
+# Finished steps as (name, time) tuples, in order
+_steps = []
+
+def start_startup_profile():
+    """
+    Start recording startup steps (only call once, as early as possible)
+    """
+    global _start_time
+    _start_time = time.perf_counter()
+    _steps.clear()
+
+def is_startup_profile_enabled():
+    """
+    Check if startup steps are being recorded
+    
+    Returns:
+        True if start_startup_profile() was called
+    """
+    return _start_time is not None
+
+def record_startup_step(name):
+    """
+    Record that a startup step has finished (does nothing unless profiling)
+    
+    Args:
+        name: Short description of the step
+    """
+    if _start_time is not None:
+        _steps.append((name, time.perf_counter()))
+
+def format_startup_report():
+    """
+    Build the startup timing report
+    
+    Returns:
+        Report text with the duration of each step, the running total,
+        and which slow modules were already imported
+    """
+    lines = ["Startup profile:", f"  {'step':<32} {'took':>9} {'total':>9}"]
+    
+    previous_time = _start_time
+    for name, step_time in _steps:
+        step_ms = (step_time - previous_time) * 1000
+        total_ms = (step_time - _start_time) * 1000
+        lines.append(f"  {name:<32} {step_ms:>7.1f}ms {total_ms:>7.1f}ms")
+        previous_time = step_time
+    
+    # Anything listed as loaded here slowed down the first window
+    lines.append("Slow modules loaded at startup:")
+    for module_name in HEAVY_MODULES:
+        status = "loaded" if module_name in sys.modules else "not loaded"
+        lines.append(f"  {module_name:<32} {status}")
+    
+    return "\n".join(lines)
+
+def print_startup_report():
+    """
+    Print the startup timing report
+    """
+    print(format_startup_report(), flush=True)
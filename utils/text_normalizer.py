@@ -0,0 +1,205 @@
+"""
+Text Normalizer
+Removes PDF boilerplate (headers, footers, page numbers, broken words, extra spaces)
+so less text is sent to the AI
+"""
+
+import re
+
+# A line is a header/footer if it repeats on at least this share of the pages...
+REPEATED_LINE_MIN_SHARE = 0.5
+
+# ...and the document has at least this many pages
+REPEATED_LINE_MIN_PAGES = 3
+
+# Only lines this close to the top or bottom of a page count as headers/footers
+EDGE_LINE_COUNT = 3
+
+# "12", "- 12 -", "Page 12", "12 / 40", "Page 12 of 40"
+PAGE_NUMBER_PATTERN = re.compile(r"^\W*(?:page\s*)?\d+(?:\s*(?:/|of)\s*\d+)?\W*$", re.IGNORECASE)
+
+# A page number or date inside a running header: "Lecture 3 - page 4", "CS101 | 12/03/2024"
+PAGE_LABEL_PATTERN = re.compile(r"\bpage\s*\d+|\d+\s*/\s*\d+", re.IGNORECASE)
+
+# Lines with at least this share of digits are counters, not text
+MIN_DIGIT_SHARE = 0.5
+
+# A word broken over two lines: "mito-\nchondria"
+HYPHENATED_BREAK_PATTERN = re.compile(r"(\w)-\n[ \t]*([a-z])")
+
+def is_numbered_line(line):
+    """
+    Check if a line looks like a page number or a running header with one
+    
+    Args:
+        line: One line of text, with whitespace collapsed
+    
+    Returns:
+        True if the numbers in the line are counters rather than content
+    """
+    if PAGE_LABEL_PATTERN.search(line):
+        return True
+    
+    characters = line.replace(" ", "")
+    digit_count = sum(character.isdigit() for character in characters)
+    return bool(characters) and digit_count >= len(characters) * MIN_DIGIT_SHARE
+
+def get_line_signature(line):
+    """
+    Get the form of a line used to spot repeats
+    Lines are compared exactly, so "Question 1" and "Question 2" stay apart.
+    Only in page numbers and running headers are numbers ignored, so
+    "Lecture 3 - page 4" and "Lecture 3 - page 5" match.
+    
+    Args:
+        line: One line of text
+    
+    Returns:
+        Normalized line
+    """
+    line = " ".join(line.split())
+    if is_numbered_line(line):
+        return re.sub(r"\d+", "#", line.lower())
+    return line
+
+def get_edge_lines(lines):
+    """
+    Get the positions of the lines at the top and bottom of a page
+    
+    Args:
+        lines: Lines of one page
+    
+    Returns:
+        Set of line indexes
+    """
+    return set(range(EDGE_LINE_COUNT)) | set(range(len(lines) - EDGE_LINE_COUNT, len(lines)))
+
+def find_repeated_lines(pages_lines):
+    """
+    Find header and footer lines that repeat across pages
+    
+    Args:
+        pages_lines: List of pages, each a list of lines
+    
+    Returns:
+        Set of line signatures to remove
+    """
+    if len(pages_lines) < REPEATED_LINE_MIN_PAGES:
+        return set()
+    
+    # Count each signature once per page
+    page_counts = {}
+    for lines in pages_lines:
+        page_signatures = set()
+        for line_index in get_edge_lines(lines):
+            signature = get_line_signature(lines[line_index])
+            if signature:
+                page_signatures.add(signature)
+        
+        for signature in page_signatures:
+            page_counts[signature] = page_counts.get(signature, 0) + 1
+    
+    min_pages = max(REPEATED_LINE_MIN_PAGES, len(pages_lines) * REPEATED_LINE_MIN_SHARE)
+    
+    repeated_lines = set()
+    for signature, count in page_counts.items():
+        if count >= min_pages:
+            repeated_lines.add(signature)
+    return repeated_lines
+
+def dehyphenate(text):
+    """
+    Join words that were split over two lines with a hyphen
+    
+    Args:
+        text: Text to fix
+    
+    Returns:
+        Text with the broken words joined
+    """
+    return HYPHENATED_BREAK_PATTERN.sub(r"\1\2", text)
+
+def collapse_whitespace(text):
+    """
+    Collapse runs of spaces and blank lines
+    Paragraph breaks (one blank line) are kept.
+    
+    Args:
+        text: Text to clean
+    
+    Returns:
+        Cleaned text
+    """
+    # Spaces and tabs inside lines
+    text = re.sub(r"[ \t\f\v\xa0]+", " ", text)
+    
+    # Spaces at the start and end of lines
+    text = re.sub(r" *\n *", "\n", text)
+    
+    # More than one blank line
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    
+    return text.strip()
+
+def normalize_text(text):
+    """
+    Lightly clean text before it is sent to the AI
+    Safe for any text (pasted, saved or extracted); page-level cleaning
+    is done by normalize_pages() when a PDF is extracted.
+    
+    Args:
+        text: Text to clean
+    
+    Returns:
+        Cleaned text
+    """
+    return collapse_whitespace(dehyphenate(text))
+
+def normalize_pages(page_texts):
+    """
+    Clean the text of a PDF and join its pages
+    Removes headers and footers repeated across pages, page numbers,
+    hyphenation breaks and extra whitespace.
+    
+    Args:
+        page_texts: List of page texts, in page order
+    
+    Returns:
+        Tuple of (text, stats). stats has 'original_characters',
+        'removed_characters' and 'removed_lines'.
+    """
+    pages_lines = []
+    original_characters = 0
+    for page_text in page_texts:
+        pages_lines.append(page_text.splitlines())
+        original_characters += len(page_text)
+    
+    repeated_lines = find_repeated_lines(pages_lines)
+    
+    kept_pages = []
+    removed_lines = 0
+    for lines in pages_lines:
+        edge_lines = get_edge_lines(lines)
+        
+        kept_lines = []
+        for line_index, line in enumerate(lines):
+            # Headers, footers and page numbers only appear at the page edges
+            if line_index in edge_lines:
+                if get_line_signature(line) in repeated_lines or PAGE_NUMBER_PATTERN.match(line.strip()):
+                    removed_lines += 1
+                    continue
+            kept_lines.append(line)
+        
+        kept_pages.append("\n".join(kept_lines))
+    
+    text = collapse_whitespace(dehyphenate("\n".join(kept_pages)))
+    
+    # Page joins are not counted as original text
+    removed_characters = max(0, original_characters - len(text))
+    
+    stats = {
+        'original_characters': original_characters,
+        'removed_characters': removed_characters,
+        'removed_lines': removed_lines
+    }
+    return text, stats